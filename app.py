@@ -3,7 +3,7 @@ INVESTAUR PRO — Application module (main UI and tabs)
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import matplotlib
 matplotlib.use("TkAgg")
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
@@ -11,26 +11,39 @@ from matplotlib.figure import Figure
 import matplotlib.patches as mpatches
 import matplotlib.gridspec as gridspec
 import matplotlib.pyplot as plt
-import feedparser
 import urllib.parse
 import webbrowser
 import numpy as np
-import threading
+import os
 import re
+import threading
 from datetime import datetime
 
-import yfinance as yf
-
 from config import (
     BG, PANEL, CARD, BORDER, ACCENT, ACCENT2, FG, FG_DIM, POS, NEG, BLUE, ORANGE,
     FONT_TITLE, FONT_MONO, FONT_SMALL, FONT_NUM,
     REFRESH_PULSE_MS, REFRESH_PORTFOLIO_MS, REFRESH_ANALYSIS_MS, REFRESH_MARKETS_MS,
+    REFRESH_ORDERS_MS, REFRESH_WATCHLIST_MS, WORKER_THREADS, SIM_LOG_LINES, UNIVERSE_DIR, UNIVERSE_FILES,
 )
 from models import (
-    Holding, PortfolioState, WatchlistState, SimulatorState,
+    Holding, SimulatorState,
     get_company_info,
 )
 from utils import styled_entry, stat_card, divider, scrollable, fmt_big
+from data import get_provider
+from cache import fundamentals, indicator_cache, last_bar
+from store import bars
+from fundtable import fund_table, fundamental_mask
+from workers import WorkerPool, USER, VISIBLE, BACKGROUND
+from realtime import RefreshScheduler, quote_bus
+from fetch import get_engine, bridge
+from ledger import describe, BUY, SELL
+from statestore import StateStore
+import backtest
+import indicators as ind
+import sweep
+import scan
+from orders import ORDER_TYPES, MARKET, BUY_SIDE, SELL_SIDE
 
 # ──────────────────────────────────────────
 # MAIN APP
@@ -44,19 +57,35 @@ class InvestaurPro(tk.Tk):
         self.minsize(1000, 600)
         self.configure(bg=BG)
 
-        self.portfolio   = PortfolioState()
-        self.watchlist   = WatchlistState()
-        self.simulator   = SimulatorState()
-        self.current_sym = tk.StringVar(value="AAPL")
+        self.store       = StateStore()
+        self.portfolio   = self.store.load_portfolio()
+        self.watchlist   = self.store.load_watchlist()
+        self.simulator   = SimulatorState.load()
+        self.current_sym = tk.StringVar(value=self.store.get("current_sym", "AAPL"))
         self._loading    = False
         self._last_range = "6M"
-
-        self._seed_data()
+        self.pool        = WorkerPool(WORKER_THREADS)
+        self.scheduler   = RefreshScheduler(self, self.pool)
+        self._analysis_sym   = None
+        self._analysis_start = None
+        self._streams    = {}     # SYM -> indicators.InsightStream, updated from the quote bus
+        self._seeding    = set()  # symbols whose stream is being seeded from history
+        self._wl_labels  = {}     # SYM -> live watchlist label
+        self._ai_widgets = None   # Insight cards of the rendered symbol
+
+        if self.store.is_new:
+            self._seed_data()
         self._setup_styles()
         self._build_layout()
         self.after(200, lambda: self.run_analysis("6M"))
         self.after(800, self._refresh_markets)
         self._schedule_realtime_updates()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+    def _on_close(self):
+        self.store.set("current_sym", self.current_sym.get())
+        self.store.close()
+        self.destroy()
 
     def _seed_data(self):
         self.portfolio.add("AAPL",   10,   150.0,  "2022-01-15")
@@ -66,6 +95,8 @@ class InvestaurPro(tk.Tk):
         self.portfolio.add("GOOGL",   3,  2800.0,  "2022-09-05")
         for s in ["TSLA","META","AMZN","AMD","QQQ"]:
             self.watchlist.add(s)
+        self.store.save_portfolio(self.portfolio)
+        self.store.save_watchlist(self.watchlist)
 
     def _setup_styles(self):
         s = ttk.Style()
@@ -125,7 +156,7 @@ class InvestaurPro(tk.Tk):
         self.pulse_frame = tk.Frame(sb, bg=PANEL, padx=10)
         self.pulse_frame.pack(fill="x")
         self._pulse_labels = {}
-        for sym in ["SPY", "QQQ", "BTC-USD"]:
+        for sym in self.PULSE_SYMS:
             row = tk.Frame(self.pulse_frame, bg=PANEL, pady=3)
             row.pack(fill="x")
             tk.Label(row, text=sym, fg=ACCENT, bg=PANEL, font=("Consolas", 9, "bold"),
@@ -140,18 +171,19 @@ class InvestaurPro(tk.Tk):
         self.pnl_sidebar.pack()
 
         self._refresh_watchlist_ui()
-        threading.Thread(target=self._update_pulse, daemon=True).start()
 
     def _add_to_watchlist(self, event=None):
         sym = self.wl_entry.get().strip().upper()
         if sym:
             self.watchlist.add(sym)
+            self.store.save_watchlist(self.watchlist)
             self.wl_entry.delete(0, "end")
             self._refresh_watchlist_ui()
 
     def _refresh_watchlist_ui(self):
         for w in self.watchlist_frame.winfo_children():
             w.destroy()
+        self._wl_labels.clear()
         for sym in self.watchlist.symbols:
             row = tk.Frame(self.watchlist_frame, bg=PANEL, padx=10, pady=3)
             row.pack(fill="x")
@@ -164,9 +196,59 @@ class InvestaurPro(tk.Tk):
             rm = tk.Label(row, text="✕", fg=FG_DIM, bg=PANEL, font=("Consolas", 8), cursor="hand2")
             rm.pack(side="right")
             rm.bind("<Button-1>", lambda e, s=sym: self._remove_watchlist(s))
+            self._wl_labels[sym] = tk.Label(row, text="", fg=FG_DIM, bg=PANEL, font=("Consolas", 8))
+            self._wl_labels[sym].pack(side="right", padx=4)
+            if sym in self._streams:
+                self._fill_wl_row(sym, self._streams[sym].metrics())
+        self._seed_streams(self.watchlist.symbols)
+
+    def _seed_streams(self, syms):
+        """Seed an InsightStream per symbol from 2y of stored bars, once; quotes then update it in O(1)."""
+        todo = [s for s in syms if s not in self._streams and s not in self._seeding]
+        if not todo:
+            return
+        self._seeding.update(todo)
+
+        def work():
+            out = {}
+            try:
+                for sym, hist in bars.history_many(todo, "2y").items():
+                    if len(hist) >= 20:
+                        out[sym] = ind.InsightStream(hist["Close"].to_numpy(float), hist.index[-1].date())
+            finally:
+                self.after(0, lambda: self._add_streams(todo, out))
+        self.pool.submit(work)
+
+    def _add_streams(self, syms, streams):
+        self._seeding.difference_update(syms)
+        for sym, stream in streams.items():
+            self._streams.setdefault(sym, stream)
+            if sym in self._wl_labels:
+                self._fill_wl_row(sym, self._streams[sym].metrics())
+
+    def _fill_wl_row(self, sym, m):
+        lbl = self._wl_labels.get(sym)
+        if lbl is not None and lbl.winfo_exists():
+            lbl.config(text=f"{m['curr']:,.2f} RSI {m['rsi']:.0f}", fg=self._ai_signals(m)[4])
+
+    def _on_stream_quote(self, q):
+        """Roll a quote into the symbol's indicator stream and refresh its watchlist row and Insight cards."""
+        stream = self._streams.get(q.symbol)
+        if stream is None:
+            return
+        # Bars are keyed on the quote's trading session, not the wall clock: pre-market, weekend
+        # and holiday quotes still carry the last session's date and so revise its bar.
+        m = stream.update(q.price, q.day)
+        self._fill_wl_row(q.symbol, m)
+        if self._ai_widgets and self._ai_widgets["sym"] == q.symbol:
+            self._fill_ai(m)
 
     def _remove_watchlist(self, sym):
         self.watchlist.remove(sym)
+        self.store.save_watchlist(self.watchlist)
+        self._wl_labels.pop(sym, None)
+        if not (self._ai_widgets and self._ai_widgets["sym"] == sym):
+            self._streams.pop(sym, None)
         self._refresh_watchlist_ui()
 
     def _load_symbol(self, sym):
@@ -180,99 +262,72 @@ class InvestaurPro(tk.Tk):
         self.run_analysis("6M")
         self.notebook.select(0)
 
-    def _update_pulse(self):
-        for sym in ["SPY", "QQQ", "BTC-USD"]:
-            try:
-                d = yf.Ticker(sym).history(period="2d")
-                if d.empty or len(d) < 2:
-                    continue
-                c, p = float(d["Close"].iloc[-1]), float(d["Close"].iloc[-2])
-                chg = (c - p) / p * 100
-                sign = "+" if chg >= 0 else ""
-                color = POS if chg >= 0 else NEG
-                text = f"${c:,.0f} {sign}{chg:.1f}%" if c > 1000 else f"${c:.2f} {sign}{chg:.1f}%"
-                self.after(0, lambda s=sym, t=text, cl=color: self._pulse_labels[s].config(text=t, fg=cl))
-            except Exception:
-                pass
-        self.after(REFRESH_PULSE_MS, lambda: threading.Thread(target=self._update_pulse, daemon=True).start())
+    PULSE_SYMS = ["SPY", "QQQ", "BTC-USD"]
 
-    def _schedule_realtime_updates(self):
-        """Schedule periodic real-time updates for live data."""
-        def refresh_portfolio_sidebar():
-            try:
-                rows, _, total_pl = self.portfolio.snapshot()
-                if rows:
-                    sign = "+" if total_pl >= 0 else ""
-                    pl_color = POS if total_pl >= 0 else NEG
-                    self.after(0, lambda: self.pnl_sidebar.config(
-                        text=f"Portfolio P&L\n{sign}${abs(total_pl):,.2f}", fg=pl_color))
-            except Exception:
-                pass
-            self.after(REFRESH_PORTFOLIO_MS, lambda: threading.Thread(target=refresh_portfolio_sidebar, daemon=True).start())
-
-        PERIOD_MAP = {"1D": ("1d","5m"), "5D": ("5d","15m"), "1M": ("1mo","1h"),
-                      "3M": ("3mo","1d"), "6M": ("6mo","1d"), "1Y": ("1y","1d"),
-                      "5Y": ("5y","1wk"), "MAX": ("max","1mo")}
-        def refresh_analysis_price():
-            if self._loading:
-                self.after(REFRESH_ANALYSIS_MS, refresh_analysis_price)
-                return
-            sym = self._get_current_ticker()
-            r = getattr(self, "_last_range", "6M")
-            period, _ = PERIOD_MAP.get(r, ("6mo", "1d"))
-            if sym and hasattr(self, "lbl_price") and self.lbl_price.winfo_exists():
-
-                def _fetch():
-                    try:
-                        t = yf.Ticker(sym)
-                        d = t.history(period=period)
-                        info = t.info
-                        if not d.empty and len(d) >= 1:
-                            start_price = float(d["Close"].iloc[0])
-                            hist_last = float(d["Close"].iloc[-1])
-                            curr = info.get("regularMarketPrice") or info.get("currentPrice")
-                            if curr is None or not isinstance(curr, (int, float)):
-                                curr = hist_last
-                            else:
-                                curr = float(curr)
-                            chg = curr - start_price
-                            chg_pct = (chg / start_price * 100) if start_price and start_price != 0 else 0
-                            color_line = POS if chg >= 0 else NEG
-                            sign = "+" if chg >= 0 else ""
-                            self.after(0, lambda: [
-                                self.lbl_price.config(text=f"${curr:,.2f}"),
-                                self.lbl_chg.config(text=f"{sign}{chg:.2f} ({sign}{chg_pct:.2f}%)", fg=color_line)
-                            ])
-                    except Exception:
-                        pass
-                    self.after(REFRESH_ANALYSIS_MS, refresh_analysis_price)
-
-                threading.Thread(target=_fetch, daemon=True).start()
-                return
-            self.after(REFRESH_ANALYSIS_MS, refresh_analysis_price)
+    def _on_tk(self, fn):
+        """Wrap a quote-bus callback so it runs on the Tk thread whichever thread published."""
+        return lambda q: self.after(0, lambda: fn(q))
 
-        def refresh_markets_if_visible():
-            try:
-                idx = self.notebook.index(self.notebook.select())
-                if idx == 3:
-                    self.after(0, self._refresh_markets)
-            except Exception:
-                pass
-            self.after(REFRESH_MARKETS_MS, lambda: threading.Thread(target=refresh_markets_if_visible, daemon=True).start())
+    def _on_pulse_quote(self, q):
+        c, p = q.price, q.prev_close
+        if not p or q.symbol not in self._pulse_labels:
+            return
+        chg = (c - p) / p * 100
+        sign = "+" if chg >= 0 else ""
+        color = POS if chg >= 0 else NEG
+        text = f"${c:,.0f} {sign}{chg:.1f}%" if c > 1000 else f"${c:.2f} {sign}{chg:.1f}%"
+        self._pulse_labels[q.symbol].config(text=text, fg=color)
 
-        def refresh_simulator_if_visible():
-            try:
-                idx = self.notebook.index(self.notebook.select())
-                if idx == 6 and hasattr(self, "sim_port_lbl") and self.sim_port_lbl.winfo_exists():
-                    self.after(0, self._sim_update_value)
-            except Exception:
-                pass
-            self.after(REFRESH_PORTFOLIO_MS, lambda: threading.Thread(target=refresh_simulator_if_visible, daemon=True).start())
+    def _tab_visible(self, idx):
+        try:
+            return self.notebook.index(self.notebook.select()) == idx
+        except Exception:
+            return False
 
-        self.after(REFRESH_PORTFOLIO_MS, lambda: threading.Thread(target=refresh_portfolio_sidebar, daemon=True).start())
-        self.after(REFRESH_PORTFOLIO_MS, lambda: threading.Thread(target=refresh_simulator_if_visible, daemon=True).start())
-        self.after(REFRESH_ANALYSIS_MS, refresh_analysis_price)
-        self.after(REFRESH_MARKETS_MS, lambda: threading.Thread(target=refresh_markets_if_visible, daemon=True).start())
+    def _schedule_realtime_updates(self):
+        """Register every live widget with the refresh scheduler; each tick fetches all due symbols in one batch.
+
+        Per-symbol widgets (pulse labels, analysis price) listen on the quote bus instead, so a
+        price published by any fetch reaches them without a request of their own.
+        """
+        quote_bus.subscribe(self.PULSE_SYMS, self._on_tk(self._on_pulse_quote))
+        quote_bus.subscribe(None, self._on_tk(self._on_analysis_quote))
+        quote_bus.subscribe(None, self._on_tk(self._on_order_quote))
+        quote_bus.subscribe(None, self._on_tk(self._on_stream_quote))
+        sch = self.scheduler
+        sch.subscribe("pulse", self.PULSE_SYMS, REFRESH_PULSE_MS, immediate=True)
+        sch.subscribe("portfolio", lambda: list(self.portfolio.holdings), REFRESH_PORTFOLIO_MS,
+                      self._apply_portfolio_quotes)
+        sch.subscribe("analysis", lambda: [self._analysis_sym] if self._analysis_sym else [],
+                      REFRESH_ANALYSIS_MS, active=lambda: not self._loading and self._analysis_sym is not None)
+        sch.subscribe("watchlist", lambda: list(self.watchlist.symbols), REFRESH_WATCHLIST_MS)
+        sch.subscribe("insight", lambda: [self._ai_widgets["sym"]] if self._ai_widgets else [],
+                      REFRESH_ANALYSIS_MS, active=lambda: self._tab_visible(5))
+        sch.subscribe("markets", [s for _, s in self.MARKET_SYMS + self.SECTORS], REFRESH_MARKETS_MS,
+                      self._apply_market_quotes, active=lambda: self._tab_visible(3))
+        sch.subscribe("simulator", lambda: list(self.simulator.positions), REFRESH_PORTFOLIO_MS,
+                      self._apply_sim_quotes, active=lambda: self._tab_visible(6))
+        # Keeps symbols with resting orders quoted whatever tab is showing; fills come via _on_order_quote.
+        sch.subscribe("orders", lambda: self.simulator.orders.symbols(), REFRESH_ORDERS_MS)
+        sch.start()
+
+    def _apply_portfolio_quotes(self, quotes):
+        pl = self.portfolio.valuation(quotes)["pl"]
+        if len(pl):
+            total_pl = float(pl.sum())
+            sign = "+" if total_pl >= 0 else ""
+            pl_color = POS if total_pl >= 0 else NEG
+            self.pnl_sidebar.config(text=f"Portfolio P&L\n{sign}${abs(total_pl):,.2f}", fg=pl_color)
+
+    def _on_analysis_quote(self, q):
+        if q.symbol != self._analysis_sym or not self._analysis_start or self._loading:
+            return
+        curr, start_price = q.price, self._analysis_start
+        chg = curr - start_price
+        chg_pct = chg / start_price * 100
+        sign = "+" if chg >= 0 else ""
+        self.lbl_price.config(text=f"${curr:,.2f}")
+        self.lbl_chg.config(text=f"{sign}{chg:.2f} ({sign}{chg_pct:.2f}%)", fg=POS if chg >= 0 else NEG)
 
     # ── HEADER ──────────────────────────────────────
     def _build_header(self, parent):
@@ -329,6 +384,7 @@ class InvestaurPro(tk.Tk):
         if not sym:
             return
         self.watchlist.add(sym)
+        self.store.save_watchlist(self.watchlist)
         self._update_ticker_combo_values()
         if hasattr(self, "search_entry") and self.search_entry.winfo_exists():
             self.search_entry["values"] = self._ticker_combo_values
@@ -464,7 +520,7 @@ class InvestaurPro(tk.Tk):
         self._highlight_range(r)
         self.status_var.set(f"Fetching {sym}…")
         self._loading = True
-        threading.Thread(target=self._fetch_analysis, args=(sym, r), daemon=True).start()
+        self.pool.submit(self._fetch_analysis, sym, r, priority=USER)
 
     def _fetch_analysis(self, sym, r):
         mapping = {
@@ -474,9 +530,8 @@ class InvestaurPro(tk.Tk):
         }
         period, interval = mapping.get(r, ("6mo", "1d"))
         try:
-            t = yf.Ticker(sym)
-            hist = t.history(period=period, interval=interval, auto_adjust=True)
-            info = t.info
+            hist = bars.history(sym, period, interval)
+            info = fundamentals.get(sym)
             if hist.empty:
                 raise ValueError("No price data returned.")
             self.after(0, lambda: self._render_analysis(sym, hist, info, r))
@@ -486,6 +541,7 @@ class InvestaurPro(tk.Tk):
     def _render_analysis(self, sym, hist, info, r):
         self._loading = False
         start_price = float(hist["Close"].iloc[0]) if len(hist) > 1 else float(hist["Close"].iloc[-1])
+        self._analysis_sym, self._analysis_start = sym, start_price
         hist_last = float(hist["Close"].iloc[-1])
         curr = info.get("regularMarketPrice") or info.get("currentPrice")
         if curr is None or not isinstance(curr, (int, float)):
@@ -599,11 +655,11 @@ class InvestaurPro(tk.Tk):
         tk.Label(self.company_inner, text=f"Loading {sym}…", fg=FG_DIM, bg=BG,
                  font=FONT_MONO, pady=20).pack()
         self.status_var.set(f"Loading company: {sym}…")
-        threading.Thread(target=self._fetch_company, args=(sym,), daemon=True).start()
+        self.pool.submit(self._fetch_company, sym, priority=USER, key="company")
 
     def _fetch_company(self, sym):
         try:
-            info = yf.Ticker(sym).info
+            info = fundamentals.get(sym)
         except:
             info = {}
         offline = get_company_info(sym)
@@ -719,7 +775,7 @@ class InvestaurPro(tk.Tk):
 
     def _refresh_portfolio(self):
         self.status_var.set("Refreshing portfolio…")
-        threading.Thread(target=self._do_refresh_portfolio, daemon=True).start()
+        self.pool.submit(self._do_refresh_portfolio, priority=VISIBLE, key="portfolio")
 
     def _do_refresh_portfolio(self):
         rows, total_v, total_pl = self.portfolio.snapshot()
@@ -807,16 +863,16 @@ class InvestaurPro(tk.Tk):
         for p in ["3mo","6mo","1y","2y","5y"]:
             tk.Button(pf, text=p.upper(), bg=PANEL, fg=FG_DIM, font=("Consolas",9,"bold"),
                       padx=8, pady=4, borderwidth=0, cursor="hand2",
-                      command=lambda x=p: threading.Thread(
-                          target=self._fetch_growth, args=(x, g_ax, g_canvas), daemon=True).start()
+                      command=lambda x=p: self.pool.submit(
+                          self._fetch_growth, x, g_ax, g_canvas, priority=USER, key=("growth", id(g_ax)))
                       ).pack(side="left", padx=2)
 
-        threading.Thread(target=self._fetch_growth, args=("1y", g_ax, g_canvas), daemon=True).start()
+        self.pool.submit(self._fetch_growth, "1y", g_ax, g_canvas, priority=USER, key=("growth", id(g_ax)))
 
     def _fetch_growth(self, period, ax, canvas):
         try:
             dates, totals = self.portfolio.historical_values(period)
-            spy = yf.Ticker("SPY").history(period=period)
+            spy = bars.history("SPY", period)
             self.after(0, lambda: self._render_growth(dates, totals, spy, period, ax, canvas))
         except Exception as e:
             self.after(0, lambda: self.status_var.set(f"Growth error: {e}"))
@@ -824,6 +880,10 @@ class InvestaurPro(tk.Tk):
     def _render_growth(self, dates, totals, spy, period, ax, canvas):
         ax.clear()
         self._style_ax(ax)
+        if totals is not None and (totals > 0).any():
+            # Start the line on the first day anything was held.
+            first = int(np.argmax(totals > 0))
+            dates, totals = dates[first:], totals[first:]
         if totals is not None and len(totals) > 1:
             base = totals[0] or 1
             pct = (totals / base - 1) * 100
@@ -863,6 +923,7 @@ class InvestaurPro(tk.Tk):
                 d = entries["d"].get().strip() or datetime.now().strftime("%Y-%m-%d")
                 if not t: raise ValueError
                 self.portfolio.add(t, s, p, d)
+                self.store.save_portfolio(self.portfolio)
                 dlg.destroy()
                 self._refresh_portfolio()
             except ValueError:
@@ -877,6 +938,7 @@ class InvestaurPro(tk.Tk):
         ticker = self.p_tree.item(sel[0])["values"][0]
         if messagebox.askyesno("Confirm", f"Remove {ticker} from portfolio?"):
             self.portfolio.remove(ticker)
+            self.store.save_portfolio(self.portfolio)
             self._refresh_portfolio()
 
     def _quick_add_to_portfolio(self):
@@ -898,6 +960,7 @@ class InvestaurPro(tk.Tk):
         def confirm():
             try:
                 self.portfolio.add(sym, float(entries["s"].get()), float(entries["p"].get()))
+                self.store.save_portfolio(self.portfolio)
                 dlg.destroy()
                 self._refresh_portfolio()
             except ValueError:
@@ -963,51 +1026,81 @@ class InvestaurPro(tk.Tk):
         for i in self.m_tree.get_children():
             self.m_tree.delete(i)
         self.status_var.set("Fetching market data…")
-        threading.Thread(target=self._fetch_markets, daemon=True).start()
-        threading.Thread(target=self._fetch_heatmap, daemon=True).start()
+        self.pool.submit(self._fetch_markets, priority=VISIBLE, key="markets")
+        self.pool.submit(self._fetch_heatmap, priority=VISIBLE, key="heatmap")
 
     def _fetch_markets(self):
         rows = []
+        # One batched 1y download covers the quote, volume and the 52-week range for every row.
+        err = None
+        try:
+            frames = get_provider().history_many([s for _, s in self.MARKET_SYMS], period="1y")
+        except Exception as e:
+            frames, err = {}, e
         for name, sym in self.MARKET_SYMS:
             try:
-                t = yf.Ticker(sym)
-                d = t.history(period="2d")
-                if d.empty: continue
+                d = frames.get(sym)
+                if d is None or d.empty: continue
                 curr = float(d["Close"].iloc[-1])
                 prev = float(d["Close"].iloc[-2]) if len(d) > 1 else curr
                 chg = curr - prev
                 chg_pct = (chg / prev * 100) if prev else 0
+                quote_bus.publish(sym, curr, prev, day=d.index[-1].date())
                 vol = int(d["Volume"].iloc[-1]) if "Volume" in d.columns else 0
-                info = t.info
-                h52 = info.get("fiftyTwoWeekHigh","N/A")
-                l52 = info.get("fiftyTwoWeekLow","N/A")
+                h52 = f"{float(d['High'].max()):,.2f}" if "High" in d.columns else "N/A"
+                l52 = f"{float(d['Low'].min()):,.2f}" if "Low" in d.columns else "N/A"
                 sign = "+" if chg >= 0 else ""
                 rows.append((name, sym,
                               f"${curr:,.2f}" if curr < 100000 else f"${curr:,.0f}",
                               f"{sign}{chg:.2f}", f"{sign}{chg_pct:.2f}%",
                               f"{vol:,}", f"${h52}", f"${l52}", chg >= 0))
-            except:
-                pass
-        self.after(0, lambda: self._populate_markets(rows))
+            except (KeyError, IndexError, TypeError, ValueError):
+                continue
+        self.after(0, lambda: self._populate_markets(rows, err))
 
-    def _populate_markets(self, rows):
+    def _populate_markets(self, rows, err=None):
         for i in self.m_tree.get_children():
             self.m_tree.delete(i)
         for r in rows:
             self.m_tree.insert("", "end", values=r[:-1], tags=("pos" if r[-1] else "neg",))
+        if err is not None:
+            self.status_var.set(f"Markets error: {err}")
+        else:
+            self.status_var.set(f"Markets updated  ·  {datetime.now().strftime('%H:%M:%S')}")
+
+    def _apply_market_quotes(self, quotes):
+        """Update prices in the existing markets rows and the heatmap from scheduler quotes."""
+        for item in self.m_tree.get_children():
+            vals = list(self.m_tree.item(item)["values"])
+            curr, prev = quotes.get(str(vals[1]), (None, None))
+            if curr is None:
+                continue
+            prev = prev or curr
+            chg = curr - prev
+            chg_pct = (chg / prev * 100) if prev else 0
+            sign = "+" if chg >= 0 else ""
+            vals[2:5] = [f"${curr:,.2f}" if curr < 100000 else f"${curr:,.0f}",
+                         f"{sign}{chg:.2f}", f"{sign}{chg_pct:.2f}%"]
+            self.m_tree.item(item, values=vals, tags=("pos" if chg >= 0 else "neg",))
+        self._render_heatmap(self._heatmap_rows(quotes))
         self.status_var.set(f"Markets updated  ·  {datetime.now().strftime('%H:%M:%S')}")
 
-    def _fetch_heatmap(self):
+    def _heatmap_rows(self, quotes):
         results = []
         for name, sym in self.SECTORS:
-            try:
-                d = yf.Ticker(sym).history(period="2d")
-                if d.empty or len(d) < 2: continue
-                curr, prev = float(d["Close"].iloc[-1]), float(d["Close"].iloc[-2])
+            curr, prev = quotes.get(sym, (None, None))
+            if prev:
                 results.append((name, (curr-prev)/prev*100))
-            except:
-                pass
+        return results
+
+    def _fetch_heatmap(self):
+        syms = [s for _, s in self.SECTORS]
+        quotes = quote_bus.prices(syms)
+        results = self._heatmap_rows(quotes)
+        missing = len(syms) - len(quotes)
         self.after(0, lambda: self._render_heatmap(results))
+        if missing:
+            self.after(0, lambda: self.status_var.set(f"Heatmap: no quote for {missing} of {len(syms)} sectors."))
 
     def _render_heatmap(self, data):
         self.heatmap_ax.clear()
@@ -1068,16 +1161,18 @@ class InvestaurPro(tk.Tk):
         tk.Label(self.news_inner, text=f"Loading news: {topic}…",
                  fg=FG_DIM, bg=BG, font=FONT_MONO, pady=20).pack()
         self.status_var.set(f"Fetching news: {topic}…")
-        threading.Thread(target=self._fetch_news, args=(topic,), daemon=True).start()
+        q = urllib.parse.quote(topic)
+        url = f"https://news.google.com/rss/search?q={q}&hl=en-US&gl=US&ceid=US:en"
+        bridge(self, self.pool.submit(get_provider().news, url, priority=VISIBLE, key="news"),
+               lambda feed, err: self._on_news(feed, err, topic))
 
-    def _fetch_news(self, topic):
-        try:
-            q = urllib.parse.quote(topic)
-            url = f"https://news.google.com/rss/search?q={q}&hl=en-US&gl=US&ceid=US:en"
-            feed = feedparser.parse(url)
-            self.after(0, lambda: self._populate_news(feed.entries[:16], topic))
-        except Exception as e:
-            self.after(0, lambda: self.status_var.set(f"News error: {e}"))
+    def _on_news(self, feed, err, topic):
+        if topic != self.news_topic.get():
+            return
+        if err is not None:
+            self.status_var.set(f"News error: {err}")
+            return
+        self._populate_news(feed.entries[:16], topic)
 
     def _populate_news(self, entries, topic):
         for w in self.news_inner.winfo_children():
@@ -1130,6 +1225,11 @@ class InvestaurPro(tk.Tk):
         ctrl.pack(fill="x")
         tk.Label(ctrl, text="TECHNICAL ANALYSIS", fg=ACCENT, bg=BG, font=FONT_TITLE).pack(side="left")
         self._btn(ctrl, "▶ RUN ANALYSIS", self._run_ai, ACCENT, BG).pack(side="right")
+        self._btn(ctrl, "⚡ SCAN", self._run_scan, PANEL, ACCENT).pack(side="right", padx=6)
+        self._scan_universe = tk.StringVar(value="S&P 100")
+        ttk.Combobox(ctrl, textvariable=self._scan_universe, values=["Watchlist", "My Portfolio", "S&P 100", "File…"],
+                     font=("Consolas", 9), width=13, state="readonly").pack(side="right")
+        tk.Label(ctrl, text="Scan:", fg=FG_DIM, bg=BG, font=("Consolas", 9)).pack(side="right", padx=(0, 4))
         tk.Label(tab, text="Statistical analysis via technical indicators. NOT financial advice.",
                  fg=FG_DIM, bg=BG, font=("Consolas", 9), padx=14).pack(anchor="w", pady=(0, 6))
         outer, self.ai_inner, _ = scrollable(tab)
@@ -1137,51 +1237,128 @@ class InvestaurPro(tk.Tk):
 
     def _run_ai(self):
         sym = self.current_sym.get().upper()
+        self._ai_widgets = None
         for w in self.ai_inner.winfo_children():
             w.destroy()
         tk.Label(self.ai_inner, text=f"Computing analysis for {sym}…",
                  fg=FG_DIM, bg=BG, font=FONT_MONO, pady=20).pack()
-        threading.Thread(target=self._fetch_ai, args=(sym,), daemon=True).start()
+        self.pool.submit(self._fetch_ai, sym, priority=USER, key="ai")
+
+    def _run_scan(self):
+        uv = self._scan_universe.get()
+        if uv == "File…":
+            path = filedialog.askopenfilename(title="Ticker list", filetypes=[("Text", "*.txt *.csv"), ("All", "*")])
+            if not path:
+                return
+            try:
+                syms = scan.read_symbols(path)
+            except OSError as e:
+                messagebox.showerror("Scan", str(e))
+                return
+        else:
+            syms = (self.watchlist.symbols[:] if uv == "Watchlist" else
+                    list(self.portfolio.holdings) if uv == "My Portfolio" else self.SP100)
+        if not syms:
+            self.status_var.set("No symbols in selected universe.")
+            return
+        self._ai_widgets = None
+        for w in self.ai_inner.winfo_children():
+            w.destroy()
+        tk.Label(self.ai_inner, text=f"Scanning {len(syms)} symbols…",
+                 fg=FG_DIM, bg=BG, font=FONT_MONO, pady=20).pack()
+        self.pool.submit(self._fetch_scan, syms, priority=USER, key="ai")
+
+    def _fetch_scan(self, syms):
+        try:
+            table = scan.scan(syms)
+            self.after(0, lambda: self._render_scan(table, len(syms)))
+        except Exception as e:
+            self.after(0, lambda: self.status_var.set(f"Scan error: {e}"))
+
+    def _render_scan(self, t, asked):
+        """Ranked bullish → bearish table of a universe scan; double-click a row for its full Insight."""
+        for w in self.ai_inner.winfo_children():
+            w.destroy()
+        n = len(t["symbol"])
+        bulls = int((t["pct"] >= 56).sum())
+        bears = int((t["pct"] < 44).sum())
+        tk.Label(self.ai_inner, text=f"{n} of {asked} symbols scored  ·  {bulls} bullish  ·  {bears} bearish  "
+                                     f"·  double-click a row for its full analysis",
+                 fg=FG_DIM, bg=BG, font=("Consolas", 9)).pack(anchor="w", pady=(0, 6))
+        cols = [("symbol", "Ticker", 80), ("score", "Score", 60), ("direction", "Signal", 130),
+                ("curr", "Price", 90), ("rsi", "RSI", 60), ("mom_1m", "1M %", 70), ("mom_3m", "3M %", 70),
+                ("mom_1y", "1Y %", 70)] + [(i, name, 58) for i, name in enumerate(
+                    ("SMA20", "SMA50", "SMA200", "RSI<70", "RSI>30", "MACD", "BB mid", "1M +", "3M +"))]
+        tree = ttk.Treeview(self.ai_inner, columns=[str(k) for k, _, _ in cols], show="headings",
+                            height=min(max(n, 5), 30))
+        for k, title, w in cols:
+            tree.heading(str(k), text=title, command=lambda k=k: sort_by(k))
+            tree.column(str(k), width=w, anchor="center")
+        for tag, color in (("bull", POS), ("neutral", ORANGE), ("bear", NEG)):
+            tree.tag_configure(tag, foreground=color)
+        order = {"key": "score", "desc": True}
+
+        def value(k, i):
+            return t["checks"][i, k] if isinstance(k, int) else t[k][i]
+
+        def render():
+            rows = sorted(range(n), key=lambda i: value(order["key"], i), reverse=order["desc"])
+            tree.delete(*tree.get_children())
+            for i in rows:
+                pct = t["pct"][i]
+                tree.insert("", "end", iid=t["symbol"][i], tags=("bull" if pct >= 56 else "neutral" if pct >= 44 else "bear",),
+                            values=[t["symbol"][i], f"{t['score'][i]}/{len(scan.SIGNALS)}", t["direction"][i],
+                                    f"{t['curr'][i]:,.2f}", f"{t['rsi'][i]:.1f}", f"{t['mom_1m'][i]:+.1f}",
+                                    f"{t['mom_3m'][i]:+.1f}", f"{t['mom_1y'][i]:+.1f}"]
+                                   + ["✓" if c else "✗" for c in t["checks"][i]])
+
+        def sort_by(k):
+            order["desc"] = not order["desc"] if order["key"] == k else True
+            order["key"] = k
+            render()
+
+        def open_row(_):
+            sel = tree.selection()
+            if sel:
+                self.current_sym.set(sel[0])
+                self._run_ai()
+
+        tree.bind("<Double-1>", open_row)
+        tree.pack(fill="x")
+        render()
+        self.status_var.set(f"Scan complete: {n} symbols")
 
     def _fetch_ai(self, sym):
         try:
-            t = yf.Ticker(sym)
-            hist = t.history(period="2y")
-            info = t.info
+            hist = bars.history(sym, "2y")
             if hist.empty or len(hist) < 20:
                 raise ValueError("Not enough data.")
-            self.after(0, lambda: self._render_ai(sym, hist["Close"].values.astype(float), hist, info))
+            closes = hist["Close"].values.astype(float)
+            m = indicator_cache.get(sym, "1d", last_bar(hist), "insight", lambda: self._ai_metrics(closes),
+                                    period="2y")
+            stream = ind.InsightStream(closes, hist.index[-1].date())
+            self.after(0, lambda: self._render_ai(sym, closes, hist, m, stream))
         except Exception as e:
             self.after(0, lambda: self.status_var.set(f"AI error: {e}"))
 
-    def _render_ai(self, sym, closes, hist, info):
-        for w in self.ai_inner.winfo_children():
-            w.destroy()
-
+    @staticmethod
+    def _ai_metrics(closes):
+        """Indicator math behind the Insight tab, kept free of Tk so it can be benchmarked headless."""
         curr  = closes[-1]
-        sma20  = np.mean(closes[-20:])
-        sma50  = np.mean(closes[-50:]) if len(closes) >= 50 else None
-        sma200 = np.mean(closes[-200:]) if len(closes) >= 200 else None
-
-        # RSI
-        delta = np.diff(closes)
-        avg_g = np.mean(np.maximum(delta[-14:], 0)) if len(delta) >= 14 else 1e-9
-        avg_l = np.mean(np.maximum(-delta[-14:], 0)) if len(delta) >= 14 else 1e-9
-        rsi   = 100 - (100 / (1 + avg_g / max(avg_l, 1e-9)))
-
-        # MACD
-        def ema(s, n):
-            k = 2/(n+1); e = [s[0]]
-            for p in s[1:]: e.append(p*k + e[-1]*(1-k))
-            return np.array(e)
-        macd_line  = ema(closes, 12) - ema(closes, 26)
-        signal_line = ema(macd_line, 9)
-        macd_hist   = macd_line - signal_line
-
-        # Bollinger
-        bb_mean = np.mean(closes[-20:])
-        bb_std  = np.std(closes[-20:])
-        bb_up, bb_lo = bb_mean + 2*bb_std, bb_mean - 2*bb_std
+        sma   = {n: ind.sma(closes, n) for n in (20, 50, 200)}
+        sma20  = sma[20][-1]
+        sma50  = sma[50][-1] if len(closes) >= 50 else None
+        sma200 = sma[200][-1] if len(closes) >= 200 else None
+
+        # RSI (Wilder); neutral until there are 14 changes
+        rsi = ind.rsi(closes, 14)[-1]
+        rsi = 50.0 if np.isnan(rsi) else float(rsi)
+
+        macd_line, signal_line, macd_hist = ind.macd(closes)
+
+        # Bollinger (20, 2)
+        bb_mid, bb_upper, bb_lower = ind.bollinger(closes, 20, 2)
+        bb_mean, bb_up, bb_lo = bb_mid[-1], bb_upper[-1], bb_lower[-1]
 
         # Metrics
         returns = np.diff(closes) / closes[:-1]
@@ -1191,71 +1368,82 @@ class InvestaurPro(tk.Tk):
         mom_3m  = (curr/closes[-63]-1)*100  if len(closes)>=63  else 0
         mom_6m  = (curr/closes[-126]-1)*100 if len(closes)>=126 else 0
         mom_1y  = (curr/closes[-252]-1)*100 if len(closes)>=252 else 0
-        max_dd  = self._max_drawdown(closes)
-
+        max_dd  = ind.max_drawdown(closes)
+        return dict(curr=curr, sma20=sma20, sma50=sma50, sma200=sma200, rsi=rsi, sma=sma,
+                    macd_line=macd_line, signal_line=signal_line, macd_hist=macd_hist,
+                    macd=macd_line[-1], macd_signal=signal_line[-1],
+                    bb_mean=bb_mean, bb_up=bb_up, bb_lo=bb_lo, bb_upper=bb_upper, bb_lower=bb_lower,
+                    vol_ann=vol_ann, sharpe=sharpe,
+                    mom_1m=mom_1m, mom_3m=mom_3m, mom_6m=mom_6m, mom_1y=mom_1y, max_dd=max_dd)
+
+    @staticmethod
+    def _ai_signals(m):
+        """The nine checklist signals, bullish count/percent, direction label and colour for a metrics dict."""
+        curr, sma50, sma200, rsi = m["curr"], m["sma50"], m["sma200"], m["rsi"]
         signals = {
-            "Price > SMA20":     curr > sma20,
+            "Price > SMA20":     curr > m["sma20"],
             "Price > SMA50":     sma50 is not None and curr > sma50,
             "Price > SMA200":    sma200 is not None and curr > sma200,
             "RSI < 70 (not OB)": rsi < 70,
             "RSI > 30 (not OS)": rsi > 30,
-            "MACD Bullish":      float(macd_line[-1]) > float(signal_line[-1]),
-            "Price above BB Mid":curr > bb_mean,
-            "1M Momentum +":     mom_1m > 0,
-            "3M Momentum +":     mom_3m > 0,
+            "MACD Bullish":      float(m["macd"]) > float(m["macd_signal"]),
+            "Price above BB Mid":curr > m["bb_mean"],
+            "1M Momentum +":     m["mom_1m"] > 0,
+            "3M Momentum +":     m["mom_3m"] > 0,
         }
         bull_count = sum(signals.values())
         bull_pct   = bull_count / len(signals) * 100
-        direction  = ("STRONG BULLISH" if bull_pct >= 78 else "BULLISH" if bull_pct >= 56 else
-                      "NEUTRAL" if bull_pct >= 44 else "BEARISH" if bull_pct >= 22 else "STRONG BEARISH")
+        direction  = scan.direction(bull_pct)
         dir_color  = POS if bull_pct >= 56 else (ORANGE if bull_pct >= 44 else NEG)
+        return signals, bull_count, bull_pct, direction, dir_color
+
+    def _render_ai(self, sym, closes, hist, m, stream):
+        for w in self.ai_inner.winfo_children():
+            w.destroy()
+
+        sma50, sma200 = m["sma50"], m["sma200"]
+        macd_line, signal_line, macd_hist = m["macd_line"], m["signal_line"], m["macd_hist"]
+        # Live quotes update the cards below through the symbol's stream; the chart stays as drawn.
+        for old in [s for s in self._streams if s not in self.watchlist.symbols]:
+            del self._streams[old]
+        self._streams[sym] = stream
+        w = self._ai_widgets = {"sym": sym}
 
         # Signal card + RSI card
         top = tk.Frame(self.ai_inner, bg=BG)
         top.pack(fill="x", pady=(0, 10))
 
-        sig = tk.Frame(top, bg=CARD, padx=26, pady=20,
-                        highlightbackground=dir_color, highlightthickness=2)
+        sig = w["sig"] = tk.Frame(top, bg=CARD, padx=26, pady=20, highlightthickness=2)
         sig.pack(side="left", padx=(0, 10))
         tk.Label(sig, text=sym, fg=FG_DIM, bg=CARD, font=FONT_SMALL).pack()
-        tk.Label(sig, text=direction, fg=dir_color, bg=CARD, font=("Courier", 19, "bold")).pack(pady=4)
-        tk.Label(sig, text=f"{bull_count}/{len(signals)} signals bullish  ({bull_pct:.0f}%)",
-                 fg=FG, bg=CARD, font=("Consolas", 10)).pack()
+        w["direction"] = tk.Label(sig, bg=CARD, font=("Courier", 19, "bold"))
+        w["direction"].pack(pady=4)
+        w["count"] = tk.Label(sig, fg=FG, bg=CARD, font=("Consolas", 10))
+        w["count"].pack()
         bar_f = tk.Frame(sig, bg=PANEL, width=200, height=7)
         bar_f.pack(pady=(8, 0))
         bar_f.pack_propagate(False)
-        fill_w = max(1, int(200 * bull_pct / 100))
-        tk.Frame(bar_f, bg=dir_color, width=fill_w, height=7).place(x=0, y=0)
+        w["bar"] = tk.Frame(bar_f, height=7)
+        w["bar"].place(x=0, y=0)
 
-        rsi_col = POS if 30 < rsi < 70 else (ORANGE if rsi <= 30 else NEG)
-        rsi_lbl = "NEUTRAL" if 30 < rsi < 70 else ("OVERSOLD" if rsi <= 30 else "OVERBOUGHT")
         rsi_card = tk.Frame(top, bg=CARD, padx=20, pady=20,
                              highlightbackground=BORDER, highlightthickness=1)
         rsi_card.pack(side="left", padx=(0, 10))
         tk.Label(rsi_card, text="RSI (14)", fg=FG_DIM, bg=CARD, font=FONT_SMALL).pack()
-        tk.Label(rsi_card, text=f"{rsi:.1f}", fg=rsi_col, bg=CARD, font=("Courier",28,"bold")).pack()
-        tk.Label(rsi_card, text=rsi_lbl, fg=rsi_col, bg=CARD, font=FONT_SMALL).pack()
+        w["rsi"] = tk.Label(rsi_card, bg=CARD, font=("Courier",28,"bold"))
+        w["rsi"].pack()
+        w["rsi_lbl"] = tk.Label(rsi_card, bg=CARD, font=FONT_SMALL)
+        w["rsi_lbl"].pack()
 
         # Metrics grid
         mf = tk.Frame(top, bg=BG)
         mf.pack(side="left", fill="both", expand=True)
-        metrics = [
-            ("Volatility Ann",    f"{vol_ann:.1f}%",       FG),
-            ("Sharpe Ratio",      f"{sharpe:.2f}",          POS if sharpe>1 else (ORANGE if sharpe>0 else NEG)),
-            ("Max Drawdown",      f"{max_dd:.1f}%",         NEG if max_dd<-10 else ORANGE),
-            ("BB Upper",          f"${bb_up:.2f}",          FG),
-            ("BB Lower",          f"${bb_lo:.2f}",          FG),
-            ("MACD",              f"{float(macd_line[-1]):.3f}", POS if float(macd_line[-1])>0 else NEG),
-            ("1M Return",         f"{mom_1m:+.2f}%",        POS if mom_1m>=0 else NEG),
-            ("3M Return",         f"{mom_3m:+.2f}%",        POS if mom_3m>=0 else NEG),
-            ("6M Return",         f"{mom_6m:+.2f}%",        POS if mom_6m>=0 else NEG),
-            ("1Y Return",         f"{mom_1y:+.2f}%",        POS if mom_1y>=0 else NEG),
-            ("SMA 20",            f"${sma20:.2f}",           POS if curr>sma20 else NEG),
-            ("SMA 50",            f"${sma50:.2f}" if sma50 else "N/A", POS if sma50 and curr>sma50 else NEG),
-        ]
-        for i, (lbl, val, col) in enumerate(metrics):
-            stat_card(mf, lbl, val, col).grid(row=i//4, column=i%4, padx=3, pady=3, sticky="nsew")
+        w["metrics"] = []
+        for i, (lbl, _, _) in enumerate(self._ai_cards(m)):
+            card = stat_card(mf, lbl, "")
+            card.grid(row=i//4, column=i%4, padx=3, pady=3, sticky="nsew")
             mf.columnconfigure(i%4, weight=1)
+            w["metrics"].append(card.value_label)
 
         # Signal checklist
         sf = tk.Frame(self.ai_inner, bg=CARD, padx=18, pady=14)
@@ -1263,12 +1451,15 @@ class InvestaurPro(tk.Tk):
         tk.Label(sf, text="SIGNAL BREAKDOWN", fg=FG_DIM, bg=CARD, font=FONT_SMALL).pack(anchor="w", pady=(0, 8))
         grid_f = tk.Frame(sf, bg=CARD)
         grid_f.pack(fill="x")
-        for i, (name, is_bull) in enumerate(signals.items()):
+        w["signals"] = []
+        for i in range(len(self._ai_signals(m)[0])):
             cell = tk.Frame(grid_f, bg=PANEL, padx=10, pady=8)
             cell.grid(row=i//3, column=i%3, padx=4, pady=3, sticky="nsew")
-            tk.Label(cell, text=f"{'✓' if is_bull else '✗'}  {name}",
-                     fg=POS if is_bull else NEG, bg=PANEL, font=("Consolas", 9)).pack(anchor="w")
+            lbl = tk.Label(cell, bg=PANEL, font=("Consolas", 9))
+            lbl.pack(anchor="w")
+            w["signals"].append(lbl)
             grid_f.columnconfigure(i%3, weight=1)
+        self._fill_ai(m)
 
         # Chart: price + SMAs + Bollinger / MACD
         fig_ai = Figure(figsize=(14, 5), facecolor=BG)
@@ -1282,18 +1473,14 @@ class InvestaurPro(tk.Tk):
         xs = hist.index[-n:]
         ax_p.plot(xs, closes[-n:], color=FG_DIM, linewidth=1.2, label="Price")
 
-        if len(closes) >= 20:
-            ma20 = np.convolve(closes, np.ones(20)/20, "valid")
-            ax_p.plot(hist.index[19:][-len(ma20):], ma20[-min(n,len(ma20)):],
-                      color=BLUE, linewidth=1, label="SMA20")
+        # The SMA series are NaN until their window fills, which matplotlib leaves blank.
+        ax_p.plot(xs, m["sma"][20][-n:], color=BLUE, linewidth=1, label="SMA20")
         if sma50:
-            ma50 = np.convolve(closes, np.ones(50)/50, "valid")
-            ax_p.plot(hist.index[49:][-len(ma50):], ma50, color=ACCENT, linewidth=1, label="SMA50")
+            ax_p.plot(xs, m["sma"][50][-n:], color=ACCENT, linewidth=1, label="SMA50")
         if sma200:
-            ma200 = np.convolve(closes, np.ones(200)/200, "valid")
-            ax_p.plot(hist.index[199:][-len(ma200):], ma200, color=ACCENT2, linewidth=1, label="SMA200")
+            ax_p.plot(xs, m["sma"][200][-n:], color=ACCENT2, linewidth=1, label="SMA200")
 
-        ax_p.fill_between(xs, bb_up, bb_lo, alpha=0.05, color=BLUE, label="Bollinger")
+        ax_p.fill_between(xs, m["bb_upper"][-n:], m["bb_lower"][-n:], alpha=0.05, color=BLUE, label="Bollinger")
         ax_p.legend(fontsize=7, facecolor=PANEL, labelcolor=FG, edgecolor=BORDER, ncol=5)
         ax_p.set_title(f"{sym} — Technical  (1Y shown)", color=FG_DIM, fontsize=9)
         ax_p.yaxis.tick_right()
@@ -1312,15 +1499,49 @@ class InvestaurPro(tk.Tk):
         c_ai = FigureCanvasTkAgg(fig_ai, master=self.ai_inner)
         c_ai.get_tk_widget().pack(fill="x", pady=(0, 10))
         c_ai.draw()
-        self.status_var.set(f"AI analysis complete: {sym}")
+        cs = indicator_cache.stats()
+        self.status_var.set(f"AI analysis complete: {sym}  ·  indicator cache {cs['size']} results, "
+                            f"{cs['bytes'] / 2**20:.1f} MB, {cs['hit_rate']:.0%} hits")
+
+    @staticmethod
+    def _ai_cards(m):
+        """(label, text, colour) for each metric card."""
+        curr, sma20, sma50, sharpe, max_dd = m["curr"], m["sma20"], m["sma50"], m["sharpe"], m["max_dd"]
+        macd = float(m["macd"])
+        return [
+            ("Volatility Ann",    f"{m['vol_ann']:.1f}%",   FG),
+            ("Sharpe Ratio",      f"{sharpe:.2f}",          POS if sharpe>1 else (ORANGE if sharpe>0 else NEG)),
+            ("Max Drawdown",      f"{max_dd:.1f}%",         NEG if max_dd<-10 else ORANGE),
+            ("BB Upper",          f"${m['bb_up']:.2f}",     FG),
+            ("BB Lower",          f"${m['bb_lo']:.2f}",     FG),
+            ("MACD",              f"{macd:.3f}",            POS if macd>0 else NEG),
+            ("1M Return",         f"{m['mom_1m']:+.2f}%",   POS if m["mom_1m"]>=0 else NEG),
+            ("3M Return",         f"{m['mom_3m']:+.2f}%",   POS if m["mom_3m"]>=0 else NEG),
+            ("6M Return",         f"{m['mom_6m']:+.2f}%",   POS if m["mom_6m"]>=0 else NEG),
+            ("1Y Return",         f"{m['mom_1y']:+.2f}%",   POS if m["mom_1y"]>=0 else NEG),
+            ("SMA 20",            f"${sma20:.2f}",           POS if curr>sma20 else NEG),
+            ("SMA 50",            f"${sma50:.2f}" if sma50 else "N/A", POS if sma50 and curr>sma50 else NEG),
+        ]
+
+    def _fill_ai(self, m):
+        """Write a metrics dict (from _ai_metrics or an InsightStream) into the Insight cards."""
+        w = self._ai_widgets
+        signals, bull_count, bull_pct, direction, dir_color = self._ai_signals(m)
+        w["sig"].config(highlightbackground=dir_color)
+        w["direction"].config(text=direction, fg=dir_color)
+        w["count"].config(text=f"{bull_count}/{len(signals)} signals bullish  ({bull_pct:.0f}%)")
+        w["bar"].config(bg=dir_color, width=max(1, int(200 * bull_pct / 100)))
+
+        rsi = m["rsi"]
+        rsi_col = POS if 30 < rsi < 70 else (ORANGE if rsi <= 30 else NEG)
+        rsi_lbl = "NEUTRAL" if 30 < rsi < 70 else ("OVERSOLD" if rsi <= 30 else "OVERBOUGHT")
+        w["rsi"].config(text=f"{rsi:.1f}", fg=rsi_col)
+        w["rsi_lbl"].config(text=rsi_lbl, fg=rsi_col)
 
-    def _max_drawdown(self, prices):
-        peak, max_dd = prices[0], 0
-        for p in prices:
-            if p > peak: peak = p
-            dd = (p - peak) / peak * 100
-            if dd < max_dd: max_dd = dd
-        return max_dd
+        for lbl, (_, val, col) in zip(w["metrics"], self._ai_cards(m)):
+            lbl.config(text=val, fg=col)
+        for lbl, (name, is_bull) in zip(w["signals"], signals.items()):
+            lbl.config(text=f"{'✓' if is_bull else '✗'}  {name}", fg=POS if is_bull else NEG)
 
     # ═══════════════════════════════════════════════
     # TAB 7 — SIMULATOR
@@ -1351,7 +1572,15 @@ class InvestaurPro(tk.Tk):
 
         form = tk.Frame(left, bg=BG)
         form.pack(fill="x")
-        for lbl_text, attr, default in [("Ticker:", "sim_ticker", "AAPL"), ("Shares:", "sim_qty_e", "1")]:
+        row = tk.Frame(form, bg=BG, pady=4)
+        row.pack(fill="x")
+        tk.Label(row, text="Order:", fg=FG_DIM, bg=BG, font=("Consolas",10),
+                 width=9, anchor="w").pack(side="left")
+        self.sim_order_type = tk.StringVar(value=MARKET)
+        ttk.Combobox(row, textvariable=self.sim_order_type, values=list(ORDER_TYPES),
+                     font=("Consolas",10), width=16, state="readonly").pack(side="left")
+        for lbl_text, attr, default in [("Ticker:", "sim_ticker", "AAPL"), ("Shares:", "sim_qty_e", "1"),
+                                        ("Limit $:", "sim_limit_e", ""), ("Stop $:", "sim_stop_e", "")]:
             row = tk.Frame(form, bg=BG, pady=4)
             row.pack(fill="x")
             tk.Label(row, text=lbl_text, fg=FG_DIM, bg=BG, font=("Consolas",10),
@@ -1369,12 +1598,18 @@ class InvestaurPro(tk.Tk):
         self._btn(btn_row, "SELL",   self._sim_sell,         NEG,   BG).pack(side="left", padx=(0, 6))
         self._btn(btn_row, "VALUE",  self._sim_update_value, PANEL, FG).pack(side="left")
 
-        self._btn(left, "RESET ACCOUNT", self._sim_reset, PANEL, NEG).pack(anchor="w", pady=4)
+        reset_row = tk.Frame(left, bg=BG)
+        reset_row.pack(fill="x", pady=4)
+        self._btn(reset_row, "RESET ACCOUNT", self._sim_reset, PANEL, NEG).pack(side="left")
+        self._btn(reset_row, "BACKTEST", self._sim_backtest, PANEL, ACCENT).pack(side="left", padx=(6, 0))
 
         divider(left)
         tk.Label(left, text="OPEN POSITIONS", fg=FG_DIM, bg=BG, font=FONT_SMALL).pack(anchor="w", pady=(0, 4))
         self.sim_pos_frame = tk.Frame(left, bg=BG)
         self.sim_pos_frame.pack(fill="x")
+        tk.Label(left, text="OPEN ORDERS", fg=FG_DIM, bg=BG, font=FONT_SMALL).pack(anchor="w", pady=(8, 4))
+        self.sim_orders_frame = tk.Frame(left, bg=BG)
+        self.sim_orders_frame.pack(fill="x")
 
         # Right
         right = tk.Frame(pane, bg=BG)
@@ -1393,6 +1628,8 @@ class InvestaurPro(tk.Tk):
         lf.pack(fill="x")
         tk.Label(lf, text="TRADE LOG", fg=FG_DIM, bg=BG, font=FONT_SMALL).pack(side="left")
         self._btn(lf, "CLEAR", self._sim_clear_log, PANEL, FG).pack(side="right")
+        for label, days in [("ALL", None), ("1M", 30), ("1W", 7), ("1D", 1)]:
+            self._btn(lf, label, lambda d=days: self._sim_load_log(d), PANEL, FG_DIM).pack(side="right", padx=(0, 4))
 
         self.sim_log = tk.Text(right, bg=CARD, fg=FG, font=("Consolas", 9),
                                 borderwidth=0, state="disabled", wrap="word",
@@ -1403,6 +1640,9 @@ class InvestaurPro(tk.Tk):
         self.sim_log.tag_configure("ts",   foreground=FG_DIM)
         self.sim_log.tag_configure("fail", foreground=NEG)
 
+        self._sim_load_log(None)
+        self._sim_update_positions()
+        self._sim_update_orders()
         self._sim_refresh_values()
 
     def _sim_edit_cash(self):
@@ -1422,7 +1662,7 @@ class InvestaurPro(tk.Tk):
                 val = float(e.get().replace(",", ""))
                 if val < 0:
                     raise ValueError("Cash cannot be negative.")
-                self.simulator.cash = val
+                self.simulator.set_cash(val)
                 dlg.destroy()
                 self.sim_cash_lbl.config(text=f"Current Cash Balance:  ${self.simulator.cash:,.2f}")
                 self._sim_refresh_values()
@@ -1442,35 +1682,91 @@ class InvestaurPro(tk.Tk):
         try:
             q = float(self.sim_qty_e.get())
             if q <= 0: raise ValueError
+            limit, stop = (float(e.get()) if e.get().strip() else None for e in (self.sim_limit_e, self.sim_stop_e))
         except ValueError:
-            messagebox.showerror("Error", "Enter a valid positive quantity.")
+            messagebox.showerror("Error", "Enter a valid positive quantity and prices.")
+            return
+        kind = self.sim_order_type.get()
+        if kind != MARKET:
+            # Resting orders need no price now; they fill from the quote bus.
+            ok, msg = self.simulator.place_order(t, BUY_SIDE if action == "buy" else SELL_SIDE, q, kind, limit, stop)
+            self._sim_result(ok, msg, action)
+            self.scheduler.refresh_now("orders")
             return
         self.status_var.set(f"Fetching price for {t}…")
-        threading.Thread(target=self._do_sim_trade, args=(t, q, action), daemon=True).start()
+        self.pool.submit(self._do_sim_trade, t, q, action, priority=USER)
 
     def _do_sim_trade(self, t, q, action):
         try:
-            d = yf.Ticker(t).history(period="1d")
-            if d.empty: raise ValueError("No price data.")
-            p = float(d["Close"].iloc[-1])
-            ok, msg = (self.simulator.buy if action=="buy" else self.simulator.sell)(t, p, q)
-            self.after(0, lambda: self._sim_result(ok, msg, action))
+            quote = quote_bus.prices([t]).get(t)
+            if not quote: raise ValueError("No price data.")
+            p = quote[0]
+            # Execute on the Tk thread, where resting orders are matched too.
+            self.after(0, lambda: self._sim_result(
+                *(self.simulator.buy if action=="buy" else self.simulator.sell)(t, p, q), action))
         except Exception as e:
             self.after(0, lambda: messagebox.showerror("Trade Error", str(e)))
 
+    def _on_order_quote(self, q):
+        events = self.simulator.match(q.symbol, q.price)
+        if not events:
+            return
+        for ok, msg, side in events:
+            self._sim_log_line(datetime.now(), msg, side if ok else "fail")
+            self.status_var.set(msg)
+        self.sim_cash_lbl.config(text=f"Current Cash Balance:  ${self.simulator.cash:,.2f}")
+        self._sim_update_positions()
+        self._sim_update_orders()
+
+    def _sim_update_orders(self):
+        for w in self.sim_orders_frame.winfo_children():
+            w.destroy()
+        orders = self.simulator.orders.open_orders()
+        if not orders:
+            tk.Label(self.sim_orders_frame, text="No open orders.", fg=FG_DIM, bg=BG,
+                     font=("Consolas", 9)).pack(anchor="w")
+            return
+        for o in orders:
+            row = tk.Frame(self.sim_orders_frame, bg=PANEL, pady=2, padx=8)
+            row.pack(fill="x", pady=1)
+            tk.Label(row, text=o.describe() + ("  (triggered)" if o.triggered else ""),
+                     fg=POS if o.side == BUY_SIDE else NEG, bg=PANEL, font=("Consolas", 8)).pack(side="left")
+            self._btn(row, "✕", lambda oid=o.id: self._sim_cancel_order(oid), PANEL, FG_DIM).pack(side="right")
+
+    def _sim_cancel_order(self, oid):
+        ok, msg = self.simulator.cancel_order(oid)
+        self._sim_log_line(datetime.now(), msg, "ts")
+        self.status_var.set(msg)
+        self._sim_update_orders()
+
     def _sim_buy(self):  self._sim_trade("buy")
     def _sim_sell(self): self._sim_trade("sell")
 
-    def _sim_result(self, ok, msg, action):
-        tag = action.upper() if ok else "fail"
+    def _sim_log_line(self, when, msg, tag):
+        """Prepend one entry to the trade log, keeping at most SIM_LOG_LINES entries in the widget."""
         self.sim_log.config(state="normal")
-        ts = datetime.now().strftime("%H:%M:%S")
         self.sim_log.insert("1.0", "\n")
         self.sim_log.insert("1.0", msg + "\n", tag)
-        self.sim_log.insert("1.0", f"[{ts}]  ", "ts")
+        self.sim_log.insert("1.0", f"[{when.strftime('%m-%d %H:%M:%S')}]  ", "ts")
+        self.sim_log.delete(f"{2 * SIM_LOG_LINES + 1}.0", "end")
         self.sim_log.config(state="disabled")
+
+    def _sim_load_log(self, days):
+        """Fill the trade log from the ledger: the newest SIM_LOG_LINES trades of the last `days` days."""
+        since = None if days is None else datetime.now().timestamp() - days * 86_400
+        self.sim_log.config(state="normal")
+        self.sim_log.delete("1.0", "end")
+        self.sim_log.config(state="disabled")
+        tags = {BUY: "BUY", SELL: "SELL"}
+        for rec in self.simulator.trades(since, SIM_LOG_LINES):
+            self._sim_log_line(datetime.fromtimestamp(float(rec["ts"])), describe(rec), tags.get(int(rec["kind"]), "ts"))
+
+    def _sim_result(self, ok, msg, action):
+        tag = action.upper() if ok else "fail"
+        self._sim_log_line(datetime.now(), msg, tag)
         self.sim_cash_lbl.config(text=f"Current Cash Balance:  ${self.simulator.cash:,.2f}")
         self._sim_update_positions()
+        self._sim_update_orders()
         if not ok:
             messagebox.showwarning("Trade Failed", msg)
         self.status_var.set(msg)
@@ -1491,22 +1787,28 @@ class InvestaurPro(tk.Tk):
                      fg=FG, bg=PANEL, font=("Consolas",9)).pack(side="left")
 
     def _sim_update_value(self):
-        threading.Thread(target=self._fetch_sim_value, daemon=True).start()
+        self.pool.submit(self._fetch_sim_value, priority=VISIBLE, key="sim-value")
 
     def _fetch_sim_value(self):
         val = self.simulator.portfolio_value()
+        self.after(0, lambda: self._show_sim_value(val))
+
+    def _apply_sim_quotes(self, quotes):
+        self._show_sim_value(self.simulator.portfolio_value(quotes))
+
+    def _show_sim_value(self, val):
         pnl = val - self.simulator.start_cash
         sign = "+" if pnl >= 0 else ""
         pc   = POS if pnl >= 0 else NEG
-        self.after(0, lambda: [
-            self.sim_port_lbl.config(text=f"Total Value of Assets:  ${val:,.2f}",
-                                      fg=POS if val >= self.simulator.start_cash else NEG),
-            self.sim_pnl_lbl.config(text=f"P&L:  {sign}${abs(pnl):,.2f}  ({sign}{pnl/self.simulator.start_cash*100:.2f}%)",
-                                     fg=pc)
-        ])
+        self.sim_port_lbl.config(text=f"Total Value of Assets:  ${val:,.2f}",
+                                 fg=POS if val >= self.simulator.start_cash else NEG)
+        ytd = self.simulator.book.realized_ytd()
+        self.sim_pnl_lbl.config(text=f"P&L:  {sign}${abs(pnl):,.2f}  ({sign}{pnl/self.simulator.start_cash*100:.2f}%)"
+                                     f"   ·   Realized YTD {'+' if ytd >= 0 else '-'}${abs(ytd):,.2f}",
+                                fg=pc)
         self._sim_value_history.append(val)
         self._sim_time_history.append(datetime.now())
-        self.after(0, self._sim_update_chart)
+        self._sim_update_chart()
 
     def _sim_update_chart(self):
         self.sim_ax.clear()
@@ -1521,16 +1823,15 @@ class InvestaurPro(tk.Tk):
         self.sim_canvas.draw()
 
     def _sim_reset(self):
-        if messagebox.askyesno("Reset", "Reset paper trading account to $100,000?"):
-            self.simulator = SimulatorState()
+        if messagebox.askyesno("Reset", "Reset paper trading account to $100,000?\nPast trades stay in the ledger."):
+            self.simulator.reset()
             self._sim_value_history = [self.simulator.cash]
             self._sim_time_history  = [datetime.now()]
             self.sim_cash_lbl.config(text=f"Current Cash Balance:  ${self.simulator.cash:,.2f}")
             self.sim_pnl_lbl.config(text="P&L:  $0.00")
             self.sim_port_lbl.config(text="Total Value of Assets:  —")
-            self.sim_log.config(state="normal")
-            self.sim_log.delete("1.0", "end")
-            self.sim_log.config(state="disabled")
+            self._sim_log_line(datetime.now(), f"Account reset to ${self.simulator.cash:,.2f}", "ts")
+            self._sim_update_orders()
             self._sim_update_positions()
             self._sim_update_chart()
 
@@ -1539,6 +1840,174 @@ class InvestaurPro(tk.Tk):
         self.sim_log.delete("1.0", "end")
         self.sim_log.config(state="disabled")
 
+    def _sim_backtest(self):
+        """Backtest dialog: a rule-based strategy over stored daily bars for a universe."""
+        dlg = tk.Toplevel(self)
+        dlg.title("Backtest")
+        dlg.geometry("1000x720")
+        dlg.configure(bg=BG)
+        ctl = tk.Frame(dlg, bg=PANEL, padx=10, pady=8)
+        ctl.pack(fill="x")
+        choices = {}
+        for label, values, default, width in [("Strategy:", list(backtest.STRATEGIES), "SMA 50/200 cross", 18),
+                                              ("Universe:", ["Watchlist", "My Portfolio", "S&P 100"], "Watchlist", 13),
+                                              ("Period:", ["1y", "2y", "5y", "10y", "max"], "10y", 5)]:
+            tk.Label(ctl, text=label, fg=FG_DIM, bg=PANEL, font=("Consolas", 9)).pack(side="left", padx=(0, 2))
+            choices[label] = tk.StringVar(value=default)
+            ttk.Combobox(ctl, textvariable=choices[label], values=values, font=("Consolas", 9),
+                         width=width, state="readonly").pack(side="left", padx=(0, 10))
+        tk.Label(ctl, text="Fee bps:", fg=FG_DIM, bg=PANEL, font=("Consolas", 9)).pack(side="left", padx=(0, 2))
+        fee_e = styled_entry(ctl, font=("Consolas", 9), bg=CARD, fg=FG, insertbackground=ACCENT, borderwidth=0, width=5)
+        fee_e.insert(0, "0")
+        fee_e.pack(side="left", padx=(0, 10))
+        grid_row = tk.Frame(dlg, bg=PANEL, padx=10, pady=4)
+        grid_row.pack(fill="x")
+        tk.Label(grid_row, text="Sweep grid:", fg=FG_DIM, bg=PANEL, font=("Consolas", 9)).pack(side="left", padx=(0, 2))
+        grid_e = styled_entry(grid_row, font=("Consolas", 9), bg=CARD, fg=FG, insertbackground=ACCENT, borderwidth=0, width=80)
+        grid_e.pack(side="left", padx=(0, 10), fill="x", expand=True)
+
+        def default_grid(*_):
+            g = backtest.GRIDS.get(choices["Strategy:"].get(), {})
+            grid_e.delete(0, "end")
+            grid_e.insert(0, "  ".join(f"{k}={','.join(map(str, v))}" for k, v in g.items()))
+        choices["Strategy:"].trace_add("write", default_grid)
+        default_grid()
+
+        stats_lbl = tk.Label(dlg, text="", fg=FG, bg=BG, font=("Consolas", 10), anchor="w", justify="left")
+        stats_lbl.pack(fill="x", padx=10, pady=6)
+        fig = Figure(figsize=(10, 3), facecolor=BG)
+        ax = fig.add_subplot(111)
+        self._style_ax(ax)
+        fig.subplots_adjust(left=0.08, right=0.98, top=0.9, bottom=0.12)
+        canvas = FigureCanvasTkAgg(fig, master=dlg)
+        canvas.get_tk_widget().pack(fill="x", padx=10)
+        cols = ("Symbol", "Entry", "Entry $", "Exit", "Exit $", "Shares", "P&L", "Return %", "Bars")
+        tree = ttk.Treeview(dlg, columns=cols, show="headings")
+        for c, w in zip(cols, [80, 100, 90, 100, 90, 90, 110, 90, 60]):
+            tree.heading(c, text=c)
+            tree.column(c, width=w, anchor="center")
+        tree.pack(fill="both", expand=True, padx=10, pady=8)
+
+        def show(res, err):
+            if not dlg.winfo_exists():
+                return
+            if err is not None:
+                stats_lbl.config(text=f"Backtest failed: {err}", fg=NEG)
+                return
+            st = res.stats
+            stats_lbl.config(fg=POS if st["total_return"] >= 0 else NEG, text=(
+                f"{len(res.symbols)} symbols · {len(res.dates)} bars   Return {st['total_return']:+.1f}%   "
+                f"CAGR {st['cagr']:+.1f}%   Vol {st['vol_ann']:.1f}%   Sharpe {st['sharpe']:.2f}   "
+                f"Max DD {st['max_dd']:.1f}%   Trades {st['trades']}   Win {st['win_rate']:.0f}%   "
+                f"Exposure {st['exposure']:.0f}%"))
+            ax.clear()
+            self._style_ax(ax)
+            start = res.equity[0]
+            color = POS if res.equity[-1] >= start else NEG
+            ax.plot(res.dates, res.equity, color=color, linewidth=1.5)
+            ax.axhline(start, color=BORDER, linewidth=0.8, linestyle="--")
+            ax.set_title(f"{choices['Strategy:'].get()} — Equity", color=FG_DIM, fontsize=9)
+            canvas.draw()
+            tree.delete(*tree.get_children())
+            t = res.trades
+            fmt = lambda d: str(d)[:10]
+            for i in range(len(t["pnl"]) - 1, max(len(t["pnl"]) - 2001, -1), -1):  # newest 2,000
+                tree.insert("", "end", values=(t["symbol"][i], fmt(t["entry"][i]), f"{t['entry_price'][i]:.2f}",
+                                               fmt(t["exit"][i]), f"{t['exit_price'][i]:.2f}", f"{t['shares'][i]:.4g}",
+                                               f"{t['pnl'][i]:+,.2f}", f"{t['pct'][i]:+.1f}", int(t["bars"][i])))
+
+        def inputs():
+            uv = choices["Universe:"].get()
+            syms = (self.watchlist.symbols[:] if uv == "Watchlist" else
+                    list(self.portfolio.holdings) if uv == "My Portfolio" else self.SP100)
+            try:
+                return syms, float(fee_e.get() or 0)
+            except ValueError:
+                messagebox.showerror("Invalid", "Fee must be a number of basis points.", parent=dlg)
+                return None, None
+
+        def run():
+            syms, fee = inputs()
+            if syms is None:
+                return
+            stats_lbl.config(text=f"Running over {len(syms)} symbols…", fg=FG_DIM)
+            fut = self.pool.submit(backtest.backtest, syms, choices["Strategy:"].get(), choices["Period:"].get(),
+                                   cash=self.simulator.start_cash, fee_bps=fee, priority=USER, key="backtest")
+            bridge(self, fut, show)
+
+        def run_sweep():
+            syms, fee = inputs()
+            if syms is None:
+                return
+            try:
+                spec = sweep.parse_grid(grid_e.get())
+            except ValueError:
+                messagebox.showerror("Invalid", "Grid format: name=v1,v2  name2=v1,v2", parent=dlg)
+                return
+            self._sim_sweep(choices["Strategy:"].get(), syms, choices["Period:"].get(), fee, spec)
+
+        self._btn(ctl, "RUN", run, ACCENT, BG).pack(side="left")
+        self._btn(grid_row, "SWEEP", run_sweep, PANEL, ACCENT).pack(side="left")
+
+    def _sim_sweep(self, strategy, syms, period, fee, spec):
+        """Results window for a parameter sweep; rows stream in as worker processes finish them."""
+        win = tk.Toplevel(self)
+        win.title(f"Sweep — {strategy}")
+        win.geometry("1000x560")
+        win.configure(bg=BG)
+        status = tk.Label(win, text=f"Loading bars for {len(syms)} symbols…", fg=FG_DIM, bg=BG,
+                          font=("Consolas", 10), anchor="w")
+        status.pack(fill="x", padx=10, pady=6)
+        stat_cols = [("total_return", "Return %"), ("cagr", "CAGR %"), ("sharpe", "Sharpe"), ("max_dd", "Max DD %"),
+                     ("vol_ann", "Vol %"), ("trades", "Trades"), ("win_rate", "Win %"), ("exposure", "Exposure %")]
+        cols = [(k, k) for k in spec] + stat_cols
+        tree = ttk.Treeview(win, columns=[k for k, _ in cols], show="headings")
+        rows, order = [], {"key": "sharpe", "desc": True}
+        total = len(sweep.grid(spec))
+
+        def render():
+            rows.sort(key=lambda r: r.get(order["key"], float("-inf")), reverse=order["desc"])
+            tree.delete(*tree.get_children())
+            for r in rows:
+                tree.insert("", "end", values=[f"{r[k]:.4g}" if isinstance(r.get(k), (int, float)) else r.get(k, "—")
+                                               for k, _ in cols])
+
+        def sort_by(key):
+            order["desc"] = not order["desc"] if order["key"] == key else True
+            order["key"] = key
+            render()
+
+        for k, title in cols:
+            tree.heading(k, text=title, command=lambda k=k: sort_by(k))
+            tree.column(k, width=90, anchor="center")
+        tree.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+        stop = threading.Event()
+        win.protocol("WM_DELETE_WINDOW", lambda: (stop.set(), win.destroy()))
+
+        def add(row):
+            if not win.winfo_exists():
+                return
+            rows.append(row)
+            status.config(text=f"{len(rows)}/{total} backtests · sorted by {order['key']}")
+            if not order.get("pending"):  # re-sort at most every 250 ms while rows pour in
+                order["pending"] = True
+                win.after(250, lambda: (order.pop("pending", None), render()))
+
+        def work():
+            try:
+                dates, symbols, closes = bars.matrix(syms, period)
+                if not symbols:
+                    raise ValueError("No price history for any of the symbols.")
+                self.after(0, lambda: win.winfo_exists() and status.config(
+                    text=f"Running {total} backtests over {len(symbols)} symbols × {len(dates)} bars…"))
+                for row in sweep.sweep(closes, strategy, spec, fee_bps=fee, stop=stop, dates=dates):
+                    self.after(0, lambda row=row: add(row))
+            except Exception as e:
+                self.after(0, lambda: win.winfo_exists() and status.config(text=f"Sweep failed: {e}", fg=NEG))
+
+        self.pool.submit(work, priority=USER)
+
     # ═══════════════════════════════════════════════
     # TAB 8 — DIVIDENDS
     # ═══════════════════════════════════════════════
@@ -1568,13 +2037,19 @@ class InvestaurPro(tk.Tk):
 
     def _refresh_dividends(self):
         self.status_var.set("Fetching dividend data…")
-        threading.Thread(target=self._fetch_dividends, daemon=True).start()
+        self.pool.submit(self._fetch_dividends, priority=VISIBLE, key="dividends")
 
     def _fetch_dividends(self):
         rows, total, monthly = [], 0.0, {}
-        for ticker, h in self.portfolio.holdings.items():
+        holdings = list(self.portfolio.holdings.items())
+        fields = ("dividendRate", "dividendYield", "exDividendDate")
+        infos = get_engine().map(lambda t: fundamentals.get(t, fields), [t for t, _ in holdings])
+        failed = 0
+        for (ticker, h), info in zip(holdings, infos):
+            if isinstance(info, Exception):
+                failed += 1
+                continue
             try:
-                info = yf.Ticker(ticker).info
                 rate  = info.get("dividendRate") or 0
                 yld   = info.get("dividendYield") or 0
                 ex_dt = info.get("exDividendDate","")
@@ -1592,11 +2067,11 @@ class InvestaurPro(tk.Tk):
                              f"${annual:.2f}" if annual>0 else "N/A",
                              f"{yld*100:.2f}%" if yld else "N/A",
                              str(ex_dt)[:10] if ex_dt else "N/A", freq))
-            except:
-                pass
-        self.after(0, lambda: self._populate_dividends(rows, total, monthly))
+            except (TypeError, ValueError, OSError):
+                failed += 1
+        self.after(0, lambda: self._populate_dividends(rows, total, monthly, failed))
 
-    def _populate_dividends(self, rows, total, monthly):
+    def _populate_dividends(self, rows, total, monthly, failed=0):
         for i in self.div_tree.get_children():
             self.div_tree.delete(i)
         for r in rows:
@@ -1622,7 +2097,7 @@ class InvestaurPro(tk.Tk):
         self.div_fig.patch.set_facecolor(BG)
         self.div_fig.subplots_adjust(left=0.05, right=0.98, top=0.9, bottom=0.2)
         self.div_canvas.draw()
-        self.status_var.set("Dividend data loaded.")
+        self.status_var.set("Dividend data loaded." + (f"  ·  {failed} holdings failed to load" if failed else ""))
 
     # ═══════════════════════════════════════════════
     # TAB 9 — SCREENER
@@ -1654,12 +2129,33 @@ class InvestaurPro(tk.Tk):
         tk.Label(ff, text="Universe:", fg=FG_DIM, bg=PANEL, font=("Consolas",9)).grid(row=1, column=10, padx=(8,2))
         self._screen_universe = tk.StringVar(value="S&P 100")
         ttk.Combobox(ff, textvariable=self._screen_universe,
-                     values=["S&P 100","My Portfolio","Watchlist","Tech Giants","Crypto"],
+                     values=["S&P 100", *UNIVERSE_FILES, "My Portfolio","Watchlist","Tech Giants","Crypto"],
                      font=("Consolas",9), width=14, state="readonly").grid(row=1, column=11, padx=4)
 
-        cols = ("Ticker","Name","Price","P/E","EPS","Div%","Beta","Mkt Cap","Sector")
+        # Technical criteria: evaluated together over the universe's stored close matrix (scan.py).
+        tk.Label(ff, text="TECHNICAL  (blank = off)", fg=FG_DIM, bg=PANEL, font=FONT_SMALL).grid(
+            row=2, column=0, sticky="w", columnspan=12, pady=(10, 6))
+        tdefs = [("RSI min","rsi_min"), ("RSI max","rsi_max"), ("Vol% max","vol_max"), ("Max DD% ≥","dd_min"),
+                 ("1M% min","mom_1m_min"), ("3M% min","mom_3m_min"), ("1Y% min","mom_1y_min")]
+        for i, (lbl, key) in enumerate(tdefs):
+            r, c = 3 + i // 5, (i % 5) * 2
+            tk.Label(ff, text=lbl+":", fg=FG_DIM, bg=PANEL,
+                     font=("Consolas",9)).grid(row=r, column=c, padx=(8,2), sticky="w")
+            e = styled_entry(ff, font=("Consolas",9), bg=CARD, fg=FG,
+                              insertbackground=ACCENT, borderwidth=0, width=8)
+            e.grid(row=r, column=c+1, padx=(0,10), pady=2)
+            self._screen_filters[key] = e
+        for i, key in enumerate(("sma50", "sma200")):
+            tk.Label(ff, text=f"vs {key.upper()}:", fg=FG_DIM, bg=PANEL,
+                     font=("Consolas",9)).grid(row=4, column=4 + i*2, padx=(8,2), sticky="w")
+            var = tk.StringVar(value="Any")
+            ttk.Combobox(ff, textvariable=var, values=["Any", "Above", "Below"],
+                         font=("Consolas",9), width=7, state="readonly").grid(row=4, column=5 + i*2, padx=(0,10))
+            self._screen_filters[key] = var
+
+        cols = self.SCREEN_COLS
         self.screen_tree = ttk.Treeview(tab, columns=cols, show="headings")
-        for c, w in zip(cols, [90,180,100,80,90,80,70,120,140]):
+        for c, w in zip(cols, [90,180,100,80,90,80,70,120,140,60,70,70,80]):
             self.screen_tree.heading(c, text=c,
                                       command=lambda col=c: self._sort_screener(col))
             self.screen_tree.column(c, width=w, anchor="center")
@@ -1673,17 +2169,29 @@ class InvestaurPro(tk.Tk):
              "KO","COST","WMT","MCD","CSCO","ABT","DHR","TMO","ACN","NEE",
              "DIS","NFLX","ADBE","CRM","ORCL","INTC","AMD","IBM","TXN","QCOM"]
 
+    SCREEN_COLS = ("Ticker","Name","Price","P/E","EPS","Div%","Beta","Mkt Cap","Sector",
+                   "RSI","3M%","Vol%","MaxDD%")
+
     def _run_screener(self):
         self.status_var.set("Running screener…")
-        threading.Thread(target=self._fetch_screener, daemon=True).start()
+        self.pool.submit(self._fetch_screener, priority=USER, key="screener")
+
+    def _screener_symbols(self, uv):
+        if uv == "S&P 100": return self.SP100
+        if uv == "My Portfolio": return list(self.portfolio.holdings.keys())
+        if uv == "Watchlist": return self.watchlist.symbols[:]
+        if uv == "Tech Giants": return ["AAPL","MSFT","GOOGL","AMZN","NVDA","META","TSLA","NFLX","ADBE"]
+        if uv in UNIVERSE_FILES: return scan.read_symbols(os.path.join(UNIVERSE_DIR, UNIVERSE_FILES[uv]))
+        return ["BTC-USD","ETH-USD","SOL-USD","DOGE-USD","XRP-USD","ADA-USD"]
 
     def _fetch_screener(self):
         uv = self._screen_universe.get()
-        if uv == "S&P 100": syms = self.SP100
-        elif uv == "My Portfolio": syms = list(self.portfolio.holdings.keys())
-        elif uv == "Watchlist": syms = self.watchlist.symbols[:]
-        elif uv == "Tech Giants": syms = ["AAPL","MSFT","GOOGL","AMZN","NVDA","META","TSLA","NFLX","ADBE"]
-        else: syms = ["BTC-USD","ETH-USD","SOL-USD","DOGE-USD","XRP-USD","ADA-USD"]
+        try:
+            syms = self._screener_symbols(uv)
+        except OSError:
+            path = os.path.join(UNIVERSE_DIR, UNIVERSE_FILES[uv])
+            self.after(0, lambda: self.status_var.set(f"{uv}: no constituents file at {path}"))
+            return
         if not syms:
             self.after(0, lambda: self.status_var.set("No symbols in selected universe."))
             return
@@ -1695,56 +2203,78 @@ class InvestaurPro(tk.Tk):
             cap_min_s = (self._screen_filters["cap_min"].get() or "0").upper()
             cap_mult = 1e9 if "B" in cap_min_s else (1e6 if "M" in cap_min_s else 1)
             cap_min = float(re.sub(r"[^\d.]","", cap_min_s) or "0") * cap_mult
+            tech = {}
+            for k in scan.TECHNICAL_FILTERS:
+                v = self._screen_filters[k].get().strip() if k in self._screen_filters else ""
+                tech[k] = float(v) if v else None
+            for k in ("sma50", "sma200"):
+                side = self._screen_filters[k].get().lower() if k in self._screen_filters else "any"
+                tech[k] = None if side == "any" else side
         except ValueError:
             self.after(0, lambda: self.status_var.set("Invalid filter values."))
             return
         is_crypto = uv == "Crypto"
+        # Technical criteria are masks over one close matrix from the bar store (each symbol measured
+        # on its own bars, whatever other calendars the universe mixes in), applied before any
+        # per-symbol fundamentals request, so they narrow the fetch instead of adding to it.
+        tech_rows = {}
+        if any(v is not None for v in tech.values()):
+            symbols, _, m = scan.universe(syms)
+            mask = scan.technical_mask(m, **tech) if symbols else np.zeros(0, bool)
+            keep = {s for s, ok in zip(symbols, mask) if ok}
+            syms = [s for s in syms if s.upper() in keep]
+            tech_rows = {s: i for i, s in enumerate(symbols)}
+            if not syms:
+                self.after(0, lambda: self._populate_screener([], ()))
+                return
+        # Fundamentals come from the columnar snapshot (fundtable.py): only symbols it has never seen
+        # are fetched now, rows past FUNDAMENTALS_MAX_AGE_S refresh in the background, and the
+        # filters are one mask over the columns. Only the survivors are quoted.
+        failed = fund_table.refresh(syms, max_age_s=float("inf"))
+        if fund_table.stale(syms):
+            self.pool.submit(fund_table.refresh, syms, priority=BACKGROUND, key="fundamentals")
+        t = fund_table.columns(syms)
+        if is_crypto:
+            mask = fundamental_mask(t, beta_max=beta_max, cap_min=cap_min)
+        else:
+            mask = fundamental_mask(t, pe_min, pe_max, div_min, beta_max, cap_min)
+        hits = np.flatnonzero(mask)
+        quotes = quote_bus.prices(t["symbol"][hits].tolist())
+        nums = np.nan_to_num(np.column_stack([t["pe"], t["eps"], t["div_yield"] * 100, t["beta"], t["mcap"]])[hits])
         rows = []
-        for sym in syms:
-            try:
-                t = yf.Ticker(sym)
-                info = t.info
-                d = t.history(period="5d")
-                if d.empty:
-                    continue
-                price = float(d["Close"].iloc[-1])
-                pe = info.get("trailingPE")
-                if not is_crypto and pe is not None and (pe < pe_min or pe > pe_max):
-                    continue
-                eps = info.get("epsTrailingTwelveMonths") or 0
-                div_y = (info.get("dividendYield") or 0) * 100
-                if not is_crypto and div_y < div_min:
-                    continue
-                beta = info.get("beta") or 0
-                if beta > beta_max:
-                    continue
-                mcap = info.get("marketCap") or 0
-                if mcap < cap_min:
-                    continue
-                name = info.get("shortName") or info.get("longName") or sym
-                mcap_fmt = fmt_big(mcap)
-                rows.append((sym, name[:25], f"${price:.2f}", f"{pe:.1f}" if pe else "N/A",
-                             f"${eps:.2f}" if eps else "N/A", f"{div_y:.2f}%",
-                             f"{beta:.2f}" if beta else "N/A", mcap_fmt,
-                             info.get("sector","N/A")[:20]))
-            except:
-                pass
+        for j, (pe, eps, div_y, beta, mcap) in zip(hits.tolist(), nums.tolist()):
+            sym = str(t["symbol"][j])
+            if sym not in quotes:
+                failed.append(sym)
+                continue
+            price = quotes[sym][0]
+            i = tech_rows.get(sym)
+            tech_cols = (("N/A",) * 4 if i is None else
+                         (f"{m['rsi'][i]:.0f}", f"{m['mom_3m'][i]:+.1f}%", f"{m['vol_ann'][i]:.1f}%",
+                          f"{m['max_dd'][i]:.1f}%"))
+            rows.append((sym, (t["name"][j] or sym)[:25], f"${price:.2f}", f"{pe:.1f}" if pe else "N/A",
+                         f"${eps:.2f}" if eps else "N/A", f"{div_y:.2f}%",
+                         f"{beta:.2f}" if beta else "N/A", fmt_big(mcap),
+                         (t["sector"][j] or "N/A")[:20]) + tech_cols)
         self._screener_data = rows
-        self.after(0, lambda: self._populate_screener(rows))
+        self.after(0, lambda: self._populate_screener(rows, failed))
 
-    def _populate_screener(self, rows):
+    def _populate_screener(self, rows, failed=()):
         for i in self.screen_tree.get_children():
             self.screen_tree.delete(i)
         for r in rows:
             self.screen_tree.insert("", "end", values=r)
-        self.status_var.set(f"Screener: {len(rows)} results.")
+        msg = f"Screener: {len(rows)} results."
+        if failed:
+            msg += f"  ·  {len(failed)} failed: {', '.join(failed[:5])}{'…' if len(failed) > 5 else ''}"
+        self.status_var.set(msg)
 
     def _sort_screener(self, col):
         if not hasattr(self, "_screener_data") or not self._screener_data:
             return
-        cols = ("Ticker","Name","Price","P/E","EPS","Div%","Beta","Mkt Cap","Sector")
+        cols = self.SCREEN_COLS
         idx = cols.index(col) if col in cols else 0
-        numeric_cols = ("Price","P/E","EPS","Div%","Beta")
+        numeric_cols = ("Price","P/E","EPS","Div%","Beta","RSI","3M%","Vol%","MaxDD%")
         def _key(r):
             v = r[idx]
             if v == "N/A":
@@ -1755,7 +2285,7 @@ class InvestaurPro(tk.Tk):
                 except (ValueError, TypeError):
                     return (0, 0)
             return (1, str(v))
-        reverse = col in ("Price","P/E","EPS","Div%","Mkt Cap","Beta")
+        reverse = col in ("Price","P/E","EPS","Div%","Mkt Cap","Beta","RSI","3M%","MaxDD%")
         self._screener_data.sort(key=_key, reverse=reverse)
         self._populate_screener(self._screener_data)
 
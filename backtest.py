@@ -0,0 +1,184 @@
+"""
+INVESTAUR PRO — Vectorized backtests of rule-based strategies over stored bars
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+import indicators as ind
+from models import SimulatorState
+from store import bars
+
+
+# ── Strategies: close matrix (bars × symbols) -> boolean "be long" matrix ──
+def sma_cross(c, fast=50, slow=200):
+    """Long while the fast SMA is above the slow SMA."""
+    f, s = ind.rolling_mean(c, fast), ind.rolling_mean(c, slow)
+    return f > s
+
+
+def price_above_sma(c, n=200):
+    return c > ind.rolling_mean(c, n)
+
+
+def momentum(c, lookback=63, top=10):
+    """Long the `top` symbols with the best trailing `lookback`-bar return (and a positive one)."""
+    ret = np.full(c.shape, np.nan)
+    ret[lookback:] = c[lookback:] / c[:-lookback] - 1
+    ranked = np.where(np.isnan(ret), -np.inf, ret)
+    k = min(top, c.shape[1])
+    cutoff = -np.partition(-ranked, k - 1, axis=1)[:, k - 1:k]
+    return (ranked >= cutoff) & (ranked > 0)
+
+
+def rsi_band(c, n=14, lo=30, hi=70):
+    """Buy when Wilder RSI drops below lo, hold until it rises above hi."""
+    rsi = ind.rsi(c, n)
+    # Hold state: +1 on entry, -1 on exit, 0 otherwise; the last non-zero event wins.
+    ev = np.where(rsi < lo, 1, np.where(rsi > hi, -1, 0))
+    last = np.where(ev != 0, np.arange(len(c))[:, None], 0)
+    np.maximum.accumulate(last, axis=0, out=last)
+    return ev[last, np.arange(c.shape[1])] == 1
+
+
+def insight_score(c, fast=20, mid=50, slow=200, rsi_lo=30, rsi_hi=70, threshold=0.56,
+                  w_trend=1.0, w_rsi=1.0, w_macd=1.0, w_mom=1.0):
+    """Long while the weighted Insight checklist (the nine _render_ai signals) scores >= threshold.
+
+    Trend: price above the fast/mid/slow SMAs and the Bollinger mid (the fast SMA); RSI: inside
+    (rsi_lo, rsi_hi); MACD: line above signal; momentum: positive 1M and 3M returns.
+    """
+    f = ind.rolling_mean(c, fast)
+    rsi = ind.rsi(c)
+    # Start each column's MACD at its first close: the EMAs seeded there, and no signal before it.
+    first = np.argmax(~np.isnan(c), axis=0)
+    head = np.arange(len(c))[:, None] < first
+    line, signal, _ = ind.macd(np.where(head, c[first, np.arange(c.shape[1])], c))
+    mom = lambda k: np.vstack([np.full((k, c.shape[1]), np.nan), c[k:] / c[:-k]]) > 1
+    groups = [(w_trend, [c > f, c > ind.rolling_mean(c, mid), c > ind.rolling_mean(c, slow), c > f]),
+              (w_rsi, [rsi < rsi_hi, rsi > rsi_lo]),
+              (w_macd, [(line > signal) & ~head]),
+              (w_mom, [mom(21), mom(63)])]
+    total = sum(w * len(sigs) for w, sigs in groups)
+    score = sum(w * sum(s.astype(float) for s in sigs) for w, sigs in groups)
+    return score >= threshold * total if total > 0 else np.zeros(c.shape, bool)
+
+
+STRATEGIES = {
+    "SMA 50/200 cross": sma_cross,
+    "Price > SMA200":   price_above_sma,
+    "Momentum top 10":  momentum,
+    "RSI 30/70 band":   rsi_band,
+    "Insight score":    insight_score,
+}
+
+# Default parameter grids for sweeps (sweep.py), one list of values per keyword.
+GRIDS = {
+    "SMA 50/200 cross": {"fast": [10, 20, 50, 100], "slow": [100, 150, 200, 250]},
+    "Price > SMA200":   {"n": [50, 100, 150, 200, 250]},
+    "Momentum top 10":  {"lookback": [21, 63, 126, 252], "top": [5, 10, 20]},
+    "RSI 30/70 band":   {"n": [7, 14, 21], "lo": [20, 25, 30, 35], "hi": [65, 70, 75, 80]},
+    "Insight score":    {"fast": [10, 20], "mid": [50, 100], "rsi_lo": [25, 30], "rsi_hi": [70, 75],
+                         "threshold": [0.44, 0.56, 0.67, 0.78]},
+}
+
+
+@dataclass
+class Backtest:
+    dates: pd.DatetimeIndex
+    symbols: list
+    equity: np.ndarray                                 # account value per bar
+    positions: np.ndarray = field(repr=False)          # bars × symbols, 1 while long
+    trades: dict = field(repr=False)                   # columnar, like PortfolioState.valuation()
+    stats: dict = field(default_factory=dict)
+
+
+def run(closes, signal, dates=None, symbols=None, cash=100_000.0, fee_bps=0.0, delay=1):
+    """Backtest a boolean signal matrix over a close matrix, both bars × symbols.
+
+    The account is split into one equal sleeve per symbol. A sleeve buys with all of its cash
+    at the close `delay` bars after its signal turns on and sells everything when it turns
+    off, so cash never goes negative and each sleeve holds one lot at a time: the same
+    buy/sell arithmetic as SimulatorState. Everything is array math over the whole matrix:
+    sleeve equity is a cumulative product of (1 + held × bar return) net of fees.
+    """
+    c = np.asarray(closes, float)
+    T, N = c.shape
+    live = ~np.isnan(c)
+    pos = np.zeros((T, N))
+    want = np.asarray(signal, bool) & live
+    pos[delay:] = want[:T - delay] if delay else want
+    pos[~live] = 0.0
+    pos[-1] = 0.0  # close everything on the last bar so every trade has an exit
+    ret = np.zeros((T, N))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ret[1:] = np.nan_to_num(c[1:] / c[:-1] - 1)
+    dpos = np.diff(pos, axis=0, prepend=np.zeros((1, N)))
+    fee = fee_bps / 1e4
+    growth = (1 + np.vstack([np.zeros((1, N)), pos[:-1]]) * ret) * (1 - fee * np.abs(dpos))
+    sleeves = (cash / N) * np.cumprod(growth, axis=0)
+    equity = sleeves.sum(axis=1)
+
+    # Pair each entry with the next exit in the same column (column-major order keeps them adjacent).
+    ent_s, ent_t = np.nonzero(dpos.T > 0)
+    ext_s, ext_t = np.nonzero(dpos.T < 0)
+    before = np.where(ent_t > 0, sleeves[np.maximum(ent_t - 1, 0), ent_s], cash / N)
+    shares = sleeves[ent_t, ent_s] / c[ent_t, ent_s]
+    pnl = sleeves[ext_t, ext_s] - before
+    dates = pd.RangeIndex(T) if dates is None else dates
+    symbols = [str(i) for i in range(N)] if symbols is None else list(symbols)
+    trades = {"symbol": np.array(symbols, dtype=object)[ent_s], "entry": np.asarray(dates)[ent_t],
+              "entry_price": c[ent_t, ent_s], "exit": np.asarray(dates)[ext_t], "exit_price": c[ext_t, ext_s],
+              "shares": shares, "pnl": pnl, "pct": pnl / before * 100, "bars": ext_t - ent_t}
+    order = np.argsort(ent_t, kind="stable")
+    trades = {k: v[order] for k, v in trades.items()}
+    return Backtest(dates, symbols, equity, pos, trades, stats(equity, dates, trades, pos, live))
+
+
+def stats(equity, dates, trades, pos, live):
+    """Total return, CAGR, annualized vol, Sharpe, max drawdown, trade count, win rate, exposure."""
+    r = equity[1:] / equity[:-1] - 1
+    if isinstance(dates, pd.DatetimeIndex) and len(dates) > 1:
+        years = max((dates[-1] - dates[0]).days / 365.25, 1e-9)
+        per_year = len(r) / years
+    else:
+        years, per_year = len(r) / 252, 252
+    total = equity[-1] / equity[0] - 1
+    sd = r.std() if len(r) else 0.0
+    n = len(trades["pnl"])
+    return {"total_return": float(total * 100),
+            "cagr": float(((1 + total) ** (1 / years) - 1) * 100) if total > -1 else -100.0,
+            "vol_ann": float(sd * np.sqrt(per_year) * 100),
+            "sharpe": float(r.mean() / sd * np.sqrt(per_year)) if sd > 0 else 0.0,
+            "max_dd": ind.max_drawdown(equity),
+            "trades": n,
+            "win_rate": float((trades["pnl"] > 0).mean() * 100) if n else 0.0,
+            "exposure": float(pos.sum() / max(live.sum(), 1) * 100)}
+
+
+def backtest(syms, strategy, period="10y", interval="1d", cash=100_000.0, fee_bps=0.0, **params):
+    """Run a STRATEGIES entry (or any closes -> signal callable) over stored bars for syms."""
+    dates, symbols, closes = bars.matrix(syms, period, interval)
+    if not symbols:
+        raise ValueError("No price history for any of the symbols.")
+    fn = STRATEGIES[strategy] if isinstance(strategy, str) else strategy
+    return run(closes, fn(closes, **params), dates, symbols, cash, fee_bps)
+
+
+def replay(result, cash=100_000.0):
+    """Push a fee-free backtest's trades through SimulatorState.buy/sell (a cross-check of the vector math).
+
+    Returns the SimulatorState, whose cash should equal the result's final equity.
+    """
+    sim = SimulatorState(cash=cash, start_cash=cash)
+    t = result.trades
+    events = sorted([(e, 1, i) for i, e in enumerate(t["entry"])] + [(x, 0, i) for i, x in enumerate(t["exit"])])
+    for _, is_buy, i in events:  # sells first on a shared bar, as run() frees a sleeve before it rebuys
+        sym = t["symbol"][i]
+        ok, msg = (sim.buy(sym, t["entry_price"][i], t["shares"][i]) if is_buy
+                   else sim.sell(sym, t["exit_price"][i], t["shares"][i]))
+        if not ok:
+            raise ValueError(msg)
+    return sim
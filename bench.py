@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+INVESTAUR PRO — Headless benchmark suite for the models, indicator and rendering hot paths
+
+Run:  python bench.py [--out bench.json] [--compare old.json] [--quick] [-k NAME]
+
+Market data comes from a seeded synthetic provider, so runs are repeatable with no network.
+Each case reports min/median/mean wall time and the tracemalloc peak of one run.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+from datetime import datetime
+from types import SimpleNamespace
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import data
+from data import MarketDataProvider, _unique, slice_period
+from cache import fundamentals, indicator_cache
+from realtime import quote_bus
+from store import bars
+from fundtable import fund_table, fundamental_mask
+from models import PortfolioState
+from store import align
+import backtest
+import scan
+import indicators as ind
+from statestore import StateStore
+from app import InvestaurPro
+
+
+def synthetic_bars(sym, days, end="2025-12-31"):
+    """Deterministic geometric random walk of daily OHLCV bars for sym."""
+    rng = np.random.default_rng(zlib.crc32(sym.encode()))
+    idx = pd.bdate_range(end=end, periods=days, tz="America/New_York")
+    close = 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.018, days)))
+    open_ = close * np.exp(rng.normal(0, 0.006, days))
+    spread = np.abs(rng.normal(0, 0.01, days))
+    return pd.DataFrame({"Open": open_, "High": np.maximum(open_, close) * (1 + spread),
+                         "Low": np.minimum(open_, close) * (1 - spread), "Close": close,
+                         "Volume": rng.integers(1e5, 1e7, days).astype(float)}, index=idx)
+
+
+def synthetic_info(sym):
+    rng = np.random.default_rng(zlib.crc32(sym.encode()) + 1)
+    return {"shortName": f"{sym} Corp", "sector": ["Technology", "Energy", "Healthcare"][rng.integers(3)],
+            "trailingPE": float(rng.uniform(5, 60)), "epsTrailingTwelveMonths": float(rng.uniform(-2, 12)),
+            "dividendYield": float(rng.uniform(0, 0.05)), "beta": float(rng.uniform(0.3, 2.2)),
+            "marketCap": int(rng.uniform(1e9, 2e12))}
+
+
+class SyntheticProvider(MarketDataProvider):
+    """Offline provider over synthetic_bars(); frames are generated once per symbol and reused."""
+
+    def __init__(self, days=2 * 252):
+        self.days = days
+        self._frames = {}
+
+    def _frame(self, sym):
+        if sym not in self._frames:
+            self._frames[sym] = synthetic_bars(sym, self.days)
+        return self._frames[sym]
+
+    def history_many(self, syms, period="1mo", interval="1d"):
+        return {s: slice_period(self._frame(s), period, interval) for s in _unique(syms)}
+
+    def history_since(self, syms, start, interval="1d"):
+        out = {}
+        for s in _unique(syms):
+            d = self._frame(s)
+            d = d[d.index.strftime("%Y-%m-%d") >= start]
+            if not d.empty:
+                out[s] = d
+        return out
+
+    def info(self, sym):
+        return synthetic_info(sym)
+
+    def news(self, url):
+        return SimpleNamespace(entries=[])
+
+
+def universe(n):
+    return [f"S{i:05d}" for i in range(n)]
+
+
+def portfolio(n):
+    p = PortfolioState()
+    for i, sym in enumerate(universe(n)):
+        p.add(sym, 1 + i % 50, 20 + i % 80, "2024-01-02")
+    return p
+
+
+def broker_book(lots, tickers):
+    """PortfolioState holding `lots` lots spread over `tickers` symbols, bulk-loaded into the table."""
+    rng = np.random.default_rng(lots)
+    p = PortfolioState()
+    syms = universe(tickers)
+    p.book.extend([syms[i] for i in rng.integers(0, tickers, lots)], rng.uniform(1, 100, lots),
+                   rng.uniform(10, 500, lots), [str(d) for d in np.datetime64("2015-01-01") + rng.integers(0, 3650, lots)])
+    return p
+
+
+def reset_caches():
+    fundamentals.invalidate()
+    fund_table.clear()
+    with quote_bus._lock:
+        quote_bus._quotes.clear()
+
+
+class _Var:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+def screener_self(syms, technical=False):
+    """Just enough of an InvestaurPro for _fetch_screener to run without Tk."""
+    filters = {"pe_min": _Var("0"), "pe_max": _Var("40"), "div_min": _Var("0"),
+               "beta_max": _Var("1.8"), "cap_min": _Var("5B")}
+    if technical:
+        filters.update(rsi_min=_Var("35"), rsi_max=_Var("75"), dd_min=_Var("-60"), sma200=_Var("Above"))
+    fake = SimpleNamespace(
+        _screen_universe=_Var("Watchlist"), watchlist=SimpleNamespace(symbols=syms),
+        portfolio=PortfolioState(), SP100=[], _screen_filters=filters,
+        pool=SimpleNamespace(submit=lambda *a, **k: None), after=lambda ms, fn: None)
+    fake._screener_symbols = lambda uv: InvestaurPro._screener_symbols(fake, uv)
+    return fake
+
+
+def candle_self():
+    fig = Figure(figsize=(12, 5))
+    FigureCanvasAgg(fig)
+    return SimpleNamespace(ax=fig.add_subplot(111), fig=fig)
+
+
+def cases(quick):
+    """(name, params, fn, setup run before every timed call, warm up once first?)"""
+    sizes = (10, 1_000) if quick else (10, 1_000, 10_000)
+    for n in sizes:
+        p = portfolio(n)
+        quotes = {s: (float(30 + i % 70), float(29 + i % 70)) for i, s in enumerate(p.holdings)}
+        yield f"snapshot[{n}]", {"holdings": n}, lambda p=p, q=quotes: p.snapshot(q), None, False
+        yield f"valuation[{n}]", {"holdings": n}, lambda p=p, q=quotes: p.valuation(q), None, False
+        yield f"snapshot_quote_bus[{n}]", {"holdings": n}, lambda p=p: p.snapshot(), reset_caches, True
+        # The warm-up call fills the bar store; timed runs measure the steady state the app sees.
+        yield f"historical_values[{n}]", {"holdings": n, "period": "1y"}, \
+            lambda p=p: p.historical_values("1y"), None, True
+
+    book = broker_book(50_000, 2_000)
+    quotes = {s: (100.0, 99.0) for s in book.holdings}
+    yield "valuation_lots[50k]", {"lots": 50_000, "tickers": 2_000, "table_kb": book.table.nbytes / 1024}, \
+        lambda: book.valuation(quotes), None, False
+
+    store = StateStore(os.path.join(tempfile.mkdtemp(prefix="investaur-bench-"), "state.db"))
+    store.save_portfolio(broker_book(100_000, 3_000))
+    store.flush()
+    yield "state_load[100k]", {"lots": 100_000, "tickers": 3_000}, store.load_portfolio, None, False
+
+    closes = synthetic_bars("AI20Y", 20 * 252)["Close"].to_numpy()
+    yield "ai_metrics[20y]", {"bars": len(closes)}, lambda: InvestaurPro._ai_metrics(closes), None, False
+    # A repeat view: the warm-up call computes, timed runs hit the indicator cache.
+    yield "ai_metrics_cached[20y]", {"bars": len(closes)}, lambda: indicator_cache.get(
+        "AI20Y", "1d", (len(closes), closes[-1]), "insight", lambda: InvestaurPro._ai_metrics(closes)), None, True
+    yield "max_drawdown[20y]", {"bars": len(closes)}, lambda: ind.max_drawdown(closes), None, False
+    yield "ema[20y]", {"bars": len(closes)}, lambda: ind.ema(closes, 26), None, False
+
+    streams = [ind.InsightStream(synthetic_bars(s, 2 * 252)["Close"].to_numpy()) for s in universe(100)]
+
+    def tick(streams=streams):
+        for st in streams:
+            st.update(st.closes[-1] * 1.001)
+    yield "insight_stream_tick[100]", {"symbols": len(streams), "bars": 2 * 252}, tick, None, False
+
+    dates, syms, closes = align({s: synthetic_bars(s, 10 * 252) for s in universe(500)})
+
+    def all_indicators(c=closes):
+        ind.macd(c), ind.rsi(c), ind.bollinger(c), ind.max_drawdown(c)
+    yield "indicators[10y×500]", {"bars": len(dates), "symbols": len(syms)}, all_indicators, None, False
+
+    dates, syms, closes = align({s: synthetic_bars(s, 10 * 252) for s in universe(100)})
+    for name, strategy in (("sma_cross", backtest.sma_cross), ("rsi_band", backtest.rsi_band)):
+        yield f"backtest_{name}[10y×100]", {"bars": len(dates), "symbols": len(syms)}, \
+            lambda fn=strategy: backtest.run(closes, fn(closes), dates, syms), None, False
+
+    for n in (250, 5_000):
+        hist = synthetic_bars("CANDLE", n)
+
+        def draw(hist=hist):
+            fake = candle_self()
+            InvestaurPro._draw_candles(fake, hist)
+            fake.fig.canvas.draw()
+        yield f"draw_candles[{n}]", {"bars": n}, draw, None, False
+
+    syms = universe(100 if quick else 500)
+    # Warm-up fills the bar store, so timed runs score from local bars as the app does.
+    yield f"insight_scan[{len(syms)}]", {"symbols": len(syms), "period": "2y"}, \
+        lambda: scan.scan(syms, "2y"), indicator_cache.invalidate, True
+    yield f"fetch_screener[{len(syms)}]", {"symbols": len(syms), "cold": True}, \
+        lambda: InvestaurPro._fetch_screener(screener_self(syms)), reset_caches, True
+    # Warm: every row is in the fundamentals table and the survivors are quoted, so a screen is a mask.
+    big = universe(500 if quick else 3_000)
+    yield f"fetch_screener_warm[{len(big)}]", {"symbols": len(big)}, \
+        lambda: InvestaurPro._fetch_screener(screener_self(big)), None, True
+    yield f"fundamental_mask[{len(big)}]", {"symbols": len(big)}, \
+        lambda: fundamental_mask(fund_table.columns(big), 0, 40, 0, 1.8, 5e9), None, True
+    # Technical criteria first narrow the universe from stored bars; the bar store stays warm across runs.
+    yield f"fetch_screener_technical[{len(syms)}]", {"symbols": len(syms), "cold": True}, \
+        lambda: InvestaurPro._fetch_screener(screener_self(syms, technical=True)), reset_caches, True
+
+
+def measure(fn, setup, repeat):
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        gc.collect()
+        t = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t) * 1000)
+    if setup:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"runs": repeat, "min_ms": min(times), "median_ms": statistics.median(times),
+            "mean_ms": statistics.fmean(times), "peak_kb": peak / 1024}
+
+
+def git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path) as f:
+        base = {r["name"]: r for r in json.load(f)["results"]}
+    regressions = []
+    print(f"\n{'case':<28}{'base ms':>12}{'now ms':>12}{'ratio':>8}")
+    for r in results:
+        b = base.get(r["name"])
+        if b is None:
+            continue
+        ratio = r["median_ms"] / max(b["median_ms"], 1e-9)
+        flag = "  REGRESSION" if ratio > 1 + threshold else ""
+        print(f"{r['name']:<28}{b['median_ms']:>12.2f}{r['median_ms']:>12.2f}{ratio:>8.2f}{flag}")
+        if flag:
+            regressions.append(r["name"])
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description="INVESTAUR PRO benchmarks")
+    ap.add_argument("--out", default="bench.json", help="where to write the JSON results")
+    ap.add_argument("--compare", help="earlier results JSON; exit 1 if a case got slower than --threshold")
+    ap.add_argument("--threshold", type=float, default=0.25, help="allowed median slowdown (0.25 = 25%%)")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--quick", action="store_true", help="smaller sizes for a fast smoke run")
+    ap.add_argument("-k", dest="pattern", default="", help="only run cases whose name contains this")
+    args = ap.parse_args()
+
+    data.set_provider(data.CoalescingProvider(SyntheticProvider()))
+    bars.root = tempfile.mkdtemp(prefix="investaur-bench-")
+    fund_table.path = os.path.join(bars.root, "fundamentals.npz")
+    bars.clear()
+
+    results = []
+    for name, params, fn, setup, warm in cases(args.quick):
+        if args.pattern not in name:
+            continue
+        if warm:
+            fn()
+        r = {"name": name, "params": params, **measure(fn, setup, args.repeat)}
+        results.append(r)
+        print(f"{name:<28}{r['median_ms']:>10.2f} ms  (min {r['min_ms']:.2f})  peak {r['peak_kb']:>10.1f} KiB")
+
+    report = {"meta": {"timestamp": datetime.now().isoformat(timespec="seconds"), "git": git_rev(),
+                       "python": platform.python_version(), "platform": platform.platform(),
+                       "numpy": np.__version__, "pandas": pd.__version__, "quick": args.quick,
+                       "repeat": args.repeat},
+              "results": results}
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {args.out}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+INVESTAUR PRO — Process-wide caches for market data
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from config import (INFO_TTL_STATIC_S, INFO_TTL_SLOW_S, INFO_TTL_PRICE_S, INFO_CACHE_MAX,
+                    INDICATOR_CACHE_MAX, INDICATOR_CACHE_MB)
+from data import get_provider
+
+# Staleness tiers for Ticker.info fields. Anything not listed is treated as "slow".
+STATIC_FIELDS = {
+    "longName", "shortName", "sector", "industry", "country", "city", "state", "exchange",
+    "currency", "quoteType", "website", "longBusinessSummary", "fullTimeEmployees",
+}
+PRICE_FIELDS = {
+    "regularMarketPrice", "currentPrice", "previousClose", "regularMarketPreviousClose",
+    "open", "regularMarketOpen", "dayHigh", "dayLow", "regularMarketDayHigh", "regularMarketDayLow",
+    "volume", "regularMarketVolume", "bid", "ask", "regularMarketChange", "regularMarketChangePercent",
+}
+TIER_TTL = {"static": INFO_TTL_STATIC_S, "slow": INFO_TTL_SLOW_S, "price": INFO_TTL_PRICE_S}
+
+
+def field_tier(name):
+    if name in STATIC_FIELDS:
+        return "static"
+    if name in PRICE_FIELDS:
+        return "price"
+    return "slow"
+
+
+class FundamentalsCache:
+    """LRU cache of Ticker.info dicts where each field expires on its own tier's TTL.
+
+    get(sym, fields) is a hit while every requested field is still fresh. get(sym) without
+    fields serves the whole dict while the slow tier is fresh, dropping price fields once
+    those go stale so callers fall back to bar closes instead of an old quote.
+    """
+
+    def __init__(self, fetch=None, max_entries=INFO_CACHE_MAX, clock=time.monotonic):
+        self._fetch = fetch or (lambda sym: get_provider().info(sym))
+        self._max = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()  # SYM -> (fetched_at, info)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, sym, fields=None):
+        """Ticker.info for sym, fetched again once a requested field's tier has expired.
+
+        Without fields, the cached dict is served for the slow-tier TTL, but price fields are
+        only in it while they are younger than the price-tier TTL (see _view), so a whole-dict
+        read never returns a quote older than INFO_TTL_PRICE_S.
+        """
+        sym = sym.upper()
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(sym)
+            if entry is not None:
+                age = now - entry[0]
+                # Whole-dict reads exclude stale price fields instead of expiring on their TTL.
+                ttl = min(TIER_TTL[field_tier(f)] for f in fields) if fields else TIER_TTL["slow"]
+                if age < ttl:
+                    self._entries.move_to_end(sym)
+                    self.hits += 1
+                    return self._view(entry[1], age)
+            self.misses += 1
+        info = self._fetch(sym) or {}
+        with self._lock:
+            self._entries[sym] = (self._clock(), info)
+            self._entries.move_to_end(sym)
+            while len(self._entries) > self._max:
+                self._entries.popitem(last=False)
+        return dict(info)
+
+    @staticmethod
+    def _view(info, age):
+        """The cached dict, without its price fields once they are older than the price tier."""
+        if age < TIER_TTL["price"]:
+            return dict(info)
+        return {k: v for k, v in info.items() if k not in PRICE_FIELDS}
+
+    def invalidate(self, sym=None):
+        with self._lock:
+            if sym is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(sym.upper(), None)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries),
+                    "hit_rate": self.hits / total if total else 0.0}
+
+
+fundamentals = FundamentalsCache()
+
+
+def last_bar(hist):
+    """Identity of a bar frame's newest bar: (timestamp, close). A revised intraday close counts as a new bar."""
+    if hist is None or len(hist) == 0:
+        return None
+    return hist.index[-1].value, float(hist["Close"].iloc[-1])
+
+
+def _freeze(value):
+    """Make cached arrays read-only (callers share them) and return the value's size in bytes."""
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+        return value.nbytes + 112
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_freeze(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_freeze(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class IndicatorCache:
+    """LRU cache of computed indicator series and metrics, bounded by entries and bytes.
+
+    Keys are (symbol, interval, last bar, name, params). A result for an older last bar of
+    the same (symbol, interval, name, params) is dropped as soon as a newer one is stored, so
+    a new bar invalidates without any bookkeeping by callers. Arrays in cached values are
+    made read-only, since every hit hands out the same objects.
+    """
+
+    def __init__(self, max_entries=INDICATOR_CACHE_MAX, max_bytes=INDICATOR_CACHE_MB * 2**20):
+        self._max = max_entries
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, nbytes)
+        self._latest = {}              # (sym, interval, name, params) -> key holding its newest bar
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, sym, interval, bar, name, compute, **params):
+        """compute() for sym's series ending at bar (see last_bar()), or the cached result."""
+        series = (sym, interval, name, tuple(sorted(params.items())))
+        key = series + (bar,)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        value = compute()
+        size = _freeze(value)
+        with self._lock:
+            stale = self._latest.get(series)
+            if stale is not None and stale != key:
+                self._drop(stale)
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, size)
+            self._latest[series] = key
+            self.nbytes += size
+            while len(self._entries) > 1 and (len(self._entries) > self._max or self.nbytes > self._max_bytes):
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return value
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry[1]
+            if self._latest.get(key[:4]) == key:
+                del self._latest[key[:4]]
+
+    def invalidate(self, sym=None):
+        with self._lock:
+            for key in [k for k in self._entries if sym is None or k[0] == sym]:
+                self._drop(key)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries),
+                    "bytes": self.nbytes, "evictions": self.evictions,
+                    "hit_rate": self.hits / total if total else 0.0}
+
+
+indicator_cache = IndicatorCache()
@@ -25,5 +25,60 @@ FONT_NUM   = ("Consolas", 13, "bold")  # Font used for numbers
 # Real-time update intervals (milliseconds)
 REFRESH_PULSE_MS       = 60_000   # Interval for updating the market pulse sidebar
 REFRESH_PORTFOLIO_MS   = 60_000   # Interval for updating the portfolio P&L sidebar
-REFRESH_ANALYSIS_MS    = 30_000   # Interval for updating the current symbol price in the analysis tab
-REFRESH_MARKETS_MS     = 300_000  # Interval for updating the markets tab when visible
\ No newline at end of file
+REFRESH_ANALYSIS_MS    = 5_000    # Interval for quoting the current symbol (analysis price, Insight cards)
+REFRESH_WATCHLIST_MS   = 5_000    # Interval for quoting the watchlist (live price/RSI per row)
+REFRESH_MARKETS_MS     = 300_000  # Interval for updating the markets tab when visible
+REFRESH_ORDERS_MS      = 15_000   # Interval for quoting symbols with resting simulator orders (any tab)
+REFRESH_TICK_MS        = 5_000    # Scheduler tick; each tick batches every due symbol into one fetch
+QUOTE_MAX_AGE_S        = 30       # Quote-bus prices younger than this (seconds) are reused instead of refetched
+
+# Market data
+DATA_BACKEND      = "yfinance"                  # "yfinance", "fixture", "record" or "replay"; INVESTAUR_DATA overrides it
+FIXTURE_DIR       = "fixtures"                  # Directory of <SYM>.csv daily bars and <SYM>.json info for the fixture backend
+RECORD_PATH       = "fixtures/recording.zip"    # Archive written by "record" and served by "replay"; INVESTAUR_RECORDING overrides it
+REPLAY_LATENCY_MS = 0                           # Synthetic latency per replayed call; INVESTAUR_LATENCY_MS overrides it
+REPLAY_JITTER_MS  = 0                           # Uniform ± jitter added to the replay latency
+
+# Fundamentals (Ticker.info) cache time-to-live per staleness tier, in seconds
+INFO_TTL_STATIC_S = 3 * 86_400  # Names, sector, country, business summary
+INFO_TTL_SLOW_S   = 4 * 3_600   # Valuation and dividend fields (trailingPE, dividendRate, marketCap…)
+INFO_TTL_PRICE_S  = 15          # Live price fields (regularMarketPrice, currentPrice…)
+INFO_CACHE_MAX    = 2_000       # Max symbols kept before least-recently-used eviction
+
+# Computed indicator cache (cache.indicator_cache)
+INDICATOR_CACHE_MAX = 256  # Max cached results (one symbol's indicator set, one scan…)
+INDICATOR_CACHE_MB  = 64   # Max total size of cached arrays before least-recently-used eviction
+
+# Fundamentals snapshot table (fundtable.py) and screener index universes
+FUNDAMENTALS_PATH      = ".investaur/fundamentals.npz"  # Columnar P/E, EPS, dividend, beta, market cap, sector per symbol
+FUNDAMENTALS_MAX_AGE_S = 86_400                         # Rows older than this are refetched in the background after a screen
+FUNDAMENTALS_CHUNK     = 200                            # Symbols fetched between saves of the table during a refresh
+UNIVERSE_DIR           = ".investaur/universes"         # Constituents files: tickers separated by commas or whitespace, '#' comments
+UNIVERSE_FILES         = {"S&P 500": "sp500.txt", "Russell 1000": "russell1000.txt", "Russell 3000": "russell3000.txt"}
+
+# Local OHLCV bar store
+STORE_DIR     = ".investaur/bars"  # Directory of per-symbol .npz bar files (daily, weekly, monthly)
+STORE_FRESH_S = 300                # Stored bars checked this recently are served without a network call
+
+# Paper-trading simulator
+SIM_DIR            = ".investaur/sim"  # Trade ledger (ledger.bin) and state snapshot (snapshot.pkl)
+SIM_SNAPSHOT_EVERY = 1_000             # Snapshot the account every N ledger events; loading replays at most N
+SIM_LOG_LINES      = 500               # Most recent trades shown in the trade log
+
+# Session state
+STATE_DB       = ".investaur/state.db"  # SQLite (WAL) file for the portfolio, watchlist and UI state
+STATE_FLUSH_MS = 1_000                  # Write-behind window; edits within it are saved in one transaction
+
+# Background work
+WORKER_THREADS = 6  # Fixed size of the prioritized worker pool that runs every fetch
+SWEEP_WORKERS  = 0  # Processes for parameter sweeps (sweep.py); 0 = one per CPU core
+
+# Fetch engine (per host)
+FETCH_MAX_PER_HOST       = 8     # Concurrent requests to one host
+FETCH_RATE_PER_S         = 10.0  # Token-bucket refill rate, requests per second
+FETCH_BURST              = 20    # Token-bucket capacity
+FETCH_RETRIES            = 3     # Retries for rate-limit/timeout/connection errors
+FETCH_BACKOFF_S          = 0.5   # Base of the jittered exponential backoff
+FETCH_BREAKER_FAILURES   = 5     # Consecutive retryable failures that open the circuit breaker
+FETCH_BREAKER_COOLDOWN_S = 30    # Seconds the breaker stays open before letting a probe through
+FETCH_JOB_THREADS        = 16    # Threads for FetchEngine.map() fan-out jobs
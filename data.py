@@ -0,0 +1,537 @@
+"""
+INVESTAUR PRO — Market data providers (yfinance and offline fixtures)
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import pickle
+import random
+import threading
+import time
+import warnings
+import zipfile
+from datetime import timedelta
+from urllib.parse import urlparse
+
+import feedparser
+import pandas as pd
+import yfinance as yf
+
+from config import DATA_BACKEND, FIXTURE_DIR, RECORD_PATH, REPLAY_LATENCY_MS, REPLAY_JITTER_MS
+from fetch import get_engine
+
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+EMPTY = pd.DataFrame(columns=OHLCV)
+
+
+class MarketDataProvider:
+    """Interface for every data backend.
+
+    Frames use yfinance column names (Open … Volume) on a tz-aware DatetimeIndex, however
+    many symbols a request asks for.
+    """
+
+    def history(self, sym, period="1mo", interval="1d"):
+        return self.history_many([sym], period, interval).get(sym.upper(), EMPTY)
+
+    def history_many(self, syms, period="1mo", interval="1d"):
+        """Return {SYMBOL: DataFrame} for every symbol that has data, in as few requests as possible."""
+        raise NotImplementedError
+
+    def history_since(self, syms, start, interval="1d"):
+        """Return {SYMBOL: DataFrame} of bars dated on or after start (a "YYYY-MM-DD" string)."""
+        raise NotImplementedError
+
+    def info(self, sym):
+        raise NotImplementedError
+
+    def news(self, url):
+        """Parsed RSS feed for url (anything with .entries)."""
+        return feedparser.parse(url)
+
+    def quotes(self, syms, period="5d", days=None):
+        """Return {SYMBOL: (last_close, prev_close)}; prev_close is None when only one bar exists.
+
+        days, if given, receives {SYMBOL: date of the last close's session}, in the exchange's zone.
+        """
+        out = {}
+        for sym, d in self.history_many(syms, period).items():
+            closes = d["Close"].dropna()
+            if closes.empty:
+                continue
+            prev = float(closes.iloc[-2]) if len(closes) > 1 else None
+            out[sym] = (float(closes.iloc[-1]), prev)
+            if days is not None:
+                days[sym] = closes.index[-1].date()
+        return out
+
+
+def _unique(syms):
+    return list(dict.fromkeys(s.strip().upper() for s in syms if s and s.strip()))
+
+
+def tz_aware(d):
+    """d on a tz-aware DatetimeIndex; naive timestamps are taken as UTC."""
+    if not isinstance(d.index, pd.DatetimeIndex):
+        d = d.set_axis(pd.to_datetime(d.index, utc=True))
+    elif d.index.tz is None:
+        d = d.tz_localize("UTC")
+    return d
+
+
+def split_download(raw, syms):
+    """Split a grouped yf.download() frame into per-symbol frames, dropping rows the symbol did not trade."""
+    out = {}
+    if raw is None or raw.empty:
+        return out
+    raw = tz_aware(raw)
+    multi = isinstance(raw.columns, pd.MultiIndex)
+    present = set(raw.columns.get_level_values(0)) if multi else set()
+    for sym in syms:
+        if multi:
+            if sym not in present:
+                continue
+            d = raw[sym]
+        elif len(syms) == 1:
+            d = raw
+        else:
+            continue
+        d = d.dropna(how="all")
+        if not d.empty:
+            out[sym] = d
+    return out
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Yahoo Finance backend. Multi-symbol requests go out as one batched yf.download()."""
+
+    def history(self, sym, period="1mo", interval="1d"):
+        return yf.Ticker(sym.upper()).history(period=period, interval=interval, auto_adjust=True)
+
+    def history_many(self, syms, period="1mo", interval="1d"):
+        syms = _unique(syms)
+        if not syms:
+            return {}
+        if len(syms) == 1:
+            d = self.history(syms[0], period, interval)
+            return {syms[0]: d} if not d.empty else {}
+        raw = yf.download(syms, period=period, interval=interval, group_by="ticker",
+                          auto_adjust=True, threads=True, progress=False, ignore_tz=False)
+        return split_download(raw, syms)
+
+    def history_since(self, syms, start, interval="1d"):
+        syms = _unique(syms)
+        if not syms:
+            return {}
+        if len(syms) == 1:
+            d = yf.Ticker(syms[0]).history(start=start, interval=interval, auto_adjust=True)
+            return {syms[0]: d} if not d.empty else {}
+        raw = yf.download(syms, start=start, interval=interval, group_by="ticker",
+                          auto_adjust=True, threads=True, progress=False, ignore_tz=False)
+        return split_download(raw, syms)
+
+    def info(self, sym):
+        return yf.Ticker(sym.upper()).info or {}
+
+
+PERIOD_DAYS = {"1mo": 31, "3mo": 92, "6mo": 183, "1y": 366, "2y": 731, "5y": 1827, "10y": 3653}
+RESAMPLE = {"1wk": "W", "1mo": "MS", "3mo": "QS"}
+
+
+def slice_period(d, period, interval="1d"):
+    """Trim a daily frame to a yfinance-style period and resample to weekly/monthly bars if asked."""
+    if d.empty:
+        return d
+    last = d.index[-1]
+    if period == "ytd":
+        d = d[d.index.year == last.year]
+    elif period.endswith("d"):
+        d = d.tail(int(period[:-1]))
+    elif period in PERIOD_DAYS:
+        d = d.iloc[d.index.searchsorted(last - timedelta(days=PERIOD_DAYS[period]), side="right"):]
+    rule = RESAMPLE.get(interval)
+    if rule and all(c in d.columns for c in OHLCV):
+        d = d.resample(rule).agg({"Open": "first", "High": "max", "Low": "min",
+                                  "Close": "last", "Volume": "sum"}).dropna(subset=["Close"])
+    return d
+
+
+class FixtureProvider(MarketDataProvider):
+    """Offline backend: daily bars from <root>/<SYM>.csv, fundamentals from <root>/<SYM>.json."""
+
+    def __init__(self, root=FIXTURE_DIR):
+        self.root = root
+        self._frames = {}
+
+    def _frame(self, sym):
+        if sym not in self._frames:
+            try:
+                d = pd.read_csv(os.path.join(self.root, f"{sym}.csv"), index_col=0)
+                d.index = pd.to_datetime(d.index, utc=True)
+            except (OSError, ValueError):
+                d = EMPTY
+            self._frames[sym] = d.sort_index()
+        return self._frames[sym]
+
+    def history_many(self, syms, period="1mo", interval="1d"):
+        out = {}
+        for sym in _unique(syms):
+            d = slice_period(self._frame(sym), period, interval)
+            if not d.empty:
+                out[sym] = d
+        return out
+
+    def history_since(self, syms, start, interval="1d"):
+        out = {}
+        for sym, d in self.history_many(syms, "max", interval).items():
+            d = d[d.index.strftime("%Y-%m-%d") >= start]
+            if not d.empty:
+                out[sym] = d
+        return out
+
+    def info(self, sym):
+        try:
+            with open(os.path.join(self.root, f"{sym.upper()}.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def news(self, url):
+        return feedparser.FeedParserDict(entries=[])
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Lets concurrent callers asking for the same key share one in-flight call and its result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.started = 0
+        self.shared = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.started += 1
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def do_many(self, keys, fn):
+        """Resolve many keys at once: fn(missing_keys) -> {key: value} runs only for keys nobody
+        else is already fetching; keys in flight elsewhere are awaited. Failed keys are omitted."""
+        with self._lock:
+            waiting = {k: self._calls[k] for k in keys if k in self._calls}
+            mine = {k: _Call() for k in keys if k not in waiting}
+            self._calls.update(mine)
+            self.started += len(mine)
+            self.shared += len(waiting)
+        out = {}
+        if mine:
+            try:
+                got = fn(list(mine))
+                for k, call in mine.items():
+                    call.result = got.get(k)
+                    if call.result is not None:
+                        out[k] = call.result
+            except Exception as e:
+                for call in mine.values():
+                    call.error = e
+                raise
+            finally:
+                with self._lock:
+                    for k in mine:
+                        del self._calls[k]
+                for call in mine.values():
+                    call.done.set()
+        for k, call in waiting.items():
+            call.done.wait()
+            if call.error is None and call.result is not None:
+                out[k] = call.result
+        return out
+
+    def stats(self):
+        with self._lock:
+            return {"started": self.started, "shared": self.shared, "in_flight": len(self._calls)}
+
+
+class CoalescingProvider(MarketDataProvider):
+    """Wraps a provider so concurrent requests for the same (symbol, period, interval) share one fetch.
+
+    Coalescing is per symbol, so a batch asking for SPY joins an in-flight batch that already
+    covers SPY and only downloads the symbols nobody else is fetching.
+    """
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.flight = SingleFlight()
+
+    def history_many(self, syms, period="1mo", interval="1d"):
+        keys = [("hist", s, period, interval) for s in _unique(syms)]
+
+        def fetch(missing):
+            got = self.inner.history_many([k[1] for k in missing], period, interval)
+            return {k: got.get(k[1]) for k in missing}
+
+        return {k[1]: d for k, d in self.flight.do_many(keys, fetch).items() if not d.empty}
+
+    def history_since(self, syms, start, interval="1d"):
+        keys = [("since", s, start, interval) for s in _unique(syms)]
+
+        def fetch(missing):
+            got = self.inner.history_since([k[1] for k in missing], start, interval)
+            return {k: got.get(k[1]) for k in missing}
+
+        return {k[1]: d for k, d in self.flight.do_many(keys, fetch).items() if not d.empty}
+
+    def info(self, sym):
+        sym = sym.upper()
+        return self.flight.do(("info", sym), lambda: self.inner.info(sym))
+
+    def news(self, url):
+        return self.flight.do(("news", url), lambda: self.inner.news(url))
+
+
+class ThrottledProvider(MarketDataProvider):
+    """Routes every call of a network backend through the fetch engine under one host name,
+    so all Yahoo traffic shares its concurrency cap, rate limit, backoff and circuit breaker."""
+
+    def __init__(self, inner, host="yahoo"):
+        self.inner = inner
+        self.host = host
+
+    def history(self, sym, period="1mo", interval="1d"):
+        return get_engine().call(self.host, self.inner.history, sym, period, interval)
+
+    def history_many(self, syms, period="1mo", interval="1d"):
+        return get_engine().call(self.host, self.inner.history_many, syms, period, interval)
+
+    def history_since(self, syms, start, interval="1d"):
+        return get_engine().call(self.host, self.inner.history_since, syms, start, interval)
+
+    def info(self, sym):
+        return get_engine().call(self.host, self.inner.info, sym)
+
+    def news(self, url):
+        return get_engine().call(urlparse(url).netloc, self.inner.news, url)
+
+
+NEWS_FIELDS = ("title", "link", "published", "summary", "source")
+
+
+def _news_key(url):
+    return "news/" + hashlib.sha1(url.encode()).hexdigest()[:16]
+
+
+class Recording:
+    """Zip archive of pickled responses, one member per key (e.g. "hist/AAPL/1y_1d").
+
+    Re-recording a key from an earlier session replaces it (within one session the first
+    response is kept, so a polled quote is archived once). Replaced members are dropped
+    when the archive is closed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._zip = None
+        self._names = set()
+        self._written = set()   # keys put during this session
+        self._replaced = 0
+
+    def _open(self, mode):
+        if self._zip is None:
+            if mode == "a":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._zip = zipfile.ZipFile(self.path, mode, compression=zipfile.ZIP_DEFLATED)
+            self._names = set(self._zip.namelist())
+            atexit.register(self.close)
+        return self._zip
+
+    def put(self, key, value):
+        with self._lock:
+            z = self._open("a")
+            if key in self._written:
+                return
+            if key in self._names:
+                self._replaced += 1  # the later member with the same name is the one read back
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", UserWarning)  # "Duplicate name"
+                z.writestr(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+            self._names.add(key)
+            self._written.add(key)
+
+    def get(self, key, default=None):
+        with self._lock:
+            z = self._open("r")
+            if key not in self._names:
+                return default
+            return pickle.loads(z.read(key))
+
+    def keys(self, prefix=""):
+        with self._lock:
+            self._open("r")
+            return [k for k in self._names if k.startswith(prefix)]
+
+    def close(self):
+        with self._lock:
+            if self._zip is not None:
+                self._zip.close()
+                self._zip = None
+            if self._replaced:
+                self._compact()
+                self._replaced = 0
+
+    def _compact(self):
+        """Rewrite the archive with only the newest member per key."""
+        tmp = self.path + ".tmp"
+        with zipfile.ZipFile(self.path) as src, \
+                zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as dst:
+            latest = {info.filename: info for info in src.infolist()}
+            for info in latest.values():
+                dst.writestr(info, src.read(info))
+        os.replace(tmp, self.path)
+
+
+class RecordingProvider(MarketDataProvider):
+    """Passes calls through to inner and archives every response per symbol for ReplayProvider."""
+
+    def __init__(self, inner, path=RECORD_PATH):
+        self.inner = inner
+        self.archive = Recording(path)
+
+    def history_many(self, syms, period="1mo", interval="1d"):
+        got = self.inner.history_many(syms, period, interval)
+        for sym, d in got.items():
+            self.archive.put(f"hist/{sym}/{period}_{interval}", d)
+        return got
+
+    def history_since(self, syms, start, interval="1d"):
+        got = self.inner.history_since(syms, start, interval)
+        for sym, d in got.items():
+            self.archive.put(f"since/{sym}/{start}_{interval}", d)
+        return got
+
+    def info(self, sym):
+        info = self.inner.info(sym)
+        self.archive.put(f"info/{sym.upper()}", info)
+        return info
+
+    def news(self, url):
+        feed = self.inner.news(url)
+        entries = [{k: e.get(k) for k in NEWS_FIELDS if e.get(k) is not None} for e in feed.entries]
+        self.archive.put(_news_key(url), entries)
+        return feed
+
+
+class ReplayProvider(MarketDataProvider):
+    """Serves a RecordingProvider archive with no network, after latency_ms (± jitter_ms) per call.
+
+    A history request that was never recorded with the same period/start falls back to the
+    longest recorded frame for that symbol and interval, trimmed like the fixture backend.
+    """
+
+    def __init__(self, path=RECORD_PATH, latency_ms=REPLAY_LATENCY_MS, jitter_ms=REPLAY_JITTER_MS):
+        self.archive = Recording(path)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+
+    def _wait(self):
+        ms = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if ms > 0:
+            time.sleep(ms / 1000)
+
+    def _longest(self, sym, interval):
+        frames = [self.archive.get(k) for k in self.archive.keys(f"hist/{sym}/")
+                  if k.endswith(f"_{interval}")]
+        return max(frames, key=len, default=EMPTY)
+
+    def history_many(self, syms, period="1mo", interval="1d"):
+        self._wait()
+        out = {}
+        for sym in _unique(syms):
+            d = self.archive.get(f"hist/{sym}/{period}_{interval}")
+            if d is None:
+                d = slice_period(self._longest(sym, interval), period)
+            if not d.empty:
+                out[sym] = d
+        return out
+
+    def history_since(self, syms, start, interval="1d"):
+        self._wait()
+        out = {}
+        for sym in _unique(syms):
+            d = self.archive.get(f"since/{sym}/{start}_{interval}")
+            if d is None:
+                d = self._longest(sym, interval)
+                d = d[d.index.strftime("%Y-%m-%d") >= start] if not d.empty else d
+            if not d.empty:
+                out[sym] = d
+        return out
+
+    def info(self, sym):
+        self._wait()
+        return self.archive.get(f"info/{sym.upper()}", {})
+
+    def news(self, url):
+        self._wait()
+        entries = self.archive.get(_news_key(url), [])
+        return feedparser.FeedParserDict(entries=[
+            feedparser.FeedParserDict({k: feedparser.FeedParserDict(v) if isinstance(v, dict) else v
+                                       for k, v in e.items()})
+            for e in entries])
+
+
+_provider = None
+
+
+def get_provider():
+    """Process-wide provider. INVESTAUR_DATA (or config.DATA_BACKEND) picks the backend:
+    yfinance, fixture, record (yfinance, archived to INVESTAUR_RECORDING) or replay (that archive)."""
+    global _provider
+    if _provider is None:
+        backend = os.environ.get("INVESTAUR_DATA", DATA_BACKEND)
+        path = os.environ.get("INVESTAUR_RECORDING", RECORD_PATH)
+        if backend == "fixture":
+            inner = FixtureProvider()
+        elif backend == "replay":
+            inner = ReplayProvider(path, float(os.environ.get("INVESTAUR_LATENCY_MS", REPLAY_LATENCY_MS)))
+        elif backend == "record":
+            inner = RecordingProvider(ThrottledProvider(YFinanceProvider()), path)
+        else:
+            inner = ThrottledProvider(YFinanceProvider())
+        _provider = CoalescingProvider(inner)
+    return _provider
+
+
+def set_provider(provider):
+    global _provider
+    _provider = provider
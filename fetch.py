@@ -0,0 +1,201 @@
+"""
+INVESTAUR PRO — asyncio fetch engine: per-host limits, rate limiting, backoff, circuit breaker
+"""
+
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from config import (
+    FETCH_MAX_PER_HOST, FETCH_RATE_PER_S, FETCH_BURST, FETCH_RETRIES,
+    FETCH_BACKOFF_S, FETCH_BREAKER_FAILURES, FETCH_BREAKER_COOLDOWN_S, FETCH_JOB_THREADS,
+)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without touching the network while a host's circuit breaker is open."""
+
+
+def is_retryable(exc):
+    """Rate limits, timeouts and dropped connections are worth retrying; bad symbols are not."""
+    name = type(exc).__name__
+    text = str(exc)
+    return ("RateLimit" in name or "Timeout" in name or "Connection" in name
+            or "429" in text or "Too Many Requests" in text or "timed out" in text)
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, up to `burst` banked. Loop-thread only."""
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self._clock = clock
+        self._last = clock()
+
+    async def acquire(self):
+        while True:
+            now = self._clock()
+            self.tokens = min(self.burst, self.tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class CircuitBreaker:
+    """Opens after `failures` consecutive retryable failures; lets one probe through after `cooldown_s`."""
+
+    def __init__(self, failures, cooldown_s, clock=time.monotonic):
+        self.failures = failures
+        self.cooldown_s = cooldown_s
+        self._clock = clock
+        self._count = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return "closed"
+        return "half-open" if self._clock() - self._opened_at >= self.cooldown_s else "open"
+
+    def check(self, host):
+        state = self.state
+        if state == "open" or (state == "half-open" and self._probing):
+            raise CircuitOpenError(f"{host}: too many failures, pausing requests")
+        if state == "half-open":
+            self._probing = True
+
+    def success(self):
+        self._count = 0
+        self._opened_at = None
+        self._probing = False
+
+    def failure(self):
+        self._count += 1
+        self._probing = False
+        if self._count >= self.failures:
+            self._opened_at = self._clock()
+
+
+class _Host:
+    def __init__(self, name, max_concurrent, rate, burst, failures, cooldown_s):
+        self.name = name
+        self.sem = asyncio.Semaphore(max_concurrent)
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failures, cooldown_s)
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+
+
+class FetchEngine:
+    """Runs blocking fetch calls from an asyncio loop on its own thread.
+
+    call()/submit() route one request for a host through that host's semaphore, token
+    bucket and circuit breaker, retrying retryable errors with jittered exponential
+    backoff. map() fans a function out over many items concurrently and returns results
+    and exceptions in order, so callers can report failures instead of dropping them.
+    """
+
+    def __init__(self, max_per_host=FETCH_MAX_PER_HOST, rate=FETCH_RATE_PER_S, burst=FETCH_BURST,
+                 retries=FETCH_RETRIES, backoff_s=FETCH_BACKOFF_S,
+                 breaker_failures=FETCH_BREAKER_FAILURES, breaker_cooldown_s=FETCH_BREAKER_COOLDOWN_S,
+                 job_threads=FETCH_JOB_THREADS):
+        self._limits = (max_per_host, rate, burst, breaker_failures, breaker_cooldown_s)
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self._hosts = {}
+        # Separate pools so map() jobs blocked on nested call()s can never starve the requests.
+        self._io = ThreadPoolExecutor(max_workers=max_per_host * 4, thread_name_prefix="investaur-io")
+        self._jobs = ThreadPoolExecutor(max_workers=job_threads, thread_name_prefix="investaur-job")
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="investaur-fetch", daemon=True)
+        self._thread.start()
+
+    def _host(self, name):
+        h = self._hosts.get(name)
+        if h is None:
+            h = self._hosts[name] = _Host(name, *self._limits)
+        return h
+
+    def _delay(self, attempt):
+        return self.backoff_s * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    async def _run(self, host, fn, args, kwargs):
+        h = self._host(host)
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.retries + 1):
+            h.breaker.check(host)
+            async with h.sem:
+                await h.bucket.acquire()
+                h.requests += 1
+                try:
+                    result = await loop.run_in_executor(self._io, partial(fn, *args, **kwargs))
+                except Exception as e:
+                    if not is_retryable(e):
+                        # The host answered; the request itself was bad (unknown symbol etc.).
+                        h.breaker.success()
+                        h.errors += 1
+                        raise
+                    h.breaker.failure()
+                    if attempt == self.retries:
+                        h.errors += 1
+                        raise
+                    h.retries += 1
+                else:
+                    h.breaker.success()
+                    return result
+            await asyncio.sleep(self._delay(attempt))
+
+    def submit(self, host, fn, *args, **kwargs):
+        """Schedule fn(*args) against host; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(self._run(host, fn, args, kwargs), self._loop)
+
+    def call(self, host, fn, *args, **kwargs):
+        """Blocking submit(); must not be called from the engine's own loop thread."""
+        return self.submit(host, fn, *args, **kwargs).result()
+
+    def map(self, fn, items):
+        """Run fn(item) for every item concurrently; returns results with exceptions in place."""
+        async def _all():
+            loop = asyncio.get_running_loop()
+            return await asyncio.gather(*(loop.run_in_executor(self._jobs, fn, it) for it in items),
+                                        return_exceptions=True)
+        return asyncio.run_coroutine_threadsafe(_all(), self._loop).result()
+
+    def stats(self):
+        return {name: {"requests": h.requests, "retries": h.retries, "errors": h.errors,
+                       "breaker": h.breaker.state, "tokens": round(h.bucket.tokens, 2)}
+                for name, h in list(self._hosts.items())}
+
+
+def bridge(root, future, on_done):
+    """Deliver a concurrent future's outcome to on_done(result, error) on the Tk thread."""
+    def _done(f):
+        if f.cancelled():
+            return
+        try:
+            result, error = f.result(), None
+        except Exception as e:
+            result, error = None, e
+        root.after(0, lambda: on_done(result, error))
+    future.add_done_callback(_done)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = FetchEngine()
+        return _engine
@@ -0,0 +1,175 @@
+"""
+INVESTAUR PRO — Columnar fundamentals snapshot for screening whole index universes
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+
+from config import FUNDAMENTALS_PATH, FUNDAMENTALS_MAX_AGE_S, FUNDAMENTALS_CHUNK
+from data import _unique, get_provider
+from fetch import get_engine
+
+# Numeric columns (float64, NaN = not reported) and text columns, each with the Ticker.info
+# fields it is read from (first one present wins).
+NUMERIC = {"pe": ("trailingPE",), "eps": ("epsTrailingTwelveMonths",), "div_yield": ("dividendYield",),
+           "beta": ("beta",), "mcap": ("marketCap",)}
+TEXT = {"name": ("shortName", "longName"), "sector": ("sector",)}
+
+
+def _field(info, names):
+    return next((info[n] for n in names if info.get(n) is not None), None)
+
+
+def _num(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class FundamentalsTable:
+    """One row per symbol of NumPy columns, persisted as a single .npz.
+
+    refresh(syms) fetches the rows that are missing or older than FUNDAMENTALS_MAX_AGE_S
+    concurrently under the fetch engine's rate limits, FUNDAMENTALS_CHUNK symbols at a time,
+    writing the file after each chunk so a long refresh keeps its progress. columns(syms) is a
+    pure lookup with no network at all, so screens over it are array masks.
+    """
+
+    def __init__(self, path=FUNDAMENTALS_PATH, max_age_s=FUNDAMENTALS_MAX_AGE_S, fetch=None):
+        self.path = path
+        self.max_age_s = max_age_s
+        self._fetch = fetch or (lambda sym: get_provider().info(sym))
+        self._lock = threading.Lock()
+        self._cols = None   # column name -> array; loaded on first use
+        self._row = {}      # SYM -> row index
+
+    def _empty(self):
+        return {"symbol": np.array([], "U"), "fetched_at": np.array([]),
+                **{c: np.array([]) for c in NUMERIC}, **{c: np.array([], "U") for c in TEXT}}
+
+    def _ensure(self):
+        if self._cols is not None:
+            return
+        cols = self._empty()
+        try:
+            with np.load(self.path) as z:
+                cols = {c: z[c] for c in cols}
+        except (OSError, KeyError, ValueError):
+            pass
+        self._cols = cols
+        self._row = {s: i for i, s in enumerate(cols["symbol"].tolist())}
+
+    def _save(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, **self._cols)
+        os.replace(tmp, self.path)
+
+    def __len__(self):
+        with self._lock:
+            self._ensure()
+            return len(self._row)
+
+    def stale(self, syms, max_age_s=None):
+        """Symbols of syms with no row, or a row older than max_age_s (default: the table's)."""
+        max_age_s = self.max_age_s if max_age_s is None else max_age_s
+        cutoff = time.time() - max_age_s
+        with self._lock:
+            self._ensure()
+            at = self._cols["fetched_at"]
+            return [s for s in _unique(syms) if (i := self._row.get(s)) is None or at[i] < cutoff]
+
+    def refresh(self, syms, max_age_s=None):
+        """Fetch and store stale(syms, max_age_s); returns the symbols whose fetch failed."""
+        todo = self.stale(syms, max_age_s)
+        failed = []
+        for k in range(0, len(todo), FUNDAMENTALS_CHUNK):
+            chunk = todo[k:k + FUNDAMENTALS_CHUNK]
+            infos = get_engine().map(self._fetch, chunk)
+            got = {s: info for s, info in zip(chunk, infos) if isinstance(info, dict)}
+            failed += [s for s in chunk if s not in got]
+            self._upsert(got)
+        return failed
+
+    def _upsert(self, infos):
+        if not infos:
+            return
+        now = time.time()
+        with self._lock:
+            self._ensure()
+            new = [s for s in infos if s not in self._row]
+            if new:
+                n = len(self._row)
+                grown = {}
+                for c, a in self._cols.items():
+                    fill = np.full(len(new), np.nan) if a.dtype.kind == "f" else np.array([""] * len(new))
+                    grown[c] = np.concatenate([a, fill])
+                grown["symbol"] = np.concatenate([self._cols["symbol"], np.array(new)])
+                self._cols = grown
+                self._row.update((s, n + i) for i, s in enumerate(new))
+            idx = np.array([self._row[s] for s in infos])
+            self._cols["fetched_at"][idx] = now
+            for c, names in NUMERIC.items():
+                self._cols[c][idx] = [_num(_field(info, names)) for info in infos.values()]
+            for c, names in TEXT.items():
+                vals = np.array([str(_field(info, names) or "") for info in infos.values()])
+                col = self._cols[c]
+                if vals.dtype.itemsize > col.dtype.itemsize:
+                    col = self._cols[c] = col.astype(vals.dtype)
+                col[idx] = vals
+            self._save()
+
+    def columns(self, syms):
+        """Columns aligned to syms: every table column plus known (the symbol has a row)."""
+        syms = [s.strip().upper() for s in syms]
+        with self._lock:
+            self._ensure()
+            idx = np.array([self._row.get(s, -1) for s in syms], np.int64)
+            known = idx >= 0
+            out = {"symbol": np.array(syms, "U"), "known": known}
+            for c, a in self._cols.items():
+                if c != "symbol":
+                    blank = np.nan if a.dtype.kind == "f" else ""
+                    out[c] = np.where(known, a[idx], blank) if len(a) else np.full(len(syms), blank)
+            return out
+
+    def clear(self):
+        """Drop every row, in memory and on disk."""
+        with self._lock:
+            self._cols = self._empty()
+            self._row = {}
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+def fundamental_mask(t, pe_min=None, pe_max=None, div_min=None, beta_max=None, cap_min=None):
+    """Boolean mask over columns(): the symbol has a row and every set criterion holds.
+
+    As in the per-symbol screener, a missing P/E passes the P/E range, while a missing
+    dividend yield, beta or market cap counts as 0. div_min is in percent.
+    """
+    mask = t["known"].copy()
+    pe = t["pe"]
+    with np.errstate(invalid="ignore"):
+        if pe_min is not None:
+            mask &= np.isnan(pe) | (pe >= pe_min)
+        if pe_max is not None:
+            mask &= np.isnan(pe) | (pe <= pe_max)
+        if div_min is not None:
+            mask &= np.nan_to_num(t["div_yield"]) * 100 >= div_min
+        if beta_max is not None:
+            mask &= np.nan_to_num(t["beta"]) <= beta_max
+        if cap_min is not None:
+            mask &= np.nan_to_num(t["mcap"]) >= cap_min
+    return mask
+
+
+fund_table = FundamentalsTable()
@@ -0,0 +1,229 @@
+"""
+INVESTAUR PRO — Columnar holdings table (one row per lot)
+"""
+
+from collections.abc import Mapping
+
+import numpy as np
+
+NAT = np.datetime64("NaT", "D")
+
+
+def to_day(date):
+    """Parse a "YYYY-MM-DD" string (or date/datetime) to datetime64[D]; empty or invalid -> NaT."""
+    if not date:
+        return NAT
+    try:
+        return np.datetime64(str(date)[:10], "D")
+    except ValueError:
+        return NAT
+
+
+def _to_days(dates):
+    """to_day() over a sequence; ISO strings convert in one NumPy cast."""
+    try:
+        return np.array(dates, "datetime64[D]")
+    except (ValueError, TypeError):
+        return [to_day(d) for d in dates]
+
+
+class HoldingsTable:
+    """Lots stored column-wise in contiguous NumPy arrays with a symbol index.
+
+    Rows 0..n-1 are live; removing a lot moves the last row into its slot, so add and remove
+    are O(1) amortized and the columns stay dense. The properties return zero-copy views of
+    the live rows for vectorized P&L and allocation math. Lot ids are stable across moves.
+    """
+
+    def __init__(self, capacity=16):
+        self._n = 0
+        self._sym = np.empty(capacity, np.int32)       # symbol id per lot
+        self._shares = np.empty(capacity, np.float64)
+        self._price = np.empty(capacity, np.float64)   # cost per share
+        self._date = np.empty(capacity, "datetime64[D]")
+        self._lot = np.empty(capacity, np.int64)       # stable lot id per row
+        self._row_of = np.empty(capacity, np.int64)    # lot id -> row, -1 once removed
+        self._next_lot = 0
+        self.symbols = []                              # symbol id -> SYM
+        self._ids = {}                                 # SYM -> symbol id
+        self._lots_per_sym = np.zeros(8, np.int64)
+
+    def __len__(self):
+        return self._n
+
+    # Views of the live rows (no copies).
+    sym = property(lambda self: self._sym[:self._n])
+    shares = property(lambda self: self._shares[:self._n])
+    price = property(lambda self: self._price[:self._n])
+    date = property(lambda self: self._date[:self._n])
+    lot = property(lambda self: self._lot[:self._n])
+
+    @property
+    def nbytes(self):
+        cols = (self._sym, self._shares, self._price, self._date, self._lot, self._row_of, self._lots_per_sym)
+        return sum(a.nbytes for a in cols)
+
+    def _reserve(self, rows, lots):
+        if rows > len(self._sym):
+            cap = max(rows, 2 * len(self._sym))
+            for name in ("_sym", "_shares", "_price", "_date", "_lot"):
+                old = getattr(self, name)
+                new = np.empty(cap, old.dtype)
+                new[:self._n] = old[:self._n]
+                setattr(self, name, new)
+        if lots > len(self._row_of):
+            new = np.empty(max(lots, 2 * len(self._row_of)), np.int64)
+            new[:self._next_lot] = self._row_of[:self._next_lot]
+            self._row_of = new
+
+    def sym_id(self, sym, create=False):
+        sym = sym.upper()
+        i = self._ids.get(sym)
+        if i is None and create:
+            i = self._ids[sym] = len(self.symbols)
+            self.symbols.append(sym)
+            if i >= len(self._lots_per_sym):
+                self._lots_per_sym = np.concatenate([self._lots_per_sym, np.zeros(len(self._lots_per_sym), np.int64)])
+        return i
+
+    def add(self, sym, shares, price, date=""):
+        """Append one lot; returns its lot id."""
+        return int(self.extend([sym], [shares], [price], [date])[0])
+
+    next_lot = property(lambda self: self._next_lot)
+
+    def extend(self, syms, shares, prices, dates=None, lots=None):
+        """Bulk-append lots (e.g. an imported broker book); returns their lot ids.
+
+        lots restores saved lot ids instead of numbering new ones; they must be distinct and
+        at or above next_lot. Ids skipped over count as removed lots.
+        """
+        k = len(syms)
+        if lots is None:
+            lots = np.arange(self._next_lot, self._next_lot + k)
+        else:
+            lots = np.asarray(lots, np.int64)
+            if k and (lots.min() < self._next_lot or len(np.unique(lots)) != k):
+                raise ValueError("lot ids already in use")
+        top = int(lots.max()) + 1 if k else self._next_lot
+        # One sym_id() per distinct symbol, created in order of first appearance.
+        uniq, first, inv = np.unique(np.asarray(syms, str), return_index=True, return_inverse=True)
+        sid = np.empty(len(uniq), np.int32)
+        for j in np.argsort(first, kind="stable"):
+            sid[j] = self.sym_id(str(uniq[j]), create=True)
+        ids = sid[inv.reshape(-1)] if k else np.empty(0, np.int32)
+        self._reserve(self._n + k, top)
+        self._row_of[self._next_lot:top] = -1
+        rows = slice(self._n, self._n + k)
+        self._sym[rows] = ids
+        self._shares[rows] = shares
+        self._price[rows] = prices
+        self._date[rows] = _to_days(dates) if dates is not None else NAT
+        self._lot[rows] = lots
+        self._row_of[lots] = np.arange(self._n, self._n + k)
+        np.add.at(self._lots_per_sym, ids, 1)
+        self._n += k
+        self._next_lot = top
+        return lots
+
+    def skip_lots(self, next_lot):
+        """Never hand out lot ids below next_lot (restoring a table whose newest lots were sold)."""
+        if next_lot > self._next_lot:
+            self._reserve(self._n, next_lot)
+            self._row_of[self._next_lot:next_lot] = -1
+            self._next_lot = next_lot
+
+    def remove_lot(self, lot):
+        """Drop one lot by id; the last row moves into its slot."""
+        r = self.row(lot)
+        if r < 0:
+            raise KeyError(lot)
+        last = self._n - 1
+        self._lots_per_sym[self._sym[r]] -= 1
+        if r != last:
+            for a in (self._sym, self._shares, self._price, self._date, self._lot):
+                a[r] = a[last]
+            self._row_of[self._lot[r]] = r
+        self._row_of[lot] = -1
+        self._n = last
+
+    def row(self, lot):
+        """Current row of a lot id, or -1 if it was removed."""
+        return int(self._row_of[lot]) if 0 <= lot < self._next_lot else -1
+
+    def reduce_lot(self, lot, shares):
+        """Take shares off a lot in place (partial sale); the caller removes emptied lots."""
+        self._shares[self.row(lot)] -= shares
+
+    def remove_symbol(self, sym):
+        i = self.sym_id(sym)
+        if i is None:
+            return
+        # Highest rows first, so a moved-in last row is never one still waiting to be removed.
+        for r in np.flatnonzero(self.sym == i)[::-1]:
+            self.remove_lot(int(self._lot[r]))
+
+    def rows_of(self, sym):
+        i = self.sym_id(sym)
+        return np.empty(0, np.int64) if i is None else np.flatnonzero(self.sym == i)
+
+    def held_ids(self):
+        """Symbol ids with at least one lot, in first-added order."""
+        return np.flatnonzero(self._lots_per_sym[:len(self.symbols)])
+
+    def positions(self):
+        """(symbol ids, total shares, total cost) per held symbol, aggregated over lots."""
+        ids = self.held_ids()
+        m = len(self.symbols)
+        shares = np.bincount(self.sym, weights=self.shares, minlength=m)
+        cost = np.bincount(self.sym, weights=self.shares * self.price, minlength=m)
+        return ids, shares[ids], cost[ids]
+
+
+class HoldingsView(Mapping):
+    """Read-only {TICKER: Holding} over a HoldingsTable, one aggregated Holding per ticker.
+
+    Shares are summed over lots, avg_price is the share-weighted cost and purchase_date is
+    the earliest lot's date.
+    """
+
+    def __init__(self, table, holding_cls):
+        self._t = table
+        self._cls = holding_cls
+
+    def __getitem__(self, sym):
+        t = self._t
+        rows = t.rows_of(sym)
+        if not len(rows):
+            raise KeyError(sym)
+        shares = t.shares[rows]
+        total = float(shares.sum())
+        avg = float((shares * t.price[rows]).sum() / total) if total else float(t.price[rows].mean())
+        dates = t.date[rows]
+        dates = dates[~np.isnat(dates)]
+        return self._cls(t.symbols[t.sym_id(sym)], total, avg, str(dates.min()) if len(dates) else "")
+
+    def values(self):
+        # One vectorized pass over the lots instead of a row scan per ticker.
+        t = self._t
+        ids, shares, cost = t.positions()
+        first = np.full(len(t.symbols), np.datetime64("9999-12-31"), "datetime64[D]")
+        dated = ~np.isnat(t.date)
+        np.minimum.at(first, t.sym[dated], t.date[dated])
+        return [self._cls(t.symbols[i], float(n), float(c / n) if n else 0.0,
+                          "" if np.datetime64("9999-12-31") == first[i] else str(first[i]))
+                for i, n, c in zip(ids, shares, cost)]
+
+    def items(self):
+        return [(h.ticker, h) for h in self.values()]
+
+    def __iter__(self):
+        symbols = self._t.symbols
+        return iter([symbols[i] for i in self._t.held_ids()])
+
+    def __len__(self):
+        return len(self._t.held_ids())
+
+    def __contains__(self, sym):
+        i = self._t.sym_id(sym)
+        return i is not None and self._t._lots_per_sym[i] > 0
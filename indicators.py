@@ -0,0 +1,359 @@
+"""
+INVESTAUR PRO — Vectorized technical indicators (1-D series or bars × symbols matrices)
+"""
+
+from collections import deque
+
+import numpy as np
+
+_BLOCK_GAIN = 1e12  # largest decay**-i a smoothing block may scale by before it is rebased
+
+
+def _cols(x):
+    """x as a float (bars × columns) matrix, plus a function that restores x's shape."""
+    a = np.asarray(x, float)
+    if a.ndim == 1:
+        return a[:, None], lambda m: m[:, 0]
+    return a, lambda m: m
+
+
+def smooth(x, decay, seed=None):
+    """First-order recursive filter down axis 0: y[0] = seed (default x[0]), y[t] = decay*y[t-1] + (1-decay)*x[t].
+
+    Exact, with no per-bar Python loop: within a block of bars the recursion unrolls to
+    y[s+i] = decay**i * (y[s-1] + (1-decay) * cumsum(x * decay**-j)). Blocks are sized so
+    decay**-j stays below _BLOCK_GAIN, which keeps the unrolled sum as precise as the loop;
+    each block carries its last row into the next. A NaN propagates forward, as in the loop.
+    """
+    c, shape = _cols(x)
+    out = np.empty(c.shape)
+    if not len(c):
+        return shape(out)
+    out[0] = c[0] if seed is None else seed
+    if decay <= 0:
+        out[1:] = c[1:]
+        return shape(out)
+    block = int(np.clip(np.log(_BLOCK_GAIN) / -np.log(decay), 1, len(c)))
+    powers = decay ** np.arange(1, block + 1)[:, None]
+    for s in range(1, len(c), block):
+        p = powers[:len(c) - s]
+        out[s:s + len(p)] = p * (out[s - 1] + (1 - decay) * np.cumsum(c[s:s + len(p)] / p, axis=0))
+    return shape(out)
+
+
+def ema(x, n):
+    """Exponential moving average (k = 2/(n+1)), seeded with the first value."""
+    return smooth(x, 1 - 2 / (n + 1))
+
+
+def rolling_mean(x, n):
+    """Trailing n-bar mean via cumulative sums; NaN until n non-NaN bars are in the window."""
+    c, shape = _cols(x)
+    out = np.full(c.shape, np.nan)
+    if len(c) < n:
+        return shape(out)
+    gaps = np.isnan(c)
+    cs = np.zeros((len(c) + 1, c.shape[1]))
+    np.cumsum(np.where(gaps, 0.0, c) if gaps.any() else c, axis=0, out=cs[1:])
+    out[n - 1:] = cs[n:] - cs[:-n]
+    out[n - 1:] /= n
+    if gaps.any():
+        cnt = np.zeros(cs.shape, np.int64)
+        np.cumsum(gaps, axis=0, out=cnt[1:])
+        out[n - 1:][cnt[n:] != cnt[:-n]] = np.nan
+    return shape(out)
+
+
+sma = rolling_mean
+
+
+def rolling_std(x, n, ddof=0):
+    """Trailing n-bar standard deviation from cumulative sums of x and x²; NaN where rolling_mean is.
+
+    Each column is first shifted by its first valid value so the sums of squares do not swamp
+    the variance.
+    """
+    c, shape = _cols(x)
+    if len(c) < n or n <= ddof:
+        return shape(np.full(c.shape, np.nan))
+    shifted = c - c[np.argmax(~np.isnan(c), axis=0), np.arange(c.shape[1])]
+    m = rolling_mean(shifted, n)
+    var = (rolling_mean(shifted ** 2, n) - m ** 2) * (n / (n - ddof))
+    return shape(np.sqrt(np.maximum(var, 0)))
+
+
+def rsi(x, n=14):
+    """Wilder RSI: gains and losses averaged over the first n changes, then smoothed by 1/n.
+
+    NaN for the first n bars of each column. A column that starts late (leading NaNs, e.g.
+    before a listing) is computed from its own bars, as if its series began there.
+    """
+    c, shape = _cols(x)
+    out = np.full(c.shape, np.nan)
+    if len(c) <= n:
+        return shape(out)
+    ag, al = _wilder_averages(c, n)
+    out[n:] = 100 - 100 / (1 + ag / np.maximum(al, 1e-12))
+    valid = ~np.isnan(c)
+    first = np.argmax(valid, axis=0)
+    for j in np.flatnonzero((first > 0) & valid.any(axis=0)):
+        out[:first[j], j] = np.nan
+        out[first[j]:, j] = rsi(c[first[j]:, j], n)
+    return shape(out)
+
+
+def _wilder_averages(c, n):
+    """Average gain and loss matrices for bars n… of c (needs more than n bars)."""
+    d = np.nan_to_num(np.diff(c, axis=0, prepend=c[:1]))
+    g, l = np.maximum(d, 0), np.maximum(-d, 0)
+    return (smooth(g[n:], 1 - 1 / n, seed=g[1:n + 1].mean(axis=0)),
+            smooth(l[n:], 1 - 1 / n, seed=l[1:n + 1].mean(axis=0)))
+
+
+def macd(x, fast=12, slow=26, signal=9):
+    """(line, signal, histogram): EMA(fast) − EMA(slow), its EMA(signal), and their difference."""
+    line = ema(x, fast) - ema(x, slow)
+    sig = ema(line, signal)
+    return line, sig, line - sig
+
+
+def bollinger(x, n=20, k=2.0):
+    """(mid, upper, lower): the n-bar mean ± k population standard deviations."""
+    mid, sd = rolling_mean(x, n), rolling_std(x, n)
+    return mid, mid + k * sd, mid - k * sd
+
+
+def drawdown(x):
+    """Fractional drop from the running peak at every bar (0 at a new high, negative below it)."""
+    c, shape = _cols(x)
+    peak = np.fmax.accumulate(c, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return shape(c / peak - 1)
+
+
+def max_drawdown(x):
+    """Worst drawdown in percent (≤ 0): a float for a series, one per column for a matrix."""
+    dd = drawdown(x)
+    worst = np.nan_to_num(np.fmin.reduce(dd, axis=0, initial=0.0) * 100)
+    return float(worst) if dd.ndim == 1 else worst
+
+
+# ── Streaming: O(1) per bar or tick, seeded once from history ──
+#
+# update(x) starts a new bar; update(x, new_bar=False) revises the latest bar (an intraday
+# tick), recomputing it from the state saved before that bar. Seeding runs the vectorized
+# functions above over the history, so a stream matches them to rounding.
+
+class EMA:
+    def __init__(self, n, history=()):
+        self.k = 2 / (n + 1)
+        self.value = self._base = None
+        h = np.asarray(history, float)
+        if len(h):
+            self.value = float(ema(h[:-1], n)[-1]) if len(h) > 1 else None
+            self.update(h[-1])
+
+    def update(self, x, new_bar=True):
+        if new_bar:
+            self._base = self.value
+        self.value = float(x) if self._base is None else self._base + self.k * (x - self._base)
+        return self.value
+
+
+class MACD:
+    def __init__(self, history=(), fast=12, slow=26, signal=9):
+        h = np.asarray(history, float)
+        self.fast, self.slow = EMA(fast, h), EMA(slow, h)
+        self.signal = EMA(signal, ema(h, fast) - ema(h, slow) if len(h) else ())
+
+    @property
+    def line(self):
+        return np.nan if self.fast.value is None else self.fast.value - self.slow.value
+
+    def update(self, x, new_bar=True):
+        self.fast.update(x, new_bar)
+        self.slow.update(x, new_bar)
+        self.signal.update(self.line, new_bar)
+        return self.line, self.signal.value, self.line - self.signal.value
+
+
+class RSI:
+    """Wilder RSI: a running mean of the first n changes, then 1/n smoothing; NaN until n changes."""
+
+    def __init__(self, n=14, history=()):
+        self.n = n
+        self.state = self._base = None  # (close, avg gain, avg loss, changes seen)
+        h = np.asarray(history, float)
+        if len(h) > n + 2:
+            ag, al = _wilder_averages(h[:-1, None], n)
+            self.state = (h[-2], ag[-1, 0], al[-1, 0], len(h) - 2)
+        else:
+            for x in h[:-1]:
+                self.update(x)
+        if len(h):
+            self.update(h[-1])
+
+    def update(self, x, new_bar=True):
+        if new_bar or self.state is None:
+            self._base = self.state
+        if self._base is None:
+            self.state = (x, 0.0, 0.0, 0)
+        else:
+            prev, ag, al, seen = self._base
+            d = x - prev if np.isfinite(x - prev) else 0.0
+            seen += 1
+            w = 1 / min(seen, self.n)  # running mean while warming up, Wilder smoothing after
+            self.state = (x, ag + (max(d, 0) - ag) * w, al + (max(-d, 0) - al) * w, seen)
+        return self.value
+
+    @property
+    def value(self):
+        if self.state is None or self.state[3] < self.n:
+            return np.nan
+        _, ag, al, _ = self.state
+        return 100 - 100 / (1 + ag / max(al, 1e-12))
+
+
+class Rolling:
+    """Mean and population standard deviation of the last n values.
+
+    Running sums are kept relative to a recent value (so squares do not swamp the variance)
+    and rebuilt from the window every n bars, so rounding never accumulates.
+    """
+
+    def __init__(self, n, history=()):
+        self.n = n
+        self._win = deque(maxlen=n)
+        self._ref = self._sum = self._sq = 0.0
+        self._since = 0
+        h = np.asarray(history, float)[-n:]
+        if len(h):
+            self._win.extend(h.tolist())
+            self._rebuild()
+
+    def _rebuild(self):
+        self._ref = self._win[-1]
+        d = np.asarray(self._win) - self._ref
+        self._sum, self._sq, self._since = float(d.sum()), float((d * d).sum()), 0
+
+    def update(self, x, new_bar=True):
+        w = self._win
+        if not w:
+            self._ref = float(x)
+            new_bar = True
+        d = x - self._ref
+        if new_bar:
+            if len(w) == self.n:
+                old = w[0] - self._ref
+                self._sum -= old
+                self._sq -= old * old
+            w.append(x)
+            self._sum += d
+            self._sq += d * d
+            self._since += 1
+            if self._since >= self.n:
+                self._rebuild()
+        else:
+            old = w[-1] - self._ref
+            w[-1] = x
+            self._sum += d - old
+            self._sq += d * d - old * old
+        return self.mean
+
+    @property
+    def full(self):
+        return len(self._win) == self.n
+
+    @property
+    def mean(self):
+        return self._ref + self._sum / self.n if self.full else np.nan
+
+    @property
+    def std(self):
+        if not self.full:
+            return np.nan
+        m = self._sum / self.n
+        return float(np.sqrt(max(self._sq / self.n - m * m, 0.0)))
+
+
+class Drawdown:
+    """Running peak and worst drawdown (fractions)."""
+
+    def __init__(self, history=()):
+        self.peak, self.worst, self.current = np.nan, 0.0, np.nan
+        self._base = None
+        h = np.asarray(history, float)
+        if len(h) > 1:
+            self.peak = float(np.nanmax(h[:-1])) if np.isfinite(h[:-1]).any() else np.nan
+            self.worst = float(np.fmin.reduce(drawdown(h[:-1]), initial=0.0))
+        if len(h):
+            self.update(h[-1])
+
+    def update(self, x, new_bar=True):
+        if new_bar or self._base is None:
+            self._base = (self.peak, self.worst)
+        peak, worst = self._base
+        self.peak = float(np.fmax(peak, x))
+        self.current = x / self.peak - 1 if self.peak else np.nan
+        self.worst = float(np.fmin(worst, self.current))
+        return self.current
+
+    @property
+    def max_drawdown(self):
+        """Worst drawdown in percent, as max_drawdown()."""
+        return self.worst * 100
+
+
+class InsightStream:
+    """The Insight tab's scalar metrics (as InvestaurPro._ai_metrics) for one symbol, kept live.
+
+    update(price, day) starts a new bar for a quote on a later session day than the last bar
+    and otherwise (same, earlier or unknown day) revises the last bar; either way it costs a
+    few dozen float operations.
+    """
+
+    def __init__(self, closes, day=None):
+        c = np.asarray(closes, float)
+        self.day, self.bars = day, len(c)
+        self.closes = deque(c[-253:].tolist(), maxlen=253)
+        self.sma = {n: Rolling(n, c) for n in (20, 50, 200)}
+        r = np.diff(c) / c[:-1]
+        self.vol, self.year = Rolling(30, r), Rolling(252, r)
+        self.rsi, self.macd, self.dd = RSI(14, c), MACD(c), Drawdown(c)
+
+    def update(self, price, day=None):
+        new_bar = not self.bars or (day is not None and self.day is not None and day > self.day)
+        if day is not None and (self.day is None or day > self.day):
+            self.day = day
+        c = self.closes
+        if new_bar:
+            c.append(price)
+            self.bars += 1
+        else:
+            c[-1] = price
+        for r in self.sma.values():
+            r.update(price, new_bar)
+        if len(c) > 1:
+            ret = price / c[-2] - 1
+            self.vol.update(ret, new_bar)
+            self.year.update(ret, new_bar)
+        self.rsi.update(price, new_bar)
+        self.macd.update(price, new_bar)
+        self.dd.update(price, new_bar)
+        return self.metrics()
+
+    def metrics(self):
+        c, curr = self.closes, self.closes[-1]
+        mom = lambda k: (curr / c[-k] - 1) * 100 if self.bars >= k else 0
+        rsi = self.rsi.value
+        sma20, sd20 = self.sma[20].mean, self.sma[20].std
+        line, signal = self.macd.line, self.macd.signal.value
+        return dict(curr=curr, sma20=sma20,
+                    sma50=self.sma[50].mean if self.sma[50].full else None,
+                    sma200=self.sma[200].mean if self.sma[200].full else None,
+                    rsi=50.0 if np.isnan(rsi) else rsi, macd=line, macd_signal=signal,
+                    bb_mean=sma20, bb_up=sma20 + 2 * sd20, bb_lo=sma20 - 2 * sd20,
+                    vol_ann=self.vol.std * np.sqrt(252) * 100 if self.vol.full else 0,
+                    sharpe=self.year.mean / max(self.year.std, 1e-9) * np.sqrt(252) if self.year.full else 0,
+                    mom_1m=mom(22), mom_3m=mom(63), mom_6m=mom(126), mom_1y=mom(252),
+                    max_dd=self.dd.max_drawdown)
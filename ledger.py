@@ -0,0 +1,117 @@
+"""
+INVESTAUR PRO — Append-only binary trade ledger with periodic state snapshots
+"""
+
+import os
+import pickle
+import threading
+import time
+
+import numpy as np
+
+# Event kinds
+BUY, SELL, CASH, RESET, ORDER, TRIGGER, CANCEL = 1, 2, 3, 4, 5, 6, 7
+KIND_NAMES = {BUY: "BUY", SELL: "SELL", CASH: "CASH", RESET: "RESET",
+              ORDER: "ORDER", TRIGGER: "TRIGGER", CANCEL: "CANCEL"}
+
+# One fixed-width little-endian record per event; the record number is the event's sequence.
+# price carries the new balance for CASH/RESET and the limit (NaN if none) of an ORDER.
+# aux is the realized gain of a SELL or the stop (NaN if none) of an ORDER, NaN otherwise.
+# ref is the resting order an ORDER opens or a fill/TRIGGER/CANCEL refers to, -1 otherwise;
+# an ORDER's shares are negative for a sell.
+RECORD = np.dtype([("ts", "<f8"), ("kind", "u1"), ("sym", "S15"), ("shares", "<f8"),
+                   ("price", "<f8"), ("aux", "<f8"), ("ref", "<i8")])
+
+
+class Ledger:
+    """Event log at <root>/ledger.bin plus the latest state snapshot at <root>/snapshot.pkl.
+
+    Records are appended in timestamp order and never rewritten, so a time-range query is a
+    binary search over the memory-mapped ts column. snapshot(state, seq) stores a pickled
+    state that already includes events [0, seq); loading reads it and replays only the tail.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.path = os.path.join(root, "ledger.bin")
+        self.snapshot_path = os.path.join(root, "snapshot.pkl")
+        self._lock = threading.Lock()
+        self._last_ts = 0.0
+        os.makedirs(root, exist_ok=True)
+        recs = self.records()
+        if len(recs):
+            self._last_ts = float(recs["ts"][-1])
+
+    def __len__(self):
+        try:
+            return os.path.getsize(self.path) // RECORD.itemsize
+        except OSError:
+            return 0
+
+    def append(self, kind, sym="", shares=0.0, price=0.0, aux=np.nan, ts=None, ref=-1):
+        """Write one event; returns its sequence number."""
+        rec = np.zeros(1, RECORD)
+        with self._lock:
+            # Clamp to keep the file sorted by time even if the wall clock steps back.
+            ts = self._last_ts = max(self._last_ts, time.time() if ts is None else ts)
+            rec[0] = (ts, kind, sym.encode()[:15], shares, price, aux, ref)
+            with open(self.path, "ab") as f:
+                f.write(rec.tobytes())
+            return len(self) - 1
+
+    def records(self, start=0, stop=None):
+        """Events [start, stop) as a read-only structured array (memory-mapped, nothing copied)."""
+        n = len(self)
+        stop = n if stop is None else min(stop, n)
+        if start >= stop:
+            return np.zeros(0, RECORD)
+        return np.memmap(self.path, RECORD, "r", offset=start * RECORD.itemsize, shape=(stop - start,))
+
+    def between(self, t0=None, t1=None, limit=None):
+        """Events with t0 <= ts <= t1 (epoch seconds), newest last; limit keeps only the newest ones."""
+        recs = self.records()
+        ts = recs["ts"]
+        lo = 0 if t0 is None else int(np.searchsorted(ts, t0, "left"))
+        hi = len(recs) if t1 is None else int(np.searchsorted(ts, t1, "right"))
+        if limit is not None:
+            lo = max(lo, hi - limit)
+        return recs[lo:hi]
+
+    def snapshot(self, state, seq):
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump({"seq": seq, "state": state}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.snapshot_path)
+
+    def load_snapshot(self):
+        """(state, seq) of the latest snapshot, or (None, 0) if there is none usable."""
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                snap = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None, 0
+        if snap["seq"] > len(self):
+            return None, 0  # log was truncated behind the snapshot's back
+        return snap["state"], snap["seq"]
+
+
+def describe(rec):
+    """One trade-log line for a ledger record."""
+    kind, sym, ref = int(rec["kind"]), rec["sym"].decode(), int(rec["ref"])
+    s, p, aux = float(rec["shares"]), float(rec["price"]), float(rec["aux"])
+    via = f"  [order #{ref}]" if ref >= 0 else ""
+    if kind == BUY:
+        return f"Purchased {s:.4g} {sym} @ ${p:.2f}  (Cost: ${p*s:,.2f}){via}"
+    if kind == SELL:
+        return f"Sold {s:.4g} {sym} @ ${p:.2f}  (Proceeds: ${p*s:,.2f}, realized {'+' if aux >= 0 else '-'}${abs(aux):,.2f}){via}"
+    if kind == ORDER:
+        terms = " ".join(x for x in (f"stop ${aux:.2f}" if aux == aux else "",
+                                     f"limit ${p:.2f}" if p == p else "") if x)
+        return f"Order #{ref} placed: {'BUY' if s > 0 else 'SELL'} {abs(s):.4g} {sym} {terms}"
+    if kind == TRIGGER:
+        return f"Order #{ref} stop hit, now resting as a limit"
+    if kind == CANCEL:
+        return f"Order #{ref} cancelled"
+    if kind == CASH:
+        return f"Cash balance set to ${p:,.2f}"
+    return f"Account reset to ${p:,.2f}"
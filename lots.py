@@ -0,0 +1,236 @@
+"""
+INVESTAUR PRO — Tax-lot accounting: FIFO / LIFO / HIFO / specific-ID sells and realized gains
+"""
+
+import bisect
+import heapq
+from collections import defaultdict, namedtuple
+from datetime import date as _date
+
+import numpy as np
+
+from holdings import HoldingsTable, to_day
+
+FIFO, LIFO, HIFO, SPECIFIC = "FIFO", "LIFO", "HIFO", "SPECIFIC"
+METHODS = (FIFO, LIFO, HIFO)
+EPS = 1e-9
+
+# One closed (part of a) lot. long_term: held more than a year.
+Realized = namedtuple("Realized", "date symbol lot shares proceeds cost gain long_term")
+
+
+def _new_heaps():
+    return {m: [] for m in METHODS}
+
+
+def _new_position():
+    return [0.0, 0.0]
+
+
+def _day_num(day):
+    """datetime64[D] -> int day number; undated lots sort as the oldest."""
+    return np.iinfo(np.int64).min if np.isnat(day) else int(day.astype(np.int64))
+
+
+class LotBook:
+    """Lot-level accounting over a HoldingsTable.
+
+    Each symbol keeps one heap of lot ids per disposal method (oldest first, newest first,
+    highest cost first). A sell pops from the chosen heap, so consuming k lots is
+    O(k log n), and a partial sale just shrinks the lot at the head. Lots closed through
+    another heap are skipped lazily when they surface. Open shares/cost per symbol and
+    realized gains (total, per year, per symbol and as prefix sums over sale dates) are
+    updated on every trade, so queries like year-to-date realized P&L are O(1) or O(log n).
+    """
+
+    def __init__(self, table=None, method=FIFO):
+        self.table = HoldingsTable() if table is None else table
+        self.method = method
+        self._heaps = defaultdict(_new_heaps)                       # SYM -> method -> heap
+        self._seq = 0
+        self._open = defaultdict(_new_position)                     # SYM -> [shares, cost]
+        self.realized = []                                          # Realized, in sale-date order
+        self.realized_version = 0                                   # bumped when a record lands before the end
+        self._sale_days = []
+        self._cum_gain = [0.0]                                      # prefix sums of realized gain
+        self._by_year = defaultdict(float)
+        self._by_symbol = defaultdict(float)
+        self.realized_total = 0.0
+        self._index_rows(np.arange(len(self.table)))
+
+    def _index(self, sym, lot, shares, price, day):
+        n, seq = _day_num(day), self._seq
+        self._seq += 1
+        h = self._heaps[sym]
+        heapq.heappush(h[FIFO], (n, seq, lot))
+        heapq.heappush(h[LIFO], (-n, -seq, lot))
+        heapq.heappush(h[HIFO], (-price, seq, lot))
+        pos = self._open[sym]
+        pos[0] += shares
+        pos[1] += shares * price
+
+    def _index_rows(self, rows):
+        """Index many table rows at once: one sort per disposal method builds every symbol's heap (a sorted list is a heap)."""
+        if not len(rows):
+            return
+        t = self.table
+        sym, lot, shares, price, day = t.sym[rows], t.lot[rows], t.shares[rows], t.price[rows], t.date[rows]
+        # min + 1 so negating for LIFO cannot overflow; undated lots still sort as the oldest.
+        n = np.where(np.isnat(day), np.iinfo(np.int64).min + 1, day.astype(np.int64))
+        seq = np.arange(self._seq, self._seq + len(rows))
+        self._seq += len(rows)
+        # One sort per method over all rows, grouped by symbol; each group's slice is a heap.
+        by_sym = np.sort(sym, kind="stable")
+        cuts = np.flatnonzero(np.diff(by_sym)) + 1
+        starts, ends = np.r_[0, cuts].tolist(), np.r_[cuts, len(rows)].tolist()
+        names = [t.symbols[i] for i in by_sym[starts].tolist()]
+        for method, k1, k2 in ((FIFO, n, seq), (LIFO, -n, -seq), (HIFO, -price, seq)):
+            o = np.lexsort((k2, k1, sym))
+            entries = list(zip(k1[o].tolist(), k2[o].tolist(), lot[o].tolist()))
+            for name, i, j in zip(names, starts, ends):
+                h = self._heaps[name][method]
+                if h:
+                    h.extend(entries[i:j])
+                    heapq.heapify(h)
+                else:
+                    self._heaps[name][method] = entries[i:j]
+        open_sh = np.bincount(sym, weights=shares, minlength=len(t.symbols))
+        open_cost = np.bincount(sym, weights=shares * price, minlength=len(t.symbols))
+        for name, i in zip(names, by_sym[starts].tolist()):
+            pos = self._open[name]
+            pos[0] += float(open_sh[i])
+            pos[1] += float(open_cost[i])
+
+    # ── Positions ─────────────────────────────
+    def buy(self, sym, shares, price, date=""):
+        """Open a lot; returns its lot id."""
+        sym = sym.upper()
+        lot = self.table.add(sym, shares, price, date)
+        self._index(sym, lot, shares, price, to_day(date))
+        return lot
+
+    def extend(self, syms, shares, prices, dates=None, lots=None):
+        """Bulk-open lots (an imported broker book, or saved lots with their ids); returns their lot ids."""
+        lots = self.table.extend(syms, shares, prices, dates, lots)
+        self._index_rows(np.arange(len(self.table) - len(lots), len(self.table)))
+        return lots
+
+    def position(self, sym):
+        """(open shares, open cost, average cost) for sym."""
+        shares, cost = self._open.get(sym.upper(), (0.0, 0.0))
+        return shares, cost, (cost / shares if shares > EPS else 0.0)
+
+    def positions(self):
+        """{SYM: (shares, cost, avg)} for every symbol with open shares."""
+        return {s: (n, c, c / n) for s, (n, c) in self._open.items() if n > EPS}
+
+    def unrealized(self, quotes):
+        """{SYM: unrealized gain} at quotes ({SYM: (last, prev)}); symbols without a quote are skipped."""
+        return {s: quotes[s][0] * n - c for s, (n, c) in self._open.items() if n > EPS and s in quotes}
+
+    def remove_symbol(self, sym):
+        """Forget every open lot of sym without realizing anything (e.g. deleted from the portfolio)."""
+        sym = sym.upper()
+        self.table.remove_symbol(sym)
+        self._heaps.pop(sym, None)
+        self._open.pop(sym, None)
+
+    # ── Sells ─────────────────────────────────
+    def sell(self, sym, shares, price, date="", method=None, lots=None):
+        """Close shares of sym at price; returns the Realized slices.
+
+        method is FIFO, LIFO or HIFO (default: the book's). For specific identification pass
+        lots={lot_id: shares}. Raises ValueError when more shares are asked for than are open.
+        """
+        sym = sym.upper()
+        day = to_day(date or _date.today().isoformat())
+        if shares > self.position(sym)[0] + EPS:
+            raise ValueError(f"Not enough shares of {sym}: holding {self.position(sym)[0]:.4g}, selling {shares:.4g}.")
+        if lots is not None:
+            if abs(sum(lots.values()) - shares) > EPS:
+                raise ValueError("Specific lots do not add up to the shares sold.")
+            # Check every lot before closing any, so a bad entry leaves the book untouched.
+            t = self.table
+            for lot, take in lots.items():
+                r = t.row(lot)
+                if r < 0 or t.symbols[t.sym[r]] != sym:
+                    raise ValueError(f"Lot {lot} is not an open {sym} lot.")
+                if float(take) > float(t.shares[r]) + EPS:
+                    raise ValueError(f"Lot {lot} holds {float(t.shares[r]):.4g} shares, cannot sell {float(take):.4g}.")
+            return [self._close(sym, lot, take, price, day) for lot, take in lots.items()]
+        heap = self._heaps[sym][method or self.method]
+        out, left = [], shares
+        while left > EPS and heap:
+            lot = heap[0][-1]
+            r = self.table.row(lot)
+            if r < 0:
+                heapq.heappop(heap)  # closed through another heap or by specific ID
+                continue
+            take = min(left, float(self.table.shares[r]))
+            out.append(self._close(sym, lot, take, price, day))
+            left -= take
+        return out
+
+    def _close(self, sym, lot, take, price, day):
+        t = self.table
+        r = t.row(lot)
+        if r < 0 or t.symbols[t.sym[r]] != sym:
+            raise ValueError(f"Lot {lot} is not an open {sym} lot.")
+        take, avail, cost_ps, bought = float(take), float(t.shares[r]), float(t.price[r]), t.date[r]
+        if take > avail + EPS:
+            raise ValueError(f"Lot {lot} holds {avail:.4g} shares, cannot sell {take:.4g}.")
+        if take >= avail - EPS:
+            take = avail
+            t.remove_lot(lot)
+        else:
+            t.reduce_lot(lot, take)
+        pos = self._open[sym]
+        pos[0] -= take
+        pos[1] -= take * cost_ps
+        long_term = not np.isnat(bought) and int((day - bought).astype(np.int64)) > 365
+        rec = Realized(str(day), sym, lot, take, take * price, take * cost_ps, take * (price - cost_ps), long_term)
+        self._record(rec, int(day.astype(np.int64)))
+        return rec
+
+    def _record(self, rec, day):
+        self.realized_total += rec.gain
+        self._by_year[rec.date[:4]] += rec.gain
+        self._by_symbol[rec.symbol] += rec.gain
+        if not self._sale_days or day >= self._sale_days[-1]:
+            self.realized.append(rec)
+            self._sale_days.append(day)
+            self._cum_gain.append(self._cum_gain[-1] + rec.gain)
+            return
+        # Back-dated sale: insert in date order and rebuild the prefix sums after it.
+        self.realized_version += 1
+        i = bisect.bisect_right(self._sale_days, day)
+        self.realized.insert(i, rec)
+        self._sale_days.insert(i, day)
+        del self._cum_gain[i + 1:]
+        for r in self.realized[i:]:
+            self._cum_gain.append(self._cum_gain[-1] + r.gain)
+
+    def restore_realized(self, records):
+        """Reload closed-lot history (Realized tuples, any order) into an empty book's aggregates."""
+        recs = sorted(records, key=lambda r: r.date)
+        self.realized = recs
+        self.realized_version += 1
+        self._sale_days = [int(to_day(r.date).astype(np.int64)) for r in recs]
+        self._cum_gain = [0.0, *np.cumsum([r.gain for r in recs]).tolist()]
+        for r in recs:
+            self._by_year[r.date[:4]] += r.gain
+            self._by_symbol[r.symbol] += r.gain
+        self.realized_total = sum(r.gain for r in recs)
+
+    # ── Realized gain queries ─────────────────
+    def realized_ytd(self, year=None):
+        return self._by_year.get(str(year or _date.today().year), 0.0)
+
+    def realized_for(self, sym):
+        return self._by_symbol.get(sym.upper(), 0.0)
+
+    def realized_between(self, start, end):
+        """Realized gain from sales dated start..end inclusive ("YYYY-MM-DD"), by binary search."""
+        lo = bisect.bisect_left(self._sale_days, int(to_day(start).astype(np.int64)))
+        hi = bisect.bisect_right(self._sale_days, int(to_day(end).astype(np.int64)))
+        return self._cum_gain[hi] - self._cum_gain[lo] if hi > lo else 0.0
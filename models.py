@@ -2,10 +2,19 @@
 INVESTAUR PRO — Data models and company info
 """
 
+import time
 from dataclasses import dataclass, field
 from datetime import datetime
 
-import yfinance as yf
+import numpy as np
+
+from config import SIM_DIR, SIM_SNAPSHOT_EVERY
+from holdings import HoldingsTable, HoldingsView
+from ledger import Ledger, RECORD, BUY, SELL, CASH, RESET, ORDER, TRIGGER, CANCEL
+from lots import LotBook, FIFO
+from orders import Order, OrderBook, BUY_SIDE, SELL_SIDE, LIMIT, STOP, STOP_LIMIT
+from realtime import quote_bus
+from store import bars, align
 
 # Company descriptions (offline fallback)
 COMPANY_INFO = {
@@ -59,55 +68,85 @@ class Holding:
 
 @dataclass
 class PortfolioState:
-    holdings: dict = field(default_factory=dict)
+    table: HoldingsTable = field(default_factory=HoldingsTable)
+    book: LotBook = None
+
+    def __post_init__(self):
+        if self.book is None:
+            self.book = LotBook(self.table)
+
+    @property
+    def holdings(self):
+        """{TICKER: Holding} aggregated over each ticker's lots (read-only)."""
+        return HoldingsView(self.table, Holding)
 
     def add(self, t, s, a, date=""):
-        self.holdings[t.upper()] = Holding(t.upper(), s, a, date or datetime.now().strftime("%Y-%m-%d"))
+        """Record a lot; buying a ticker again adds a lot instead of replacing the first."""
+        return self.book.buy(t, s, a, date or datetime.now().strftime("%Y-%m-%d"))
+
+    def sell(self, t, s, price, date="", method=None, lots=None):
+        """Close shares by FIFO/LIFO/HIFO (or specific lots={lot_id: shares}); returns the Realized slices."""
+        return self.book.sell(t, s, price, date, method, lots)
 
     def remove(self, t):
-        self.holdings.pop(t.upper(), None)
-
-    def snapshot(self):
-        rows, total_v, total_c = [], 0.0, 0.0
-        for h in self.holdings.values():
-            try:
-                d = yf.Ticker(h.ticker).history(period="2d")
-                p = float(d["Close"].iloc[-1]) if not d.empty else h.avg_price
-            except Exception:
-                p = h.avg_price
-            v = p * h.shares
-            c = h.avg_price * h.shares
-            pl = v - c
-            pct = (pl / c * 100) if c else 0.0
-            total_v += v
-            total_c += c
-            rows.append((h.ticker, h.shares, h.avg_price, p, v, pl, pct))
-        return rows, total_v, (total_v - total_c)
+        self.book.remove_symbol(t)
+
+    def valuation(self, quotes=None):
+        """Columnar P&L per ticker: one NumPy array per field (ticker, shares, avg, price, value, cost, pl, pct).
+
+        Lots are aggregated per ticker from the holdings table's column views, all tickers are
+        priced from one batched quote lookup (pass quotes, {SYM: (last, prev)}, to skip it) and
+        the rest is array math. A ticker without a quote is priced at its average cost.
+        """
+        t = self.table
+        ids, shares, cost = t.positions()
+        ticker = np.array([t.symbols[i] for i in ids], dtype=object)
+        if quotes is None:
+            quotes = quote_bus.prices(ticker.tolist())
+        avg = np.divide(cost, shares, out=np.zeros(len(ids)), where=shares != 0)
+        price = np.fromiter((quotes[s][0] if s in quotes else a for s, a in zip(ticker, avg)), float, len(ids))
+        value = price * shares
+        pl = value - cost
+        pct = np.divide(pl * 100, cost, out=np.zeros(len(ids)), where=cost != 0)
+        return {"ticker": ticker, "shares": shares, "avg": avg, "price": price,
+                "value": value, "cost": cost, "pl": pl, "pct": pct}
+
+    def snapshot(self, quotes=None):
+        """(rows, total_value, total_pl); each row is (ticker, shares, avg, price, value, pl, pct)."""
+        c = self.valuation(quotes)
+        rows = list(zip(*(c[k].tolist() for k in ("ticker", "shares", "avg", "price", "value", "pl", "pct"))))
+        total_v = float(c["value"].sum())
+        return rows, total_v, total_v - float(c["cost"].sum())
 
     def historical_values(self, period="1y"):
-        if not self.holdings:
+        """Daily portfolio value on the union of every holding's trading days.
+
+        Closes are outer-joined on calendar dates and forward-filled, so a market that was shut
+        (equities on a weekend next to BTC-USD) carries its last close instead of dropping the
+        day, and each holding counts only from its purchase_date. Returns (dates, values).
+        """
+        t = self.table
+        if not len(t):
+            return None, None
+        try:
+            frames = bars.history_many([t.symbols[i] for i in t.held_ids()], period)
+        except Exception:
+            frames = {}
+        frames = {s: d for s, d in frames.items() if not d.empty}
+        if not frames:
             return None, None
-        all_dates = None
-        total = None
-        for h in self.holdings.values():
-            try:
-                d = yf.Ticker(h.ticker).history(period=period)
-                if d.empty:
-                    continue
-                vals = d["Close"] * h.shares
-                if all_dates is None:
-                    all_dates = d.index
-                    total = vals.values.astype(float)
-                else:
-                    common = all_dates.intersection(d.index)
-                    if len(common) == 0:
-                        continue
-                    all_dates = common
-                    prev = total[:len(common)]
-                    total = prev + vals.reindex(common).values.astype(float)
-            except Exception:
-                pass
-        return all_dates, total
+        dates, syms, prices = align(frames)
+        col = np.full(len(t.symbols), -1)
+        col[[t.sym_id(s) for s in syms]] = np.arange(len(syms))
+        lot_col = col[t.sym]
+        held = lot_col >= 0
+        bought = t.date[held].astype("datetime64[ns]")
+        bought[np.isnat(bought)] = dates.values[0]
+        # Shares held per (day, symbol): add each lot on its purchase day, then cumulative-sum down.
+        shares = np.zeros((len(dates) + 1, len(syms)))
+        np.add.at(shares, (np.searchsorted(dates.values, bought), lot_col[held]), t.shares[held])
+        shares = shares.cumsum(axis=0)[:-1]
+        return dates, np.nansum(prices * shares, axis=1)
 
 
 @dataclass
@@ -126,42 +165,155 @@ class WatchlistState:
 @dataclass
 class SimulatorState:
     cash: float = 100_000.0
-    positions: dict = field(default_factory=dict)
-    history: list = field(default_factory=list)
+    book: LotBook = field(default_factory=LotBook)
     start_cash: float = 100_000.0
+    lot_method: str = FIFO
+    orders: OrderBook = field(default_factory=OrderBook)
+    ledger: Ledger = field(default=None, repr=False)
+
+    @classmethod
+    def load(cls, root=SIM_DIR):
+        """Account persisted under root: the latest snapshot plus a replay of the ledger tail."""
+        ledger = Ledger(root)
+        state, seq = ledger.load_snapshot()
+        sim = cls(**state) if state else cls()
+        for rec in ledger.records(seq):
+            sim._apply(int(rec["kind"]), rec["sym"].decode(), float(rec["shares"]),
+                       float(rec["price"]), float(rec["ts"]), float(rec["aux"]), int(rec["ref"]))
+        sim.ledger = ledger
+        return sim
+
+    def _state(self):
+        return {"cash": self.cash, "book": self.book, "start_cash": self.start_cash,
+                "lot_method": self.lot_method, "orders": self.orders}
+
+    def _apply(self, kind, sym, shares, price, ts, aux=np.nan, ref=-1):
+        """Apply one ledger event to the account; returns the realized gain of a sell (else NaN)."""
+        if kind in (BUY, SELL) and ref >= 0:
+            self.orders.remove(ref)
+        if kind == BUY:
+            self.cash -= price * shares
+            self.book.buy(sym, shares, price, datetime.fromtimestamp(ts).strftime("%Y-%m-%d"))
+        elif kind == SELL:
+            self.cash += price * shares
+            date = datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+            return sum(r.gain for r in self.book.sell(sym, shares, price, date, self.lot_method))
+        elif kind == CASH:
+            self.cash = price
+        elif kind == RESET:
+            self.cash = self.start_cash = price
+            self.book = LotBook(method=self.lot_method)
+            self.orders = OrderBook()
+        elif kind == ORDER:
+            limit, stop = (None if x != x else x for x in (price, aux))
+            otype = STOP_LIMIT if limit is not None and stop is not None else STOP if stop is not None else LIMIT
+            self.orders.add(Order(ref, sym, BUY_SIDE if shares > 0 else SELL_SIDE, otype, abs(shares), limit, stop, ts))
+        elif kind == TRIGGER:
+            if ref in self.orders:
+                self.orders.trigger(ref)
+        elif kind == CANCEL:
+            self.orders.remove(ref)
+        return np.nan
 
-    def buy(self, t, p, s):
+    def _commit(self, kind, sym="", shares=0.0, price=0.0, aux=np.nan, ref=-1):
+        ts = time.time()
+        gain = self._apply(kind, sym, shares, price, ts, aux, ref)
+        if self.ledger is not None:
+            seq = self.ledger.append(kind, sym, shares, price, gain if kind == SELL else aux, ts, ref)
+            if (seq + 1) % SIM_SNAPSHOT_EVERY == 0:
+                self.ledger.snapshot(self._state(), seq + 1)
+        return gain
+
+    @property
+    def positions(self):
+        """{SYM: {"shares", "avg"}} of open positions; avg is the cost-weighted average over lots."""
+        return {t: {"shares": n, "avg": avg} for t, (n, _, avg) in self.book.positions().items()}
+
+    def buy(self, t, p, s, order=-1):
         cost = p * s
         if cost > self.cash:
             return False, f"Insufficient funds. Need ${cost:,.2f}, have ${self.cash:,.2f}."
-        self.cash -= cost
-        if t not in self.positions:
-            self.positions[t] = {"shares": 0.0, "avg": p}
-        self.positions[t]["shares"] += s
-        self.history.append({"action": "BUY", "ticker": t, "shares": s, "price": p,
-                              "total": cost, "time": datetime.now().strftime("%H:%M:%S")})
+        self._commit(BUY, t, s, p, ref=order)
         return True, f"Purchased {s:.4g} {t} @ ${p:.2f}  (Cost: ${cost:,.2f})"
 
-    def sell(self, t, p, s):
-        pos = self.positions.get(t)
-        if not pos or s > pos["shares"]:
-            held = pos["shares"] if pos else 0
+    def sell(self, t, p, s, order=-1):
+        held = self.book.position(t)[0]
+        if s > held + 1e-9:
             return False, f"Not enough shares. Holding {held:.4g}, trying to sell {s:.4g}."
-        self.cash += p * s
-        pos["shares"] -= s
-        if pos["shares"] <= 0:
-            del self.positions[t]
-        self.history.append({"action": "SELL", "ticker": t, "shares": s, "price": p,
-                              "total": p*s, "time": datetime.now().strftime("%H:%M:%S")})
-        return True, f"Sold {s:.4g} {t} @ ${p:.2f}  (Proceeds: ${p*s:,.2f})"
-
-    def portfolio_value(self):
+        gain = self._commit(SELL, t, s, p, ref=order)
+        return True, f"Sold {s:.4g} {t} @ ${p:.2f}  (Proceeds: ${p*s:,.2f}, realized {'+' if gain >= 0 else '-'}${abs(gain):,.2f})"
+
+    # ── Resting orders ────────────────────────
+    def place_order(self, t, side, s, kind, limit=None, stop=None):
+        """Rest a LIMIT, STOP or STOP-LIMIT order; it executes in match() once a quote reaches it.
+
+        Funds and shares are checked at execution; an order that cannot be filled then is cancelled.
+        """
+        t = t.upper()
+        if s <= 0:
+            return False, "Enter a valid positive quantity."
+        if kind in (LIMIT, STOP_LIMIT) and not (limit and limit > 0):
+            return False, f"A {kind} order needs a positive limit price."
+        if kind in (STOP, STOP_LIMIT) and not (stop and stop > 0):
+            return False, f"A {kind} order needs a positive stop price."
+        if kind not in (LIMIT, STOP, STOP_LIMIT):
+            return False, f"Unknown order type {kind}."
+        oid = self.orders.next_id
+        self._commit(ORDER, t, s if side == BUY_SIDE else -s,
+                     limit if kind != STOP else np.nan, stop if kind != LIMIT else np.nan, ref=oid)
+        return True, f"Order {self.orders.get(oid).describe()} placed"
+
+    def cancel_order(self, oid):
+        o = self.orders.get(oid)
+        if o is None:
+            return False, f"Order #{oid} is not open."
+        self._commit(CANCEL, o.sym, ref=oid)
+        return True, f"Order #{oid} cancelled"
+
+    def match(self, sym, price):
+        """Execute the resting orders on sym that price reaches; returns [(ok, msg, side)] per event."""
+        due, triggered = self.orders.match(sym.upper(), price)
+        out = []
+        for o in triggered:
+            self._commit(TRIGGER, o.sym, ref=o.id)
+            out.append((True, f"Order #{o.id} stop ${o.stop:.2f} hit, resting as limit ${o.limit:.2f}", o.side))
+        for o in due:
+            ok, msg = (self.buy if o.side == BUY_SIDE else self.sell)(o.sym, price, o.shares, o.id)
+            if not ok:
+                self._commit(CANCEL, o.sym, ref=o.id)
+                msg = f"Order #{o.id} cancelled: {msg}"
+            else:
+                msg = f"{msg}  [order #{o.id}]"
+            out.append((ok, msg, o.side))
+        return out
+
+    def match_all(self, quotes):
+        """match() every symbol with open orders against quotes ({SYM: (last, prev)})."""
+        out = []
+        for sym in self.orders.symbols():
+            if sym in quotes:
+                out += self.match(sym, quotes[sym][0])
+        return out
+
+    def set_cash(self, cash):
+        self._commit(CASH, price=cash)
+
+    def reset(self, cash=100_000.0):
+        """Start over with cash; earlier trades stay in the ledger."""
+        self._commit(RESET, price=cash)
+
+    def trades(self, since=None, limit=None):
+        """Ledger events since an epoch time (newest last), or an empty array without a ledger."""
+        if self.ledger is None:
+            return np.zeros(0, RECORD)
+        return self.ledger.between(since, None, limit)
+
+    def portfolio_value(self, quotes=None):
+        positions = self.book.positions()
         total = self.cash
-        for t, pos in self.positions.items():
-            try:
-                d = yf.Ticker(t).history(period="1d")
-                price = float(d["Close"].iloc[-1]) if not d.empty else pos["avg"]
-                total += price * pos["shares"]
-            except Exception:
-                pass
+        if quotes is None:
+            quotes = quote_bus.prices(list(positions))
+        for t, (shares, _, avg) in positions.items():
+            price = quotes[t][0] if t in quotes else avg
+            total += price * shares
         return total
@@ -0,0 +1,132 @@
+"""
+INVESTAUR PRO — Resting limit / stop / stop-limit orders for the paper-trading simulator
+"""
+
+import heapq
+from collections import defaultdict
+
+BUY_SIDE, SELL_SIDE = "BUY", "SELL"
+MARKET, LIMIT, STOP, STOP_LIMIT = "MARKET", "LIMIT", "STOP", "STOP-LIMIT"
+ORDER_TYPES = (MARKET, LIMIT, STOP, STOP_LIMIT)
+
+
+class Order:
+    __slots__ = ("id", "sym", "side", "kind", "shares", "limit", "stop", "ts", "triggered")
+
+    def __init__(self, id, sym, side, kind, shares, limit=None, stop=None, ts=0.0):
+        self.id, self.sym, self.side, self.kind = id, sym, side, kind
+        self.shares, self.limit, self.stop, self.ts = shares, limit, stop, ts
+        self.triggered = False
+
+    def describe(self):
+        px = " ".join(x for x in (f"stop ${self.stop:.2f}" if self.stop is not None else "",
+                                  f"limit ${self.limit:.2f}" if self.limit is not None else "") if x)
+        return f"#{self.id} {self.side} {self.shares:.4g} {self.sym} {self.kind} {px}"
+
+
+def _new_side_heaps():
+    # buy_limit: highest limit first; sell_limit: lowest first;
+    # buy_stop: lowest stop first; sell_stop: highest stop first.
+    return {"buy_limit": [], "sell_limit": [], "buy_stop": [], "sell_stop": []}
+
+
+class OrderBook:
+    """Per-symbol price-indexed heaps of resting orders.
+
+    match(sym, price) only looks at the head of each heap: it pops orders while the head's
+    trigger holds, so a quote costs O(log n) per order that fires and O(1) otherwise, no
+    matter how many orders rest. Cancelled or filled orders stay in the heaps and are dropped
+    lazily when they reach the top. A triggered stop-limit moves to its side's limit heap.
+    """
+
+    def __init__(self):
+        self._orders = {}                           # id -> Order
+        self._heaps = defaultdict(_new_side_heaps)  # SYM -> heaps
+        self._count = defaultdict(int)              # SYM -> open orders
+        self._seq = 0
+        self.next_id = 1
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __contains__(self, order_id):
+        return order_id in self._orders
+
+    def add(self, order):
+        self._orders[order.id] = order
+        self._count[order.sym] += 1
+        self.next_id = max(self.next_id, order.id + 1)
+        self._push(order, stop=order.kind in (STOP, STOP_LIMIT) and not order.triggered)
+
+    def _push(self, o, stop):
+        h = self._heaps[o.sym]
+        self._seq += 1
+        buy = o.side == BUY_SIDE
+        if stop:
+            heapq.heappush(h["buy_stop" if buy else "sell_stop"], (o.stop if buy else -o.stop, self._seq, o.id))
+        else:
+            heapq.heappush(h["buy_limit" if buy else "sell_limit"], (-o.limit if buy else o.limit, self._seq, o.id))
+
+    def remove(self, order_id):
+        """Take an order off the book (filled or cancelled); returns it, or None."""
+        o = self._orders.pop(order_id, None)
+        if o is not None:
+            self._count[o.sym] -= 1
+            if not self._count[o.sym]:
+                # Last order on the symbol: drop its heaps and their lazily-deleted entries.
+                del self._count[o.sym]
+                self._heaps.pop(o.sym, None)
+        return o
+
+    def trigger(self, order_id):
+        """Turn a stop-limit into a resting limit order."""
+        o = self._orders[order_id]
+        if not o.triggered:
+            o.triggered = True
+            self._push(o, stop=False)
+
+    def get(self, order_id):
+        return self._orders.get(order_id)
+
+    def open_orders(self, sym=None):
+        return [o for o in self._orders.values() if sym is None or o.sym == sym]
+
+    def symbols(self):
+        """Symbols with at least one open order."""
+        return list(self._count)
+
+    def _pop_while(self, heap, fires, stops=False):
+        """Pop live orders from heap while fires(key) holds."""
+        out = []
+        while heap:
+            key, _, oid = heap[0]
+            o = self._orders.get(oid)
+            if o is None or (stops and o.triggered):
+                heapq.heappop(heap)
+                continue
+            if not fires(key):
+                break
+            heapq.heappop(heap)
+            out.append(o)
+        return out
+
+    def match(self, sym, price):
+        """(due, triggered) for a quote on sym.
+
+        due are the orders that execute at price, in trigger order; they stay on the book until
+        remove(). triggered are the stop-limits whose stop was hit and now rest as limit orders.
+        """
+        h = self._heaps.get(sym)
+        if h is None:
+            return [], []
+        due, triggered = [], []
+        for o in (self._pop_while(h["buy_stop"], lambda k: price >= k, True)
+                  + self._pop_while(h["sell_stop"], lambda k: price <= -k, True)):
+            if o.kind == STOP:
+                due.append(o)
+            else:
+                self.trigger(o.id)
+                triggered.append(o)
+        due += self._pop_while(h["buy_limit"], lambda k: price <= -k)
+        due += self._pop_while(h["sell_limit"], lambda k: price >= k)
+        return due, triggered
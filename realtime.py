@@ -0,0 +1,219 @@
+"""
+INVESTAUR PRO — Quote bus and unified live-refresh scheduler
+"""
+
+import itertools
+import threading
+import time
+from collections import namedtuple
+
+from config import REFRESH_TICK_MS, QUOTE_MAX_AGE_S
+from data import get_provider
+from workers import BACKGROUND
+
+# day is the session date of the price (the exchange-local date of its last trade), if known.
+Quote = namedtuple("Quote", "symbol price prev_close ts day", defaults=(None,))
+
+
+class QuoteBus:
+    """Last known quote per symbol with publish/subscribe change notifications.
+
+    Callbacks run synchronously on the publishing thread, so Tk consumers should hop back
+    to the main thread with after(0, …). prices() is the read path for code that needs
+    prices now: fresh quotes come from the bus, only stale or missing symbols are fetched,
+    and whatever is fetched is published to every subscriber.
+    """
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._quotes = {}
+        self._subs = {}  # token -> (frozenset of symbols or None for all, callback)
+        self._tokens = itertools.count(1)
+
+    def publish(self, sym, price, prev_close=None, ts=None, day=None):
+        self.publish_many({sym: (price, prev_close)}, ts, None if day is None else {sym: day})
+
+    def publish_many(self, quotes, ts=None, days=None):
+        """Store {SYM: (price, prev_close)} with the {SYM: session date} in days, if given;
+        subscribers hear about symbols whose price or session changed."""
+        ts = self._clock() if ts is None else ts
+        days = days or {}
+        changed = []
+        with self._lock:
+            for sym, (price, prev) in quotes.items():
+                day = days.get(sym)
+                sym = sym.upper()
+                old = self._quotes.get(sym)
+                if old is not None:
+                    prev = old.prev_close if prev is None else prev
+                    day = old.day if day is None else day
+                q = self._quotes[sym] = Quote(sym, float(price), prev, ts, day)
+                if old is None or old.price != q.price or old.prev_close != q.prev_close or old.day != q.day:
+                    changed.append(q)
+            subs = list(self._subs.values())
+        for q in changed:
+            for syms, callback in subs:
+                if syms is None or q.symbol in syms:
+                    try:
+                        callback(q)
+                    except Exception:
+                        pass
+
+    def get(self, sym, max_age=None):
+        with self._lock:
+            q = self._quotes.get(sym.upper())
+        if q is None or (max_age is not None and self._clock() - q.ts > max_age):
+            return None
+        return q
+
+    def age(self, sym):
+        q = self.get(sym)
+        return None if q is None else self._clock() - q.ts
+
+    def snapshot(self, syms, max_age=None):
+        """{SYM: (price, prev_close)} for the symbols the bus holds fresh quotes for."""
+        out = {}
+        for sym in syms:
+            q = self.get(sym, max_age)
+            if q is not None:
+                out[q.symbol] = (q.price, q.prev_close)
+        return out
+
+    def prices(self, syms, max_age=QUOTE_MAX_AGE_S):
+        """Like snapshot(), but fetches and publishes whatever is stale or missing in one batch."""
+        syms = [s.upper() for s in syms if s]
+        out = self.snapshot(syms, max_age)
+        missing = [s for s in syms if s not in out]
+        if missing:
+            days = {}
+            try:
+                fetched = get_provider().quotes(missing, days=days)
+            except Exception:
+                fetched = {}
+            self.publish_many(fetched, days=days)
+            out.update(fetched)
+        return out
+
+    def subscribe(self, syms, callback):
+        """callback(Quote) on every price change of syms (None = every symbol). Returns a token."""
+        token = next(self._tokens)
+        with self._lock:
+            self._subs[token] = (None if syms is None else frozenset(s.upper() for s in syms), callback)
+        return token
+
+    def unsubscribe(self, token):
+        with self._lock:
+            self._subs.pop(token, None)
+
+
+quote_bus = QuoteBus()
+
+
+class _Subscription:
+    __slots__ = ("name", "symbols", "every_s", "callback", "active", "next_due")
+
+    def __init__(self, name, symbols, every_s, callback, active, next_due):
+        self.name = name
+        self.symbols = symbols
+        self.every_s = every_s
+        self.callback = callback
+        self.active = active
+        self.next_due = next_due
+
+    def syms(self):
+        syms = self.symbols() if callable(self.symbols) else self.symbols
+        return [s.upper() for s in syms if s]
+
+
+class RefreshScheduler:
+    """One Tk-driven tick that batches every due symbol into a single quote fetch.
+
+    Widgets subscribe with the symbols they show and how fresh they need them. Each tick
+    collects the subscriptions that are due (and active, e.g. their tab is visible), fetches
+    the union of their symbols whose bus quote is older than the subscriber's interval in one
+    provider.quotes() call on the worker pool, publishes the result to the quote bus and
+    hands each subscriber its quotes on the Tk thread. A symbol shared by several widgets is
+    fetched once.
+    """
+
+    def __init__(self, root, pool, bus=None, tick_ms=REFRESH_TICK_MS, clock=time.monotonic):
+        self._root = root
+        self._pool = pool
+        self._bus = bus or quote_bus
+        self._tick_ms = tick_ms
+        self._clock = clock
+        self._subs = {}
+        self._in_flight = False
+        self._started = False
+        self.fetches = 0
+        self.symbols_fetched = 0
+
+    def subscribe(self, name, symbols, every_ms, callback=None, active=None, immediate=False):
+        """symbols is a list or a zero-arg callable; callback({SYM: (last, prev)}) runs on the Tk thread.
+
+        Without a callback the subscription only keeps its symbols fresh on the quote bus.
+        """
+        every_s = every_ms / 1000
+        first = self._clock() if immediate else self._clock() + every_s
+        self._subs[name] = _Subscription(name, symbols, every_s, callback, active, first)
+
+    def unsubscribe(self, name):
+        self._subs.pop(name, None)
+
+    def refresh_now(self, name):
+        sub = self._subs.get(name)
+        if sub is not None:
+            sub.next_due = self._clock()
+
+    def start(self):
+        if not self._started:
+            self._started = True
+            self._root.after(0, self._tick)
+
+    def _tick(self):
+        try:
+            if not self._in_flight:
+                now = self._clock()
+                due = [s for s in self._subs.values()
+                       if s.next_due <= now and (s.active is None or s.active())]
+                if due:
+                    need = set()
+                    for s in due:
+                        for sym in s.syms():
+                            age = self._bus.age(sym)
+                            if age is None or age >= s.every_s * 0.9:
+                                need.add(sym)
+                    self._in_flight = True
+                    self._pool.submit(self._fetch, sorted(need), due, priority=BACKGROUND, key="scheduler")
+        finally:
+            self._root.after(self._tick_ms, self._tick)
+
+    def _fetch(self, syms, due):
+        quotes, days = {}, {}
+        if syms:
+            try:
+                quotes = get_provider().quotes(syms, days=days)
+            except Exception:
+                pass
+        self._root.after(0, lambda: self._deliver(syms, quotes, due, days))
+
+    def _deliver(self, syms, quotes, due, days=None):
+        now = self._clock()
+        self._in_flight = False
+        if syms:
+            self.fetches += 1
+            self.symbols_fetched += len(syms)
+        self._bus.publish_many(quotes, days=days)
+        for s in due:
+            s.next_due = now + s.every_s
+            if s.callback is None:
+                continue
+            try:
+                s.callback(self._bus.snapshot(s.syms()))
+            except Exception:
+                pass
+
+    def stats(self):
+        return {"subscriptions": len(self._subs), "fetches": self.fetches,
+                "symbols_fetched": self.symbols_fetched}
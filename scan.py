@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+INVESTAUR PRO — Universe-wide Insight signal scan over a close matrix
+
+Run:  python scan.py [--symbols AAPL MSFT … | --file tickers.txt] [--period 2y] [--top 20]
+"""
+
+import argparse
+import re
+
+import numpy as np
+
+import indicators as ind
+from cache import indicator_cache
+from store import bars
+
+SIGNALS = ("Price > SMA20", "Price > SMA50", "Price > SMA200", "RSI < 70 (not OB)", "RSI > 30 (not OS)",
+           "MACD Bullish", "Price above BB Mid", "1M Momentum +", "3M Momentum +")
+
+# Bullish share of SIGNALS (percent) at or above which each label applies.
+DIRECTIONS = ((78, "STRONG BULLISH"), (56, "BULLISH"), (44, "NEUTRAL"), (22, "BEARISH"), (0, "STRONG BEARISH"))
+
+
+def direction(pct):
+    return next(label for floor, label in DIRECTIONS if pct >= floor)
+
+
+def signals(closes):
+    """Last-bar Insight checklist for every column of a (bars × symbols) close matrix.
+
+    Returns (checks, metrics): checks is a symbols × len(SIGNALS) bool matrix and metrics a
+    dict of per-symbol arrays (curr, sma20/50/200, rsi, macd, macd_signal, mom_1m/3m/1y,
+    vol_ann, max_dd), the same values InvestaurPro._ai_metrics gives for each symbol on its
+    own. NaN marks a row the symbol has no bar for (before its listing, or a day only another
+    market traded, e.g. a crypto weekend among equities): each column's own bars are packed
+    to the bottom, so every window counts that symbol's bars and nothing is repeated. The
+    leading gap of a short column is filled with its first close, which leaves its EMAs/MACD
+    exactly as if the series began there, and every windowed value is masked until the
+    symbol has enough bars of its own.
+    """
+    c = np.asarray(closes, float)
+    T, N = c.shape
+    valid = ~np.isnan(c)
+    own = valid.sum(axis=0)                             # each symbol's own bar count
+    r, j = np.nonzero(valid)
+    packed = np.full((T, N), np.nan)
+    packed[(T - np.cumsum(valid[::-1], axis=0)[::-1])[r, j], j] = c[r, j]
+    first = T - own
+    filled = np.where(np.arange(T)[:, None] < first, packed[np.minimum(first, T - 1), np.arange(N)], packed)
+    curr = filled[-1]
+
+    def sma(n):
+        return np.where(own >= n, filled[-n:].mean(axis=0), np.nan) if T >= n else np.full(N, np.nan)
+
+    def mom(k):
+        return np.where(own >= k, (curr / filled[-min(k, T)] - 1) * 100, 0.0)
+
+    rsi = np.where(own > 14, ind.rsi(packed, 14)[-1], 50.0)
+    line, sig, _ = ind.macd(filled)
+    vol = (filled[-30:] / filled[-31:-1] - 1).std(axis=0) * np.sqrt(252) * 100 if T > 30 else np.zeros(N)
+    m = dict(curr=curr, sma20=sma(20), sma50=sma(50), sma200=sma(200), rsi=rsi, macd=line[-1],
+             macd_signal=sig[-1], mom_1m=mom(22), mom_3m=mom(63), mom_1y=mom(252),
+             vol_ann=np.where(own > 30, vol, 0.0), max_dd=ind.max_drawdown(packed))
+    with np.errstate(invalid="ignore"):
+        checks = np.column_stack([curr > m["sma20"], curr > m["sma50"], curr > m["sma200"],
+                                  rsi < 70, rsi > 30, m["macd"] > m["macd_signal"], curr > m["sma20"],
+                                  m["mom_1m"] > 0, m["mom_3m"] > 0])
+    return checks, m
+
+
+def universe(syms, period="2y"):
+    """(symbols with stored bars, checks, metrics): signals() over the universe's close matrix.
+
+    The matrix is left unfilled, so a symbol's windows never count days only other symbols
+    traded on. Rescanning the same universe before a new bar arrives reuses the last result,
+    whether the Insight scan or the screener asked first.
+    """
+    dates, symbols, closes = bars.matrix(syms, period, fill=False)
+    if not symbols:
+        return [], np.zeros((0, len(SIGNALS)), bool), {}
+    # Each symbol's bar count and latest close: its last bar need not sit on the last row.
+    valid = ~np.isnan(closes)
+    last = closes[len(closes) - 1 - np.argmax(valid[::-1], axis=0), np.arange(len(symbols))]
+    key = (dates[-1].value, valid.sum(axis=0).tobytes(), last.tobytes())
+    checks, m = indicator_cache.get(tuple(symbols), "1d", key, "scan", lambda: signals(closes), period=period)
+    return symbols, checks, m
+
+
+def scan(syms, period="2y"):
+    """Score every symbol with stored bars; a columnar table ranked most bullish first.
+
+    Keys: symbol, score (signals bullish), pct, direction, checks (symbols × SIGNALS) and the
+    signals() metrics. Ties on score rank by 3M momentum.
+    """
+    symbols, checks, m = universe(syms, period)
+    if not symbols:
+        raise ValueError("No price history for any of the symbols.")
+    score = checks.sum(axis=1)
+    order = np.lexsort((-m["mom_3m"], -score))
+    pct = score * 100 / len(SIGNALS)
+    table = {"symbol": np.array(symbols, dtype=object), "score": score, "pct": pct,
+             "direction": np.array([direction(p) for p in pct], dtype=object), "checks": checks, **m}
+    return {k: v[order] for k, v in table.items()}
+
+
+# Screener criteria over signals() metrics: key -> (metric, comparison). None means the filter is off.
+TECHNICAL_FILTERS = {
+    "rsi_min":    ("rsi", ">="),
+    "rsi_max":    ("rsi", "<="),
+    "mom_1m_min": ("mom_1m", ">="),
+    "mom_3m_min": ("mom_3m", ">="),
+    "mom_1y_min": ("mom_1y", ">="),
+    "vol_max":    ("vol_ann", "<="),
+    "dd_min":     ("max_dd", ">="),   # e.g. -30: never fell more than 30% from a peak
+}
+
+
+def technical_mask(m, sma50=None, sma200=None, **criteria):
+    """Boolean mask over signals() metrics: every set criterion holds.
+
+    criteria are TECHNICAL_FILTERS keys with a number (or None to skip); sma50 / sma200 are
+    "above", "below" or None. A symbol without enough bars for an SMA fails that test.
+    """
+    mask = np.ones(len(m["curr"]), bool)
+    with np.errstate(invalid="ignore"):
+        for key, bound in criteria.items():
+            if bound is None:
+                continue
+            metric, op = TECHNICAL_FILTERS[key]
+            mask &= m[metric] >= bound if op == ">=" else m[metric] <= bound
+        for name, side in (("sma50", sma50), ("sma200", sma200)):
+            if side:
+                mask &= m["curr"] > m[name] if side == "above" else m["curr"] < m[name]
+    return mask
+
+
+def read_symbols(path):
+    """Tickers from a text file: separated by commas or whitespace, '#' starts a comment."""
+    with open(path) as f:
+        text = "\n".join(line.split("#", 1)[0] for line in f)
+    return list(dict.fromkeys(s.upper() for s in re.split(r"[\s,;]+", text) if s))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="INVESTAUR PRO Insight scan")
+    ap.add_argument("--symbols", nargs="*", help="default: the S&P 100 list")
+    ap.add_argument("--file", help="text file of tickers")
+    ap.add_argument("--period", default="2y")
+    ap.add_argument("--top", type=int, default=20)
+    args = ap.parse_args()
+
+    from app import InvestaurPro
+    syms = read_symbols(args.file) if args.file else args.symbols or InvestaurPro.SP100
+    t = scan(syms, args.period)
+    n = len(t["symbol"])
+    print(f"{'symbol':<10}{'score':>6}  {'direction':<16}{'price':>10}{'rsi':>7}{'1M %':>8}{'3M %':>8}")
+    for i in list(range(min(args.top, n))) + list(range(max(args.top, n - args.top), n)):
+        print(f"{t['symbol'][i]:<10}{t['score'][i]:>4}/9  {t['direction'][i]:<16}{t['curr'][i]:>10.2f}"
+              f"{t['rsi'][i]:>7.1f}{t['mom_1m'][i]:>8.1f}{t['mom_3m'][i]:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
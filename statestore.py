@@ -0,0 +1,186 @@
+"""
+INVESTAUR PRO — SQLite (WAL) store for the portfolio, watchlist and UI state with write-behind saves
+"""
+
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+from config import STATE_DB, STATE_FLUSH_MS
+from holdings import HoldingsTable
+from lots import Realized
+from models import PortfolioState, WatchlistState
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lots      (id INTEGER PRIMARY KEY, symbols TEXT, sym BLOB, shares BLOB,
+                                      price BLOB, date BLOB, lot BLOB, next_lot INTEGER);
+CREATE TABLE IF NOT EXISTS realized  (date TEXT, symbol TEXT, lot INTEGER, shares REAL, proceeds REAL,
+                                      cost REAL, gain REAL, long_term INTEGER);
+CREATE TABLE IF NOT EXISTS watchlist (pos INTEGER PRIMARY KEY, sym TEXT);
+CREATE TABLE IF NOT EXISTS meta      (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+class StateStore:
+    """Session state in one SQLite file in WAL mode.
+
+    save_*() only copies what changed into a pending slot on the calling (Tk) thread; a writer
+    thread coalesces everything that arrives within STATE_FLUSH_MS into one transaction, so
+    GUI actions never wait on disk and a burst of edits costs one write. Realized history is
+    appended: a save writes only the sales made since the last one, and rewrites the table only
+    after a back-dated sale changed earlier records. Loading the
+    portfolio is one row of raw NumPy column bytes (as in the holdings table) and a bulk
+    LotBook build, so even a large book loads in a fraction of a second.
+    The simulator is not stored here: it persists itself through its ledger (ledger.py).
+    """
+
+    def __init__(self, path=STATE_DB, flush_ms=STATE_FLUSH_MS):
+        self.path = path
+        self.flush_s = flush_ms / 1000
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        # Files saved before lot ids were stored: add the columns; their lots load renumbered.
+        have = {r[1] for r in self._db.execute("PRAGMA table_info(lots)")}
+        for name, kind in (("lot", "BLOB"), ("next_lot", "INTEGER")):
+            if name not in have:
+                self._db.execute(f"ALTER TABLE lots ADD COLUMN {name} {kind}")
+        self._db_lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # one batch in flight at a time, so flush() sees the last write
+        self._cond = threading.Condition()
+        self._pending = {}
+        self._realized_mark = None  # (book, realized_version, records queued) of the last portfolio save
+        self._closed = False
+        self.writes = 0
+        self._writer = threading.Thread(target=self._run, name="state-writer", daemon=True)
+        self._writer.start()
+
+    # ── Loading ───────────────────────────────
+    @property
+    def is_new(self):
+        """True until anything has been saved (the app seeds demo data then)."""
+        return self._query("SELECT 1 FROM meta WHERE key='saved'") == []
+
+    def _query(self, sql, args=()):
+        with self._db_lock:
+            return self._db.execute(sql, args).fetchall()
+
+    def load_portfolio(self):
+        rows = self._query("SELECT symbols, sym, shares, price, date, lot, next_lot FROM lots WHERE id=0")
+        n = len(rows[0][2]) // 8 if rows else 0
+        p = PortfolioState(HoldingsTable(max(n, 16)))
+        if n:
+            names, sym, shares, price, date, lot, next_lot = rows[0]
+            symbols = np.array(names.split("\n"), dtype=object)
+            p.book.extend(symbols[np.frombuffer(sym, np.int32)], np.frombuffer(shares, np.float64),
+                          np.frombuffer(price, np.float64), np.frombuffer(date, "datetime64[D]"),
+                          None if lot is None else np.frombuffer(lot, np.int64))
+        if rows and rows[0][6] is not None:
+            p.table.skip_lots(rows[0][6])
+        realized = self._query("SELECT date, symbol, lot, shares, proceeds, cost, gain, long_term FROM realized")
+        if realized:
+            p.book.restore_realized([Realized(*r[:7], bool(r[7])) for r in realized])
+        with self._cond:
+            self._realized_mark = (p.book, p.book.realized_version, len(p.book.realized))
+        return p
+
+    def load_watchlist(self):
+        return WatchlistState([s for (s,) in self._query("SELECT sym FROM watchlist ORDER BY pos")])
+
+    def get(self, key, default=None):
+        rows = self._query("SELECT value FROM meta WHERE key=?", (key,))
+        return rows[0][0] if rows else default
+
+    # ── Write-behind saving ───────────────────
+    def save_portfolio(self, portfolio):
+        """Queue the portfolio's lots and realized history; cheap column copies on the calling thread."""
+        t, book = portfolio.table, portfolio.book
+        cols = ("\n".join(t.symbols), t.sym.tobytes(), t.shares.tobytes(), t.price.tobytes(), t.date.tobytes(),
+                t.lot.tobytes(), t.next_lot)
+        recs = book.realized
+        with self._cond:
+            mark = self._realized_mark
+            if mark is not None and mark[0] is book and mark[1] == book.realized_version and mark[2] <= len(recs):
+                replace, realized = False, recs[mark[2]:]
+                old = self._pending.get("portfolio")
+                if old is not None:  # still unwritten: carry its records into this batch
+                    replace, realized = old[1], old[2] + realized
+            else:
+                replace, realized = True, list(recs)
+            self._realized_mark = (book, book.realized_version, len(recs))
+            self._pending["portfolio"] = (cols, replace, realized)
+            self._cond.notify()
+
+    def save_watchlist(self, watchlist):
+        self._put("watchlist", list(watchlist.symbols))
+
+    def set(self, key, value):
+        with self._cond:
+            self._pending.setdefault("meta", {})[key] = str(value)
+            self._cond.notify()
+
+    def _put(self, kind, payload):
+        with self._cond:
+            self._pending[kind] = payload  # a newer copy replaces an unwritten older one
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._pending:
+                    return
+                # Let a burst of edits collect before writing.
+                self._cond.wait_for(lambda: self._closed, timeout=self.flush_s)
+            try:
+                self.flush()
+            except sqlite3.Error:
+                with self._cond:
+                    self._realized_mark = None  # the next save rewrites the realized table
+
+    def _write(self, batch):
+        with self._db_lock:
+            db = self._db
+            db.execute("BEGIN")
+            try:
+                if "portfolio" in batch:
+                    cols, replace, realized = batch["portfolio"]
+                    db.execute("INSERT OR REPLACE INTO lots VALUES (0,?,?,?,?,?,?,?)", cols)
+                    if replace:
+                        db.execute("DELETE FROM realized")
+                    db.executemany("INSERT INTO realized VALUES (?,?,?,?,?,?,?,?)",
+                                   ((r.date, r.symbol, int(r.lot), float(r.shares), float(r.proceeds),
+                                     float(r.cost), float(r.gain), int(r.long_term)) for r in realized))
+                if "watchlist" in batch:
+                    db.execute("DELETE FROM watchlist")
+                    db.executemany("INSERT INTO watchlist VALUES (?,?)", enumerate(batch["watchlist"]))
+                meta = {**batch.get("meta", {}), "saved": "1"}
+                db.executemany("INSERT OR REPLACE INTO meta VALUES (?,?)", meta.items())
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+            self.writes += 1
+
+    def flush(self):
+        """Write anything pending now (blocking); called on shutdown."""
+        with self._flush_lock:
+            with self._cond:
+                batch, self._pending = self._pending, {}
+            if batch:
+                self._write(batch)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._writer.join(timeout=5)
+        self.flush()
+        with self._db_lock:
+            self._db.close()
@@ -0,0 +1,223 @@
+"""
+INVESTAUR PRO — Persistent OHLCV bar store with gap-only refresh
+"""
+
+import os
+import threading
+import time
+import zipfile
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from config import STORE_DIR, STORE_FRESH_S
+from data import EMPTY, OHLCV, PERIOD_DAYS, _unique, get_provider, slice_period
+
+# Intraday bars are short-lived and capped by Yahoo, so only these intervals are persisted.
+STORED_INTERVALS = {"1d", "1wk", "1mo"}
+
+
+DAY_NS = 86_400 * 10**9
+
+
+def local_days(idx):
+    """Integer day numbers of a DatetimeIndex in its own timezone, without per-element conversion."""
+    ns = idx.values.astype("datetime64[ns]").view(np.int64)
+    if idx.tz is not None:
+        ns = ns + int(idx[0].utcoffset().total_seconds()) * 10**9
+    # Rounding absorbs the one-hour DST shift relative to the first bar's offset.
+    return np.rint(ns / DAY_NS).astype(np.int64)
+
+
+def ffill(a):
+    """Forward-fill NaNs down each column of a 2-D array (leading NaNs stay NaN)."""
+    last = np.where(np.isnan(a), 0, np.arange(len(a))[:, None])
+    np.maximum.accumulate(last, axis=0, out=last)
+    return a[last, np.arange(a.shape[1])]
+
+
+def align(frames, field="Close", daily=True, fill=True):
+    """(dates, symbols, values) of one column of many bar frames as a forward-filled 2-D matrix.
+
+    Rows are the union of every frame's bars: calendar days in each exchange's local time
+    (naive dates) when daily, else the bar timestamps themselves. A symbol that did not
+    trade on a row carries its last value (or is NaN there with fill=False, for math that
+    must see only each symbol's own bars); rows before its first bar are NaN.
+    """
+    syms = list(frames)
+    if not syms:
+        return pd.DatetimeIndex([]), syms, np.empty((0, 0))
+    # Daily bars sit at local midnight, so the local calendar day lines up exchanges.
+    keys = [local_days(frames[s].index) if daily else frames[s].index.values.astype("datetime64[ns]").view(np.int64)
+            for s in syms]
+    rows = np.unique(np.concatenate(keys))
+    values = np.full((len(rows), len(syms)), np.nan)
+    for k, (s, rk) in enumerate(zip(syms, keys)):
+        values[np.searchsorted(rows, rk), k] = frames[s][field].to_numpy(float)
+    if daily:
+        dates = pd.DatetimeIndex(rows * DAY_NS)
+    else:
+        dates = pd.to_datetime(rows, utc=True).tz_convert(frames[syms[0]].index.tz or "UTC")
+    return dates, syms, ffill(values) if fill else values
+
+
+def period_start(period, now=None):
+    """First timestamp (UTC) a yfinance-style period asks for; None means the full history."""
+    now = now or pd.Timestamp.now(tz="UTC")
+    if period == "max":
+        return None
+    if period == "ytd":
+        return pd.Timestamp(now.year, 1, 1, tz="UTC")
+    if period.endswith("d"):
+        return now - timedelta(days=int(period[:-1]) * 2 + 4)
+    return now - timedelta(days=PERIOD_DAYS.get(period, 366))
+
+
+def on_tz(d, tz=None):
+    """d on a DatetimeIndex in tz (or its own zone if tz is None).
+
+    Naive timestamps are wall-clock times in tz (UTC if tz is None), which is how yfinance
+    stamps daily bars when it drops the exchange's zone.
+    """
+    if not isinstance(d.index, pd.DatetimeIndex):
+        d = d.set_axis(pd.to_datetime(d.index, utc=True))
+    if d.index.tz is None:
+        return d.tz_localize(tz or "UTC")
+    return d if tz is None else d.tz_convert(tz)
+
+
+def merge_bars(old, new):
+    """Union of two daily (or longer) bar frames on old's timezone, one bar per local day.
+
+    new is converted to old's zone first; a bar in new replaces old's bar for the same local
+    calendar day even when the two were stamped differently (exchange midnight from a
+    one-symbol fetch, UTC midnight from a naive batched one). Every bar is stamped at local
+    midnight of its day, as Yahoo stamps daily bars.
+    """
+    if new.empty:
+        return old
+    if old.empty:
+        return on_tz(new)
+    old = on_tz(old)
+    d = pd.concat([old, on_tz(new, old.index.tz).reindex(columns=old.columns)])
+    days = local_days(d.index)
+    keep = ~pd.Index(days).duplicated(keep="last")
+    d = d[keep].set_axis(pd.DatetimeIndex(days[keep] * DAY_NS).tz_localize(
+        old.index.tz, ambiguous=True, nonexistent="shift_forward"))
+    return d.sort_index()
+
+
+class BarStore:
+    """One .npz file of int64 timestamps plus float64 OHLCV columns per (symbol, interval).
+
+    A request loads the stored bars, fetches only the bars from the last stored session on
+    (or the missing front of the range, if a longer period is asked for than was ever
+    stored) and writes the merged result back. Files checked within STORE_FRESH_S are
+    served without touching the network at all.
+    """
+
+    def __init__(self, root=STORE_DIR, fresh_s=STORE_FRESH_S):
+        self.root = root
+        self.fresh_s = fresh_s
+        self._mem = {}  # (SYM, interval) -> [frame, covered_from_ns, checked_at]
+        self._lock = threading.Lock()
+
+    def _path(self, sym, interval):
+        return os.path.join(self.root, interval, sym.replace("/", "_").replace("^", "_") + ".npz")
+
+    def _load(self, sym, interval):
+        key = (sym, interval)
+        with self._lock:
+            if key in self._mem:
+                return self._mem[key]
+        entry = [EMPTY, None, 0.0]
+        try:
+            with np.load(self._path(sym, interval)) as z:
+                idx = pd.DatetimeIndex(z["t"], tz="UTC").tz_convert(str(z["tz"]))
+                frame = pd.DataFrame({c: z[c] for c in OHLCV}, index=idx)
+                covered = int(z["covered_from"])
+                entry = [frame, None if covered < 0 else covered, float(z["checked_at"])]
+        except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+            pass  # missing or unreadable (e.g. truncated): refetched like a new symbol
+        with self._lock:
+            self._mem.setdefault(key, entry)
+            return self._mem[key]
+
+    def _save(self, sym, interval, frame, covered_from, checked_at):
+        frame = frame.reindex(columns=OHLCV).astype(float)
+        idx = frame.index if frame.index.tz is not None else frame.index.tz_localize("UTC")
+        path = self._path(sym, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # A private temp file, synced before the rename: readers see the old file or the new one,
+        # never a partial write, even if the process dies mid-save.
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, t=idx.values.astype("datetime64[ns]").view(np.int64), tz=np.array(str(idx.tz)),
+                     covered_from=np.int64(-1 if covered_from is None else covered_from),
+                     checked_at=np.float64(checked_at),
+                     **{c: frame[c].to_numpy() for c in OHLCV})
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        with self._lock:
+            self._mem[(sym, interval)] = [frame, covered_from, checked_at]
+
+    def history(self, sym, period="1y", interval="1d"):
+        return self.history_many([sym], period, interval).get(sym.upper(), EMPTY)
+
+    def history_many(self, syms, period="1y", interval="1d"):
+        provider = get_provider()
+        if interval not in STORED_INTERVALS:
+            return provider.history_many(syms, period, interval)
+        syms = _unique(syms)
+        start = period_start(period)
+        start_ns = None if start is None else start.value
+        now = time.time()
+        backfill, gaps = [], {}
+        for sym in syms:
+            frame, covered, checked = self._load(sym, interval)
+            if frame.empty or (covered is not None and (start_ns is None or covered > start_ns)):
+                backfill.append(sym)
+            elif now - checked > self.fresh_s:
+                gaps.setdefault(frame.index[-1].strftime("%Y-%m-%d"), []).append(sym)
+
+        if backfill:
+            try:
+                fetched = provider.history_many(backfill, period, interval)
+            except Exception:
+                fetched = {}
+            for sym, d in fetched.items():
+                frame, covered, _ = self._load(sym, interval)
+                if covered is not None and start_ns is not None:
+                    covered = min(covered, start_ns)
+                else:
+                    covered = start_ns
+                self._save(sym, interval, merge_bars(frame, d), covered, now)
+        for since, group in gaps.items():
+            try:
+                fetched = provider.history_since(group, since, interval)
+            except Exception:
+                continue
+            for sym in group:
+                frame, covered, _ = self._load(sym, interval)
+                self._save(sym, interval, merge_bars(frame, fetched.get(sym, EMPTY)), covered, now)
+
+        out = {}
+        for sym in syms:
+            d = slice_period(self._load(sym, interval)[0], period)
+            if not d.empty:
+                out[sym] = d
+        return out
+
+    def matrix(self, syms, period="1y", interval="1d", field="Close", fill=True):
+        """align() over history_many(): (dates, symbols with data, field matrix, forward-filled if fill)."""
+        frames = {s: d for s, d in self.history_many(syms, period, interval).items() if not d.empty}
+        return align(frames, field, daily=interval in STORED_INTERVALS, fill=fill)
+
+    def clear(self):
+        with self._lock:
+            self._mem.clear()
+
+
+bars = BarStore()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+INVESTAUR PRO — Parameter sweeps of backtests across a process pool
+
+Run:  python sweep.py --strategy "RSI 30/70 band" [--grid lo=20,25,30 hi=70,75] [--symbols AAPL MSFT …]
+                      [--period 10y] [--workers N] [--sort sharpe]
+
+The close matrix is copied once into shared memory; workers attach to it by name, so a task
+ships only its parameter dict and sends back one row of stats.
+"""
+
+import argparse
+import itertools
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import backtest
+from config import SWEEP_WORKERS
+
+_worker = {}  # per-process: shared block, close matrix view, bar dates, fee
+
+
+def grid(spec):
+    """Every combination of a {name: [values]} grid, as a list of keyword dicts."""
+    names = list(spec)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(spec[k] for k in names))]
+
+
+def parse_grid(text):
+    """"fast=10,20 slow=100,200" (spaces or semicolons between keys) -> {"fast": [10, 20], "slow": [100, 200]}."""
+    out = {}
+    for part in text.replace(";", " ").split():
+        key, _, values = part.partition("=")
+        out[key.strip()] = [float(v) if "." in v else int(v) for v in values.split(",") if v]
+    return out
+
+
+def _attach(name, shape, dtype, dates, fee_bps):
+    shm = shared_memory.SharedMemory(name=name)
+    _worker.update(shm=shm, closes=np.ndarray(shape, dtype, buffer=shm.buf), dates=dates, fee=fee_bps)
+
+
+def _run_chunk(strategy, chunk):
+    c = _worker["closes"]
+    fn = backtest.STRATEGIES[strategy]
+    rows = []
+    for params in chunk:
+        try:
+            res = backtest.run(c, fn(c, **params), _worker["dates"], fee_bps=_worker["fee"])
+            rows.append({**params, **res.stats})
+        except Exception as e:
+            rows.append({**params, "error": str(e)})
+    return rows
+
+
+def sweep(closes, strategy, spec, workers=None, fee_bps=0.0, stop=None, dates=None):
+    """Backtest every combination of spec over closes; yields one result row per combination as it finishes.
+
+    Rows are the parameters merged with backtest.stats(); pass the matrix's dates so CAGR,
+    volatility and Sharpe are annualized from the calendar, as in a single backtest (without
+    them every 252 bars count as a year). Work is split into a few chunks per
+    worker so slow and fast parameter sets balance out. Setting the stop event (a
+    threading.Event) cancels whatever has not started.
+    """
+    combos = grid(spec)
+    if not combos:
+        return
+    workers = min(workers or SWEEP_WORKERS or os.cpu_count() or 1, len(combos))
+    c = np.ascontiguousarray(closes, float)
+    shm = shared_memory.SharedMemory(create=True, size=max(c.nbytes, 1))
+    try:
+        np.ndarray(c.shape, c.dtype, buffer=shm.buf)[:] = c
+        size = max(1, len(combos) // (workers * 4))
+        # spawn: the GUI process has threads running, which fork would copy mid-flight.
+        with ProcessPoolExecutor(workers, mp.get_context("spawn"), initializer=_attach,
+                                 initargs=(shm.name, c.shape, c.dtype, dates, fee_bps)) as ex:
+            futures = [ex.submit(_run_chunk, strategy, combos[i:i + size]) for i in range(0, len(combos), size)]
+            try:
+                for f in as_completed(futures):
+                    yield from f.result()
+                    if stop is not None and stop.is_set():
+                        break
+            finally:
+                for f in futures:
+                    f.cancel()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="INVESTAUR PRO parameter sweep")
+    ap.add_argument("--strategy", default="SMA 50/200 cross", choices=list(backtest.STRATEGIES))
+    ap.add_argument("--grid", nargs="*", help="name=v1,v2 … (default: backtest.GRIDS[strategy])")
+    ap.add_argument("--symbols", nargs="*", help="default: the S&P 100 list")
+    ap.add_argument("--period", default="10y")
+    ap.add_argument("--fee", type=float, default=0.0, help="fee per trade in basis points")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--sort", default="sharpe")
+    ap.add_argument("--top", type=int, default=20)
+    args = ap.parse_args()
+
+    from store import bars
+    from app import InvestaurPro
+    dates, syms, closes = bars.matrix(args.symbols or InvestaurPro.SP100, args.period)
+    spec = parse_grid(" ".join(args.grid)) if args.grid else backtest.GRIDS[args.strategy]
+    print(f"{len(grid(spec))} backtests · {len(syms)} symbols × {len(dates)} bars")
+    rows = []
+    for row in sweep(closes, args.strategy, spec, args.workers, args.fee, dates=dates):
+        rows.append(row)
+        print(f"\r{len(rows)} done", end="", flush=True)
+    rows.sort(key=lambda r: r.get(args.sort, float("-inf")), reverse=True)
+    print()
+    keys = list(spec) + ["total_return", "cagr", "sharpe", "max_dd", "trades", "win_rate"]
+    print("".join(f"{k:>13}" for k in keys))
+    for r in rows[:args.top]:
+        print("".join(f"{r.get(k, float('nan')):>13.4g}" for k in keys))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import numpy as np
+
+import backtest
+import indicators as ind
+
+
+def walk(n, seed):
+    rng = np.random.default_rng(seed)
+    return 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.018, n)))
+
+
+def test_late_listing_scores_as_if_its_series_began_there():
+    c = walk(600, 1)
+    late = np.r_[np.full(300, np.nan), walk(300, 2)]
+    m = np.column_stack([c, late])
+    rsi = ind.rsi(m)
+    np.testing.assert_allclose(rsi[300:, 1], ind.rsi(late[300:]))
+    assert np.isnan(rsi[:300, 1]).all()
+    score = backtest.insight_score(m)
+    assert not score[:300, 1].any()
+    np.testing.assert_array_equal(score[300:, 1], backtest.insight_score(late[300:, None])[:, 0])
+    np.testing.assert_array_equal(score[:, 0], backtest.insight_score(c[:, None])[:, 0])
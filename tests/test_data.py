@@ -0,0 +1,32 @@
+import zipfile
+
+import pandas as pd
+
+from data import Recording, slice_period
+
+
+def test_rerecording_replaces_the_earlier_session(tmp_path):
+    path = str(tmp_path / "rec.zip")
+    first = Recording(path)
+    first.put("info/AAA", {"price": 1})
+    first.put("info/BBB", {"price": 2})
+    first.close()
+
+    second = Recording(path)
+    second.put("info/AAA", {"price": 10})
+    second.put("info/AAA", {"price": 11})  # same session: the first response is kept
+    assert second.get("info/AAA") == {"price": 10}
+    second.close()
+
+    replay = Recording(path)
+    assert replay.get("info/AAA") == {"price": 10}
+    assert replay.get("info/BBB") == {"price": 2}
+    replay.close()
+    with zipfile.ZipFile(path) as z:
+        assert sorted(z.namelist()) == ["info/AAA", "info/BBB"]
+
+
+def test_slice_period_ytd():
+    d = pd.DataFrame({"Close": range(400)}, index=pd.bdate_range(end="2025-03-31", periods=400, tz="UTC"))
+    assert (slice_period(d, "ytd").index.year == 2025).all()
+    assert len(slice_period(d, "5d")) == 5
@@ -0,0 +1,35 @@
+import pytest
+
+from lots import LotBook
+
+
+def book_state(book):
+    t = book.table
+    return (book.position("AAA"), list(t.lot), list(t.shares), list(book.realized), book.realized_total)
+
+
+@pytest.mark.parametrize("lots", [
+    lambda a, b, c: {a: 2, b: 12},    # the second lot holds only 10 shares
+    lambda a, b, c: {a: 5, 999: 5},   # no such lot
+    lambda a, b, c: {a: 5, c: 5},     # a lot of another symbol
+])
+def test_failing_specific_lot_sell_changes_nothing(lots):
+    book = LotBook()
+    a = book.buy("AAA", 10, 100, "2024-01-02")
+    b = book.buy("AAA", 10, 110, "2024-01-03")
+    c = book.buy("BBB", 10, 50, "2024-01-04")
+    spec = lots(a, b, c)
+    before = book_state(book)
+    with pytest.raises(ValueError):
+        book.sell("AAA", sum(spec.values()), 120, "2024-02-01", lots=spec)
+    assert book_state(book) == before
+
+
+def test_specific_lot_sell_closes_the_named_lots():
+    book = LotBook()
+    a = book.buy("AAA", 10, 100, "2024-01-02")
+    b = book.buy("AAA", 10, 110, "2024-01-03")
+    out = book.sell("AAA", 15, 120, "2024-02-01", lots={b: 10, a: 5})
+    assert [r.lot for r in out] == [b, a]
+    assert book.position("AAA")[0] == 5
+    assert book.realized_total == pytest.approx(10 * 10 + 5 * 20)
@@ -0,0 +1,51 @@
+import datetime as dt
+
+import pandas as pd
+
+import data
+import indicators as ind
+from data import MarketDataProvider, _unique
+from realtime import QuoteBus
+
+
+class SessionProvider(MarketDataProvider):
+    """Daily bars in New York time through the given session dates."""
+
+    def __init__(self, days):
+        self.days = days
+
+    def history_many(self, syms, period="1mo", interval="1d"):
+        idx = pd.DatetimeIndex(pd.to_datetime(self.days)).tz_localize("America/New_York")
+        closes = [100.0 + i for i in range(len(idx))]
+        return {s: pd.DataFrame({"Close": closes}, index=idx) for s in _unique(syms)}
+
+
+def test_quotes_open_a_bar_only_on_a_new_session(monkeypatch):
+    friday_bars = ["2024-01-03", "2024-01-04", "2024-01-05"]
+    stream = ind.InsightStream([100.0 + i for i in range(30)], dt.date(2024, 1, 5))
+    # Saturday, and a UTC clock already on Saturday while New York is still on Friday evening.
+    for ts in (pd.Timestamp("2024-01-06 12:00", tz="UTC").timestamp(),
+               pd.Timestamp("2024-01-06 02:00", tz="UTC").timestamp()):
+        monkeypatch.setattr(data, "_provider", SessionProvider(friday_bars))
+        bus = QuoteBus(clock=lambda: ts)
+        heard = []
+        bus.subscribe(None, heard.append)
+        q = bus.prices(["AAA"])
+        assert q["AAA"][0] == 102.0 and heard[-1].day == dt.date(2024, 1, 5)
+        stream.update(heard[-1].price, heard[-1].day)
+        assert stream.bars == 30
+
+    # Monday's session has traded: its quote opens one bar, later Monday quotes revise it.
+    monkeypatch.setattr(data, "_provider", SessionProvider(friday_bars + ["2024-01-08"]))
+    bus = QuoteBus(clock=lambda: pd.Timestamp("2024-01-08 15:00", tz="UTC").timestamp())
+    bus.subscribe(None, heard.append)
+    bus.prices(["AAA"])
+    assert heard[-1].day == dt.date(2024, 1, 8)
+    stream.update(heard[-1].price, heard[-1].day)
+    stream.update(heard[-1].price + 1, heard[-1].day)
+    assert stream.bars == 31 and stream.closes[-1] == 104.0
+
+    # A quote that knows no session (or an older one) revises rather than rolls back the day.
+    stream.update(105.0, None)
+    stream.update(106.0, dt.date(2024, 1, 5))
+    assert stream.bars == 31 and stream.day == dt.date(2024, 1, 8)
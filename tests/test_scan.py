@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+import data
+import scan
+from app import InvestaurPro
+from data import MarketDataProvider, _unique
+from store import BarStore, align
+
+METRICS = ("curr", "sma20", "sma50", "sma200", "rsi", "macd", "macd_signal",
+           "mom_1m", "mom_3m", "mom_1y", "vol_ann", "max_dd")
+
+
+def walk(idx, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(idx))))
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close,
+                         "Volume": np.full(len(idx), 1e6)}, index=idx)
+
+
+def mixed_calendar():
+    """A coin trading every day beside equities on weekdays, one of them listed late."""
+    return {
+        "BTC-USD": walk(pd.date_range("2023-01-01", "2024-06-30", tz="UTC"), 1),
+        "AAA": walk(pd.bdate_range("2023-01-02", "2024-06-28", tz="America/New_York"), 2),
+        "BBB": walk(pd.bdate_range("2024-02-01", "2024-06-28", tz="America/New_York"), 3),
+    }
+
+
+class FrameProvider(MarketDataProvider):
+    def __init__(self, frames):
+        self.frames = frames
+
+    def history_many(self, syms, period="1mo", interval="1d"):
+        return {s: self.frames[s] for s in _unique(syms) if s in self.frames}
+
+    def history_since(self, syms, start, interval="1d"):
+        return self.history_many(syms)
+
+
+def assert_matches_per_symbol(symbols, m, frames, only=None):
+    for j, sym in enumerate(symbols):
+        want = InvestaurPro._ai_metrics(frames[sym]["Close"].to_numpy(float))
+        for k in only or METRICS:
+            expected = np.nan if want[k] is None else want[k]
+            assert np.isclose(m[k][j], expected, equal_nan=True), (sym, k, m[k][j], expected)
+
+
+def test_signals_match_per_symbol_metrics_across_calendars():
+    frames = mixed_calendar()
+    _, symbols, closes = align(frames, fill=False)
+    _, m = scan.signals(closes)
+    assert_matches_per_symbol(symbols, m, frames)
+
+
+def test_universe_scans_each_symbol_on_its_own_bars(tmp_path, monkeypatch):
+    frames = mixed_calendar()
+    monkeypatch.setattr(data, "_provider", FrameProvider(frames))
+    monkeypatch.setattr(scan, "bars", BarStore(root=str(tmp_path), fresh_s=10**9))
+    symbols, _, m = scan.universe(list(frames), "max")
+    assert sorted(symbols) == sorted(frames)
+    assert_matches_per_symbol(symbols, m, frames)
+
+
+def test_screener_mask_matches_per_symbol_metrics_across_calendars(tmp_path, monkeypatch):
+    frames = mixed_calendar()
+    monkeypatch.setattr(data, "_provider", FrameProvider(frames))
+    monkeypatch.setattr(scan, "bars", BarStore(root=str(tmp_path), fresh_s=10**9))
+    symbols, _, m = scan.universe(list(frames), "max")
+    per_symbol = [InvestaurPro._ai_metrics(frames[s]["Close"].to_numpy(float)) for s in symbols]
+    ref = {k: np.array([np.nan if p[k] is None else p[k] for p in per_symbol], float) for k in METRICS}
+    # Each bound sits just inside AAA's own value, so AAA passes only if its metric is exact.
+    j = symbols.index("AAA")
+    for key, (metric, op) in scan.TECHNICAL_FILTERS.items():
+        v = ref[metric][j]
+        bound = v - 1e-9 * max(abs(v), 1) if op == ">=" else v + 1e-9 * max(abs(v), 1)
+        got = scan.technical_mask(m, **{key: bound})
+        assert got[j] and list(got) == list(scan.technical_mask(ref, **{key: bound})), key
+    for side in ("above", "below"):
+        want = scan.technical_mask(ref, sma50=side, sma200=side)
+        assert list(scan.technical_mask(m, sma50=side, sma200=side)) == list(want)
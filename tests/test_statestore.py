@@ -0,0 +1,78 @@
+import sqlite3
+
+from models import PortfolioState
+from statestore import StateStore
+
+
+def test_lot_ids_survive_a_reload(tmp_path):
+    path = str(tmp_path / "state.db")
+    p = PortfolioState()
+    a = p.add("AAA", 10, 100, "2024-01-02")
+    b = p.add("BBB", 5, 50, "2024-01-03")
+    c = p.add("AAA", 4, 120, "2024-02-01")
+    p.sell("AAA", 10, 130, "2024-03-01", lots={a: 10})
+    p.sell("AAA", 4, 130, "2024-03-02", lots={c: 4})
+    store = StateStore(path)
+    store.save_portfolio(p)
+    store.close()
+
+    q = StateStore(path).load_portfolio()
+    assert list(q.table.lot) == [b]
+    assert [r.lot for r in q.book.realized] == [a, c]
+    # Sold ids are not handed out again, so the realized rows keep pointing at their own lots.
+    assert q.add("CCC", 1, 10, "2024-04-01") == c + 1
+
+
+def test_state_saved_without_lot_ids_still_loads(tmp_path):
+    path = str(tmp_path / "state.db")
+    p = PortfolioState()
+    p.add("AAA", 10, 100, "2024-01-02")
+    t = p.table
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE lots (id INTEGER PRIMARY KEY, symbols TEXT, sym BLOB, shares BLOB, price BLOB, date BLOB)")
+    db.execute("INSERT INTO lots VALUES (0,?,?,?,?,?)",
+               ("\n".join(t.symbols), t.sym.tobytes(), t.shares.tobytes(), t.price.tobytes(), t.date.tobytes()))
+    db.commit()
+    db.close()
+
+    q = StateStore(path).load_portfolio()
+    assert list(q.table.lot) == [0]
+    assert q.holdings["AAA"].shares == 10
+
+
+def realized_rows(path):
+    db = sqlite3.connect(path)
+    rows = db.execute("SELECT date, symbol, lot, shares FROM realized ORDER BY rowid").fetchall()
+    db.close()
+    return rows
+
+
+def test_saves_append_new_sales_and_rewrite_only_after_a_back_dated_one(tmp_path):
+    path = str(tmp_path / "state.db")
+    store = StateStore(path, flush_ms=10_000)
+    p = PortfolioState()
+    p.add("AAA", 100, 10, "2024-01-02")
+    p.sell("AAA", 1, 12, "2024-02-01")
+    store.save_portfolio(p)
+    store.flush()
+    statements = []
+    store._db.set_trace_callback(statements.append)
+
+    p.sell("AAA", 1, 12, "2024-03-01")
+    store.save_portfolio(p)
+    p.sell("AAA", 1, 12, "2024-04-01")
+    store.save_portfolio(p)  # coalesced with the unwritten save before it
+    store.flush()
+    assert not any(s.startswith("DELETE FROM realized") for s in statements)
+    assert [r[0] for r in realized_rows(path)] == ["2024-02-01", "2024-03-01", "2024-04-01"]
+
+    p.sell("AAA", 1, 12, "2024-01-15")  # back-dated: earlier records move
+    store.save_portfolio(p)
+    store.flush()
+    assert any(s.startswith("DELETE FROM realized") for s in statements)
+    assert [r[0] for r in realized_rows(path)] == ["2024-01-15", "2024-02-01", "2024-03-01", "2024-04-01"]
+    store.close()
+
+    q = StateStore(path).load_portfolio()
+    assert [r.date for r in q.book.realized] == ["2024-01-15", "2024-02-01", "2024-03-01", "2024-04-01"]
+    assert q.holdings["AAA"].shares == 96
@@ -0,0 +1,60 @@
+import pandas as pd
+
+import data
+from data import MarketDataProvider, _unique
+from store import BarStore, merge_bars
+
+
+def bars_on(days, tz=None):
+    idx = pd.DatetimeIndex(pd.to_datetime(days))
+    idx = idx.tz_localize(tz) if tz else idx
+    n = len(idx)
+    return pd.DataFrame({"Open": [1.0] * n, "High": [1.0] * n, "Low": [1.0] * n,
+                         "Close": [float(i + 1) for i in range(n)], "Volume": [100.0] * n}, index=idx)
+
+
+class MixedProvider(MarketDataProvider):
+    """One symbol: exchange-zoned bars (Ticker.history); several: naive bars (yf.download)."""
+
+    def history_many(self, syms, period="1mo", interval="1d"):
+        return {s: bars_on(["2024-01-02", "2024-01-03"], "America/New_York") for s in _unique(syms)}
+
+    def history_since(self, syms, start, interval="1d"):
+        return {s: bars_on(["2024-01-03", "2024-01-04"]) for s in _unique(syms)}
+
+
+def test_merge_bars_one_bar_per_day_across_timezones():
+    old = bars_on(["2024-01-02", "2024-01-03"], "America/New_York")
+    for new in (bars_on(["2024-01-03", "2024-01-04"]),
+                bars_on(["2024-01-03", "2024-01-04"]).tz_localize("UTC")):
+        d = merge_bars(old, new)
+        assert isinstance(d.index, pd.DatetimeIndex)
+        assert str(d.index.tz) == "America/New_York"
+        assert list(d.index.strftime("%Y-%m-%d")) == ["2024-01-02", "2024-01-03", "2024-01-04"]
+        assert list(d["Close"]) == [1.0, 1.0, 2.0]
+
+
+def test_single_symbol_fetch_then_batched_gap_fetch(tmp_path, monkeypatch):
+    monkeypatch.setattr(data, "_provider", MixedProvider())
+    store = BarStore(root=str(tmp_path), fresh_s=0)
+    first = store.history_many(["AAA"], "max")["AAA"]
+    assert len(first) == 2
+    merged = store.history_many(["AAA", "BBB"], "max")["AAA"]
+    assert list(merged.index.strftime("%Y-%m-%d")) == ["2024-01-02", "2024-01-03", "2024-01-04"]
+    assert str(merged.index.tz) == "America/New_York"
+    # The merged frame was saved and reloads as the same bars.
+    again = BarStore(root=str(tmp_path), fresh_s=10**9).history("AAA", "max")
+    assert list(again.index) == list(merged.index)
+
+
+def test_truncated_file_is_refetched(tmp_path, monkeypatch):
+    monkeypatch.setattr(data, "_provider", MixedProvider())
+    store = BarStore(root=str(tmp_path), fresh_s=10**9)
+    store.history("AAA", "max")
+    path = store._path("AAA", "1d")
+    with open(path, "rb") as f:
+        blob = f.read()
+    with open(path, "wb") as f:
+        f.write(blob[:len(blob) // 2])
+    again = BarStore(root=str(tmp_path), fresh_s=10**9).history("AAA", "max")
+    assert list(again.index.strftime("%Y-%m-%d")) == ["2024-01-02", "2024-01-03"]
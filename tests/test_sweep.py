@@ -0,0 +1,17 @@
+import numpy as np
+import pandas as pd
+
+import backtest
+import sweep
+
+
+def test_sweep_rows_match_a_dated_backtest():
+    rng = np.random.default_rng(3)
+    dates = pd.date_range("2020-01-01", periods=730, tz="UTC")  # daily, weekends included (crypto)
+    closes = 50 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, (730, 3)), axis=0))
+    spec = {"fast": [10, 20], "slow": [50]}
+    rows = sorted(sweep.sweep(closes, "SMA 50/200 cross", spec, workers=2, dates=dates), key=lambda r: r["fast"])
+    for row, params in zip(rows, sweep.grid(spec)):
+        want = backtest.run(closes, backtest.sma_cross(closes, **params), dates).stats
+        for k in ("cagr", "vol_ann", "sharpe"):
+            assert row[k] == want[k]
@@ -20,8 +20,8 @@ def stat_card(parent, label, value, color=FG, font_size=11):
     inner = tk.Frame(f, bg=CARD, padx=14, pady=10)
     inner.pack(fill="both", expand=True)
     tk.Label(inner, text=label.upper(), fg=FG_DIM, bg=CARD, font=FONT_SMALL).pack(anchor="w")
-    tk.Label(inner, text=value, fg=color, bg=CARD,
-             font=("Consolas", font_size, "bold")).pack(anchor="w", pady=(3, 0))
+    f.value_label = tk.Label(inner, text=value, fg=color, bg=CARD, font=("Consolas", font_size, "bold"))
+    f.value_label.pack(anchor="w", pady=(3, 0))
     return f
 
 
@@ -0,0 +1,119 @@
+"""
+INVESTAUR PRO — Bounded, prioritized worker pool for background fetches
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+
+from config import WORKER_THREADS
+
+# Priority classes: lower runs first.
+USER       = 0  # Direct user actions (analyze, trade, screener run)
+VISIBLE    = 1  # Loads for the tab the user is looking at
+BACKGROUND = 2  # Timed refreshes
+
+PRIORITY_NAMES = {USER: "user", VISIBLE: "visible", BACKGROUND: "background"}
+
+
+class _Task:
+    __slots__ = ("fn", "args", "kwargs", "future", "key", "priority", "queued_at")
+
+    def __init__(self, fn, args, kwargs, priority, key):
+        self.fn, self.args, self.kwargs = fn, args, kwargs
+        self.future = Future()
+        self.priority = priority
+        self.key = key
+        self.queued_at = time.monotonic()
+
+
+class WorkerPool:
+    """Fixed set of daemon threads draining one priority queue.
+
+    submit(..., key=k) supersedes a still-queued task with the same key, so repeated clicks
+    or overlapping refresh ticks run once instead of piling up.
+    """
+
+    def __init__(self, size=WORKER_THREADS):
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._keyed = {}
+        self._closed = False
+        self.completed = 0
+        self.failed = 0
+        self.superseded = 0
+        self._wait_total = 0.0
+        self._run_total = 0.0
+        self._wait_max = 0.0
+        self._threads = [threading.Thread(target=self._run, name=f"investaur-worker-{i}", daemon=True)
+                         for i in range(size)]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, fn, *args, priority=BACKGROUND, key=None, **kwargs):
+        task = _Task(fn, args, kwargs, priority, key)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("worker pool is shut down")
+            if key is not None:
+                old = self._keyed.get(key)
+                if old is not None and old.future.cancel():
+                    self.superseded += 1
+                self._keyed[key] = task
+            heapq.heappush(self._heap, (priority, next(self._seq), task))
+            self._cond.notify()
+        return task.future
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap and not self._closed:
+                    self._cond.wait()
+                if not self._heap:
+                    return
+                _, _, task = heapq.heappop(self._heap)
+                if task.key is not None and self._keyed.get(task.key) is task:
+                    del self._keyed[task.key]
+            if not task.future.set_running_or_notify_cancel():
+                continue
+            started = time.monotonic()
+            try:
+                task.future.set_result(task.fn(*task.args, **task.kwargs))
+                ok = True
+            except Exception as e:
+                task.future.set_exception(e)
+                ok = False
+            finished = time.monotonic()
+            with self._cond:
+                wait = started - task.queued_at
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+                self._run_total += finished - started
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+    def stats(self):
+        """Queue depth per priority class and mean/max latency (ms) of finished tasks."""
+        with self._cond:
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _, task in self._heap:
+                if not task.future.cancelled():
+                    depth[PRIORITY_NAMES.get(priority, str(priority))] += 1
+            done = self.completed + self.failed
+            return {
+                "threads": len(self._threads), "queued": depth,
+                "completed": self.completed, "failed": self.failed, "superseded": self.superseded,
+                "wait_ms_avg": self._wait_total / done * 1000 if done else 0.0,
+                "wait_ms_max": self._wait_max * 1000,
+                "run_ms_avg": self._run_total / done * 1000 if done else 0.0,
+            }
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()